@@ -7,6 +7,12 @@ import pandas as pd
 def run_backtest(price_df, signals_series, initial_capital=100000):
     """
     Simple long-only backtest using BUY / SELL signals.
+
+    Vectorised: the position after each bar is the last BUY / SELL seen
+    (HOLD keeps it), and equity compounds the close-to-close return of
+    every bar that starts in a position — the same result as stepping
+    bar by bar, for any length of signal series (e.g. a PPO action series
+    from src/rl/policy_export.action_series).
     """
 
     df = price_df.copy()
@@ -23,27 +29,17 @@ def run_backtest(price_df, signals_series, initial_capital=100000):
 
     df["signal"] = signals_series.values
 
-    cash = initial_capital
-    position = 0
-    equity_curve = []
-
-    for i in range(len(df)):
-        price = df[close_col].iloc[i]
-        signal = df["signal"].iloc[i]
-
-        # BUY
-        if signal == "BUY" and cash > 0:
-            position = cash / price
-            cash = 0
-
-        # SELL
-        elif signal == "SELL" and position > 0:
-            cash = position * price
-            position = 0
+    # ------------------------------------------
+    # Position state: 1 after BUY, 0 after SELL
+    # ------------------------------------------
+    state = df["signal"].map({"BUY": 1.0, "SELL": 0.0})
+    in_position = state.ffill().fillna(0.0).to_numpy()
 
-        net_worth = cash + position * price
-        equity_curve.append(net_worth)
+    # Bar i earns its return when the position was open at bar i-1's close
+    price = df[close_col].to_numpy(dtype=float)
+    growth = np.ones(len(df))
+    growth[1:] = np.where(in_position[:-1] > 0, price[1:] / price[:-1], 1.0)
 
-    df["equity"] = equity_curve
+    df["equity"] = initial_capital * np.cumprod(growth)
 
     return df
@@ -0,0 +1,511 @@
+# src/backtest/setup_outcomes.py
+"""
+Setup Outcome Tracker — did the setups from setup_engine actually work?
+
+For every historical bar the swing (daily) and intraday (15-min) setups are
+rebuilt with the same rules as src/domain/setup_engine.py, but vectorised
+over the whole history. Each setup is then walked forward with a
+first-passage search over the next bars' highs / lows:
+
+    target   : target 1 reached before the stop
+    stop     : stop reached first (a bar touching both counts as stop)
+    timeout  : neither within the holding horizon → exit at last close
+
+Conventions:
+    • entry is the setup bar's close (the "price" the setup is built at)
+    • BULLISH / NEUTRAL setups are long, BEARISH are short
+    • R multiple = signed exit move / initial risk (|entry − stop|)
+    • swing horizon: 7 bars (BULLISH / BEARISH), 10 bars (NEUTRAL);
+      intraday horizon: the rest of the same session
+    • pattern labels drop the numeric suffix ("RSI oversold (28.1)" →
+      "RSI oversold") so they group cleanly
+
+Indicators are computed once over the full history; every rule is causal,
+so row t only sees bars ≤ t.
+
+Run:
+    python -m src.backtest.setup_outcomes HDFCBANK.NS
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.domain.indicators import add_indicators
+from src.domain.intraday import add_intraday_features
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────────────────────────────────────
+
+SWING_MIN_HISTORY = 65            # matches the 3-month pivot window
+INTRADAY_MIN_HISTORY = 40
+
+SWING_HORIZON = {"BULLISH": 7, "BEARISH": 7, "NEUTRAL": 10}
+INTRADAY_MAX_HORIZON = 26         # one NSE session of 15-min bars
+
+_SETUP_COLUMNS = [
+    "date", "mode", "bias", "pattern", "price",
+    "entry_low", "entry_high", "stop_loss", "target_1", "target_2",
+    "risk_reward", "horizon",
+]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Historical setups
+# ─────────────────────────────────────────────────────────────────────────────
+
+def swing_setups(daily_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    build_swing_setup() for every daily bar, vectorised.
+
+    Returns one row per bar (after SWING_MIN_HISTORY warm-up) with
+    _SETUP_COLUMNS.
+    """
+    df = add_indicators(daily_df.reset_index(drop=True))
+    n = len(df)
+    if n <= SWING_MIN_HISTORY:
+        return pd.DataFrame(columns=_SETUP_COLUMNS)
+
+    close = df["close"].to_numpy(dtype=float)
+    ema20 = df["ema_20"].to_numpy(dtype=float)
+    ema50 = df["ema_50"].to_numpy(dtype=float)
+    rsi = df["rsi"].to_numpy(dtype=float)
+    macd = df["macd"].to_numpy(dtype=float)
+    macd_sig = df["macd_signal"].to_numpy(dtype=float)
+    atr = df["atr"].to_numpy(dtype=float)
+
+    # ── Bias (setup_engine._swing_bias) ──────────────────────────────────────
+    bull = np.where((close > ema20) & (ema20 > ema50), 2,
+           np.where(~((close < ema20) & (ema20 < ema50)) & (close > ema20), 1, 0))
+    bear = np.where((close < ema20) & (ema20 < ema50), 2,
+           np.where(~((close > ema20) & (ema20 > ema50)) & (close < ema20), 1, 0))
+    bull = bull + (macd > macd_sig) + (rsi > 55)
+    bear = bear + ~(macd > macd_sig) + (rsi < 45)
+    bias = np.where(bull >= 3, "BULLISH", np.where(bear >= 3, "BEARISH", "NEUTRAL"))
+
+    # ── Levels (setup_engine._swing_levels: 65-bar window, 5-bar pivots) ─────
+    window = SWING_MIN_HISTORY
+    support, resistance = _pivot_levels(
+        df, close, lookback=5, window=window, nearest_to_price=True,
+    )
+
+    # ── Patterns (setup_engine._swing_patterns, first match) ─────────────────
+    mid = df["close"].rolling(20).mean().to_numpy()
+    std = df["close"].rolling(20).std().to_numpy()
+    bb_upper, bb_lower = mid + 2 * std, mid - 2 * std
+    bb_width = (bb_upper - bb_lower) / ((bb_upper + bb_lower) / 2)
+    high_20 = df["high"].rolling(20).max().shift(1).to_numpy()
+    low_20 = df["low"].rolling(20).min().shift(1).to_numpy()
+
+    prev = lambda a: np.concatenate([[np.nan], a[:-1]])  # noqa: E731
+    pattern = _first_match([
+        ((prev(ema20) < prev(ema50)) & (ema20 > ema50), "Golden cross (EMA 20 > EMA 50)"),
+        ((prev(ema20) > prev(ema50)) & (ema20 < ema50), "Death cross (EMA 20 < EMA 50)"),
+        ((prev(macd) < prev(macd_sig)) & (macd > macd_sig), "MACD bullish crossover"),
+        ((prev(macd) > prev(macd_sig)) & (macd < macd_sig), "MACD bearish crossover"),
+        (rsi < 35, "RSI oversold"),
+        (rsi > 65, "RSI overbought"),
+        (close > high_20, "20-day high breakout"),
+        (close < low_20, "20-day low breakdown"),
+        (bb_width < 0.04, "Bollinger band squeeze (volatility contraction)"),
+        (close > bb_upper, "Bollinger upper band breakout"),
+        (close < bb_lower, "Bollinger lower band breakdown"),
+    ], default="No clear swing pattern")
+
+    # ── Entry / stop / targets (setup_engine.build_swing_setup) ──────────────
+    is_bull, is_bear = bias == "BULLISH", bias == "BEARISH"
+    entry_low = np.select(
+        [is_bull, is_bear],
+        [np.maximum(support, ema20 * 0.995), close - atr * 0.1],
+        support + atr * 0.1,
+    )
+    entry_high = np.select(
+        [is_bull, is_bear],
+        [close + atr * 0.1, np.minimum(resistance, ema20 * 1.005)],
+        resistance - atr * 0.1,
+    )
+    stop = np.select(
+        [is_bull, is_bear],
+        [support - atr * 0.5, resistance + atr * 0.5],
+        support - atr * 0.4,
+    )
+    target_1 = np.where(is_bear, support, resistance)
+    target_2 = np.select(
+        [is_bull, is_bear],
+        [resistance + atr * 1.5, support - atr * 1.5],
+        resistance + atr * 1.0,
+    )
+    horizon = np.where(bias == "NEUTRAL", SWING_HORIZON["NEUTRAL"], SWING_HORIZON["BULLISH"])
+
+    out = _setup_frame(df, "Swing", bias, pattern, close, entry_low, entry_high,
+                       stop, target_1, target_2, horizon)
+    return out.iloc[SWING_MIN_HISTORY - 1:].reset_index(drop=True)
+
+
+def intraday_setups(intraday_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    build_intraday_setup() for every 15-min bar, vectorised.
+
+    The intraday horizon is the remainder of the bar's session (capped at
+    INTRADAY_MAX_HORIZON bars); the `session` column carries the IST day.
+    """
+    from src.data.resample import normalize_bars
+    from src.domain.intraday import session_keys
+
+    df = add_intraday_features(normalize_bars(intraday_df))
+    n = len(df)
+    if n <= INTRADAY_MIN_HISTORY:
+        return pd.DataFrame(columns=_SETUP_COLUMNS + ["session"])
+
+    close = df["close"].to_numpy(dtype=float)
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    vwap = df["vwap"].to_numpy(dtype=float)
+    ema9 = df["ema_9"].to_numpy(dtype=float)
+    ema21 = df["ema_21"].to_numpy(dtype=float)
+
+    tr = np.maximum.reduce([
+        high - low,
+        np.abs(high - np.concatenate([[np.nan], close[:-1]])),
+        np.abs(low - np.concatenate([[np.nan], close[:-1]])),
+    ])
+    atr = pd.Series(np.where(np.isnan(tr), high - low, tr)).rolling(14).mean().to_numpy()
+
+    # ── Bias (intraday.intraday_bias) ────────────────────────────────────────
+    bias = np.where((close > vwap) & (ema9 > ema21), "BULLISH",
+           np.where((close < vwap) & (ema9 < ema21), "BEARISH", "NEUTRAL"))
+
+    # ── Levels (setup_engine._intraday_levels: 40-bar pivots, 3-bar) ─────────
+    support, resistance = _pivot_levels(
+        df, close, lookback=3, window=INTRADAY_MIN_HISTORY, nearest_to_price=False,
+        fallback_window=20,
+    )
+
+    # ── Patterns (setup_engine._intraday_patterns, first match) ──────────────
+    prev = lambda a: np.concatenate([[np.nan], a[:-1]])  # noqa: E731
+    pattern = _first_match([
+        ((prev(close) < prev(vwap)) & (close > vwap), "VWAP reclaim (bullish)"),
+        ((prev(close) > prev(vwap)) & (close < vwap), "VWAP breakdown (bearish)"),
+        ((prev(ema9) < prev(ema21)) & (ema9 > ema21), "EMA 9/21 bullish cross"),
+        ((prev(ema9) > prev(ema21)) & (ema9 < ema21), "EMA 9/21 bearish cross"),
+        ((close > vwap) & (ema9 > ema21), "Price above VWAP with EMA alignment"),
+        ((high < prev(high)) & (low > prev(low)), "Inside bar (consolidation)"),
+    ], default="No clear intraday pattern")
+
+    # ── Entry / stop / targets (setup_engine.build_intraday_setup) ───────────
+    is_bull, is_bear = bias == "BULLISH", bias == "BEARISH"
+    mid = (support + resistance) / 2
+    entry_low = np.select(
+        [is_bull, is_bear],
+        [np.maximum(support, close - atr * 0.3), close - atr * 0.1],
+        mid - atr * 0.15,
+    )
+    entry_high = np.select(
+        [is_bull, is_bear],
+        [close + atr * 0.1, np.minimum(resistance, close + atr * 0.3)],
+        mid + atr * 0.15,
+    )
+    stop = np.select(
+        [is_bull, is_bear],
+        [support - atr * 0.25, resistance + atr * 0.25],
+        support - atr * 0.2,
+    )
+    target_1 = np.where(is_bear, support, resistance)
+    target_2 = np.select(
+        [is_bull, is_bear],
+        [resistance + atr * 0.8, support - atr * 0.8],
+        resistance + atr * 0.5,
+    )
+
+    session = session_keys(df["date"]).to_numpy()
+    out = _setup_frame(df, "Intraday", bias, pattern, close, entry_low, entry_high,
+                       stop, target_1, target_2, np.full(n, INTRADAY_MAX_HORIZON))
+    out["session"] = session
+    return out.iloc[INTRADAY_MIN_HISTORY - 1:].reset_index(drop=True)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# First passage
+# ─────────────────────────────────────────────────────────────────────────────
+
+def first_passage(
+    setups: pd.DataFrame,
+    bars: pd.DataFrame,
+    session: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """
+    Walk each setup forward over the next `horizon` bars.
+
+    Args:
+        setups  : swing_setups() / intraday_setups() output
+        bars    : the OHLCV frame the setups were built from (same dates)
+        session : per-bar session key; forward bars from another session
+                  are ignored (intraday)
+
+    Returns setups plus:
+        outcome         "target" | "stop" | "timeout" | "invalid"
+        bars_to_exit    bars from setup to exit
+        hit_target_2    target 2 reached before the stop
+        r_multiple      signed exit move / initial risk
+    """
+    if setups.empty:
+        return setups.assign(outcome=[], bars_to_exit=[], hit_target_2=[], r_multiple=[])
+
+    high = bars["high"].to_numpy(dtype=float)
+    low = bars["low"].to_numpy(dtype=float)
+    close = bars["close"].to_numpy(dtype=float)
+    n = len(bars)
+
+    pos = pd.Index(pd.to_datetime(bars["date"])).get_indexer(pd.to_datetime(setups["date"]))
+    setups = setups[pos >= 0].reset_index(drop=True)
+    pos = pos[pos >= 0]
+    H = int(setups["horizon"].max())
+
+    # Forward windows: fwd[k, h] = bar (pos_k + 1 + h); padded with NaN
+    pad = np.full(H, np.nan)
+    f_high = sliding_window_view(np.concatenate([high[1:], pad]), H)[pos]
+    f_low = sliding_window_view(np.concatenate([low[1:], pad]), H)[pos]
+    f_close = sliding_window_view(np.concatenate([close[1:], pad]), H)[pos]
+
+    steps = np.arange(H)[None, :]
+    valid = (steps < setups["horizon"].to_numpy()[:, None]) & ~np.isnan(f_high)
+    if session is not None:
+        sess = np.asarray(session)
+        f_sess = sliding_window_view(np.concatenate([sess[1:], np.full(H, sess[-1])]), H)[pos]
+        valid &= (f_sess == sess[pos][:, None]) & (pos[:, None] + 1 + steps < n)
+
+    short = (setups["bias"] == "BEARISH").to_numpy()[:, None]
+    entry = setups["price"].to_numpy(dtype=float)
+    stop = setups["stop_loss"].to_numpy(dtype=float)[:, None]
+    t1 = setups["target_1"].to_numpy(dtype=float)[:, None]
+    t2 = setups["target_2"].to_numpy(dtype=float)[:, None]
+
+    hit_stop = valid & np.where(short, f_high >= stop, f_low <= stop)
+    hit_t1 = valid & np.where(short, f_low <= t1, f_high >= t1)
+    hit_t2 = valid & np.where(short, f_low <= t2, f_high >= t2)
+
+    first_stop = _first_true(hit_stop)
+    first_t1 = _first_true(hit_t1)
+    first_t2 = _first_true(hit_t2)
+    last_valid = np.where(valid.any(axis=1), H - 1 - np.argmax(valid[:, ::-1], axis=1), -1)
+
+    # A bar touching both counts as stop (intrabar order unknown)
+    is_target = first_t1 < first_stop
+    is_stop = (first_stop <= first_t1) & (first_stop < H)
+    is_invalid = last_valid < 0
+
+    timeout_close = f_close[np.arange(len(pos)), np.maximum(last_valid, 0)]
+    exit_price = np.select(
+        [is_target, is_stop],
+        [t1[:, 0], stop[:, 0]],
+        timeout_close,
+    )
+    bars_to_exit = np.select([is_target, is_stop], [first_t1, first_stop], last_valid) + 1
+
+    risk = np.abs(entry - stop[:, 0])
+    direction = np.where(short[:, 0], -1.0, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_multiple = np.where(risk > 0, direction * (exit_price - entry) / risk, np.nan)
+
+    out = setups.copy()
+    out["outcome"] = np.select([is_invalid, is_target, is_stop], ["invalid", "target", "stop"], "timeout")
+    out["bars_to_exit"] = np.where(is_invalid, np.nan, bars_to_exit)
+    out["hit_target_2"] = first_t2 < first_stop
+    out["r_multiple"] = np.where(is_invalid, np.nan, r_multiple)
+    return out
+
+
+def outcome_stats(
+    outcomes: pd.DataFrame,
+    by: Sequence[str] = ("pattern", "bias"),
+) -> pd.DataFrame:
+    """
+    Hit rates, average R and time-to-target per group.
+
+    Returns one row per group:
+        setups, target_rate, stop_rate, timeout_rate, target_2_rate,
+        avg_r, median_bars_to_target
+    """
+    df = outcomes[outcomes["outcome"] != "invalid"]
+    if df.empty:
+        return pd.DataFrame()
+
+    flags = df.assign(
+        _target=df["outcome"].eq("target"),
+        _stop=df["outcome"].eq("stop"),
+        _timeout=df["outcome"].eq("timeout"),
+        _bars_target=df["bars_to_exit"].where(df["outcome"].eq("target")),
+    )
+    stats = flags.groupby(list(by)).agg(
+        setups=("outcome", "size"),
+        target_rate=("_target", "mean"),
+        stop_rate=("_stop", "mean"),
+        timeout_rate=("_timeout", "mean"),
+        target_2_rate=("hit_target_2", "mean"),
+        avg_r=("r_multiple", "mean"),
+        median_bars_to_target=("_bars_target", "median"),
+    )
+    return stats.sort_values("setups", ascending=False).round(4).reset_index()
+
+
+def evaluate_setups(
+    daily_df: pd.DataFrame,
+    intraday_df: Optional[pd.DataFrame] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Full tracker for one ticker.
+
+    Returns dict with keys:
+        swing, swing_stats, intraday, intraday_stats (intraday keys only
+        when 15-min bars are given)
+    """
+    swing = first_passage(swing_setups(daily_df), daily_df.reset_index(drop=True))
+    result = {"swing": swing, "swing_stats": outcome_stats(swing)}
+
+    if intraday_df is not None and not intraday_df.empty:
+        from src.data.resample import normalize_bars
+
+        bars = normalize_bars(intraday_df)
+        setups = intraday_setups(bars)
+        from src.domain.intraday import session_keys
+
+        intraday = first_passage(setups, bars, session=session_keys(bars["date"]).to_numpy())
+        result["intraday"] = intraday
+        result["intraday_stats"] = outcome_stats(intraday)
+
+    return result
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _pivot_levels(
+    df: pd.DataFrame,
+    close: np.ndarray,
+    lookback: int,
+    window: int,
+    nearest_to_price: bool,
+    fallback_window: Optional[int] = None,
+):
+    """
+    Vectorised setup_engine._find_pivots over a trailing `window` per bar.
+
+    A pivot at j counts for bar t when it is fully inside t's window:
+    j ∈ [t − window + 1 + lookback, t − lookback]. Levels are rounded to
+    2 dp like _find_pivots.
+
+    nearest_to_price=True  (swing)    : support = highest pivot low below
+                                        price, resistance = lowest pivot
+                                        high above; else window low / high
+    nearest_to_price=False (intraday) : support = highest pivot low,
+                                        resistance = lowest pivot high;
+                                        else low / high of the last
+                                        `fallback_window` bars
+    """
+    span = 2 * lookback + 1
+    lows, highs = df["low"], df["high"]
+    piv_low = np.where(lows == lows.rolling(span, center=True).min(), lows.round(2), np.nan)
+    piv_high = np.where(highs == highs.rolling(span, center=True).max(), highs.round(2), np.nan)
+
+    n, width = len(df), window - 2 * lookback
+    # cand[t] = pivots j ∈ [t − window + 1 + lookback, t − lookback]
+    lw = sliding_window_view(np.concatenate([np.full(window, np.nan), piv_low]), width)
+    hw = sliding_window_view(np.concatenate([np.full(window, np.nan), piv_high]), width)
+    start = np.arange(n) + 1 + lookback          # offset by the NaN padding
+    cand_low, cand_high = lw[start], hw[start]
+
+    price = close[:, None]
+    with np.errstate(invalid="ignore"), _all_nan_ok():
+        if nearest_to_price:
+            support = np.nanmax(np.where(cand_low < price, cand_low, np.nan), axis=1)
+            resistance = np.nanmin(np.where(cand_high > price, cand_high, np.nan), axis=1)
+        else:
+            support = np.nanmax(cand_low, axis=1)
+            resistance = np.nanmin(cand_high, axis=1)
+
+    fb = fallback_window or window
+    support = np.where(np.isnan(support), lows.rolling(fb, min_periods=1).min().to_numpy(), support)
+    resistance = np.where(np.isnan(resistance), highs.rolling(fb, min_periods=1).max().to_numpy(), resistance)
+    return support, resistance
+
+
+def _first_match(rules, default: str) -> np.ndarray:
+    conditions = [np.nan_to_num(c, nan=0).astype(bool) for c, _ in rules]
+    return np.select(conditions, [label for _, label in rules], default)
+
+
+def _first_true(mask: np.ndarray) -> np.ndarray:
+    # Index of the first True per row; the row width when there is none
+    return np.where(mask.any(axis=1), np.argmax(mask, axis=1), mask.shape[1])
+
+
+def _setup_frame(df, mode, bias, pattern, close, entry_low, entry_high,
+                 stop, target_1, target_2, horizon) -> pd.DataFrame:
+    risk = np.abs(close - stop)
+    reward = np.abs(target_1 - close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rr = np.where(risk > 0, reward / risk, 0.0)
+
+    return pd.DataFrame({
+        "date":        df["date"].to_numpy(),
+        "mode":        mode,
+        "bias":        bias,
+        "pattern":     pattern,
+        "price":       close,
+        "entry_low":   entry_low,
+        "entry_high":  entry_high,
+        "stop_loss":   stop,
+        "target_1":    target_1,
+        "target_2":    target_2,
+        "risk_reward": rr,
+        "horizon":     horizon,
+    })
+
+
+class _all_nan_ok:
+    # nanmax / nanmin warn on all-NaN rows; those rows fall back below
+    def __enter__(self):
+        import warnings
+        self._ctx = warnings.catch_warnings()
+        self._ctx.__enter__()
+        warnings.simplefilter("ignore", RuntimeWarning)
+
+    def __exit__(self, *exc):
+        return self._ctx.__exit__(*exc)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    import time
+    from src.data.prices import load_prices
+    from src.data.resample import load_bars
+
+    parser = argparse.ArgumentParser(description="Historical setup hit-rate statistics")
+    parser.add_argument("ticker", help="Yahoo ticker, e.g. HDFCBANK.NS")
+    parser.add_argument("--timeframe", default="5y", choices=["1y", "2y", "5y"])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = evaluate_setups(load_prices(args.ticker, args.timeframe), load_bars(args.ticker, "15m"))
+    elapsed = time.perf_counter() - start
+
+    pd.set_option("display.width", 200)
+    for key in ("swing_stats", "intraday_stats"):
+        if key in result:
+            print(f"\n{key}:\n{result[key].to_string(index=False)}")
+    print(f"\nEvaluated {sum(len(result[k]) for k in ('swing', 'intraday') if k in result)} setups in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,167 @@
 # src/charts/lightweight.py
+"""
+Lightweight-charts payload builder + Streamlit renderer.
 
+The payload is built column-wise: the date column is converted to chart
+times in one vectorised operation, EMA columns already produced by
+add_indicators() are reused, and long histories are downsampled with
+LTTB (largest-triangle-three-buckets) before serialisation. LTTB only picks
+where the buckets start; each candle then aggregates its whole bucket
+(first open, max high, min low, last close, summed volume), so the wicks
+of skipped bars stay visible.
+"""
+
+import json
+
+import numpy as np
 import pandas as pd
 from typing import List, Dict
 from streamlit_lightweight_charts import renderLightweightCharts
 
 
-def _format_time(ts: pd.Timestamp) -> int | str:
+MAX_CHART_POINTS = 2000           # LTTB target for long (intraday) histories
+
+_EPOCH = pd.Timestamp("1970-01-01")
+
+
+def chart_times(dates: pd.Series, daily: bool | None = None) -> pd.Series:
     """
     Daily data  -> YYYY-MM-DD
     Intraday    -> UNIX timestamp (seconds)
+
+    The mode is decided once for the whole series (intraday if any bar has
+    a time of day), so every point of a series uses the same format.
+    """
+    dates = pd.to_datetime(pd.Series(dates))
+
+    if daily is None:
+        daily = bool((dates == dates.dt.normalize()).all())
+
+    if daily:
+        return dates.dt.strftime("%Y-%m-%d")
+
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert("UTC").dt.tz_localize(None)
+    return (dates - _EPOCH) // pd.Timedelta(seconds=1)
+
+
+def lttb_indices(y: np.ndarray, n_out: int) -> np.ndarray:
     """
-    if ts.hour == 0 and ts.minute == 0:
-        return ts.strftime("%Y-%m-%d")
-    return int(ts.timestamp())
-
-
-def _ohlc_series(df: pd.DataFrame) -> List[Dict]:
-    return [
-        {
-            "time": _format_time(d),
-            "open": float(o),
-            "high": float(h),
-            "low": float(l),
-            "close": float(c),
-        }
-        for d, o, h, l, c in zip(
-            df["date"],
-            df["open"],
-            df["high"],
-            df["low"],
-            df["close"],
+    Largest-Triangle-Three-Buckets: indices of `n_out` points that keep the
+    visual shape of `y` (first and last point always kept).
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+
+        area = np.abs(
+            (x[prev] - avg_x) * (y[lo:hi] - y[prev])
+            - (x[prev] - x[lo:hi]) * (avg_y - y[prev])
         )
-    ]
+        prev = lo + int(np.argmax(area))
+        out[i + 1] = prev
+
+    return out
+
+
+def downsample_ohlcv(df: pd.DataFrame, starts: np.ndarray) -> pd.DataFrame:
+    """
+    One row per bucket [starts[k], starts[k + 1]): first open, max high,
+    min low, last close, summed volume. The date is the bucket start; every
+    other column (e.g. ema_*) takes the bucket's last value, matching close.
+    """
+    starts = np.asarray(starts, dtype=int)
+    ends = np.append(starts[1:], len(df)) - 1
 
+    out = df.iloc[ends].reset_index(drop=True)
+    out["date"] = df["date"].iloc[starts].reset_index(drop=True)
+    out["open"] = df["open"].values[starts]
+    out["high"] = np.maximum.reduceat(df["high"].to_numpy(dtype=float), starts)
+    out["low"] = np.minimum.reduceat(df["low"].to_numpy(dtype=float), starts)
+    if "volume" in df.columns:
+        out["volume"] = np.add.reduceat(df["volume"].to_numpy(dtype=float), starts)
+    return out
 
-def _ema_series(df: pd.DataFrame, span: int) -> List[Dict]:
-    ema = df["close"].ewm(span=span, adjust=False).mean()
-    return [
-        {"time": _format_time(d), "value": float(v)}
-        for d, v in zip(df["date"], ema)
-        if pd.notna(v)
-    ]
+
+def build_chart_payload(
+    df: pd.DataFrame,
+    ema_periods: tuple[int, int] = (20, 50),
+    max_points: int = MAX_CHART_POINTS,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Column-wise chart data.
+
+    Returns dict:
+        "candles"        : frame(time, open, high, low, close)
+        "ema_<period>"   : frame(time, value) per EMA
+    """
+    df = df.reset_index(drop=True)
+    if len(df) > max_points:
+        df = downsample_ohlcv(df, lttb_indices(df["close"].values, max_points))
+
+    times = chart_times(df["date"])
+
+    payload = {
+        "candles": pd.DataFrame({
+            "time":  times.values,
+            "open":  df["open"].astype(float).values,
+            "high":  df["high"].astype(float).values,
+            "low":   df["low"].astype(float).values,
+            "close": df["close"].astype(float).values,
+        }),
+    }
+
+    for span in ema_periods:
+        col = f"ema_{span}"
+        ema = df[col] if col in df.columns else df["close"].ewm(span=span, adjust=False).mean()
+        line = pd.DataFrame({"time": times.values, "value": ema.astype(float).values})
+        payload[col] = line[line["value"].notna()]
+
+    return payload
 
 
-def _pattern_markers(patterns: List[Dict]) -> List[Dict]:
+def payload_records(payload: Dict[str, pd.DataFrame]) -> Dict[str, List[Dict]]:
+    """
+    Convert a payload to the list-of-dicts shape lightweight-charts expects.
+    """
+    return {name: frame.to_dict("records") for name, frame in payload.items()}
+
+
+def payload_json(payload: Dict[str, pd.DataFrame]) -> str:
+    """
+    Pre-serialised JSON of a payload (for API / headless consumers).
+    """
+    return "{" + ",".join(
+        f"{json.dumps(name)}:{frame.to_json(orient='records')}"
+        for name, frame in payload.items()
+    ) + "}"
+
+
+def _pattern_markers(patterns: List[Dict], daily: bool) -> List[Dict]:
     markers = []
+    times = chart_times([p["date"] for p in patterns], daily=daily).tolist()
 
-    for p in patterns:
+    for p, t in zip(patterns, times):
         color = "#4caf50" if p["type"] in ("golden_cross", "breakout") else "#f44336"
         shape = "arrowUp" if p["type"] in ("golden_cross", "breakout") else "arrowDown"
 
         markers.append(
             {
-                "time": _format_time(p["date"]),
+                "time": t,
                 "position": "aboveBar" if shape == "arrowUp" else "belowBar",
                 "color": color,
                 "shape": shape,
@@ -67,14 +176,18 @@ def render_price_chart(
     df: pd.DataFrame,
     patterns: List[Dict] | None = None,
     ema_periods: tuple[int, int] = (20, 50),
+    max_points: int = MAX_CHART_POINTS,
 ) -> None:
     """
     Render interactive candlestick chart with EMAs and patterns.
+
+    Pass the add_indicators() frame to reuse its ema_* columns.
     """
+    data = payload_records(build_chart_payload(df, ema_periods, max_points))
 
     candle = {
         "type": "Candlestick",
-        "data": _ohlc_series(df),
+        "data": data["candles"],
     }
 
     series = [candle]
@@ -83,7 +196,7 @@ def render_price_chart(
         series.append(
             {
                 "type": "Line",
-                "data": _ema_series(df, p),
+                "data": data[f"ema_{p}"],
                 "options": {
                     "lineWidth": 2,
                 },
@@ -91,7 +204,8 @@ def render_price_chart(
         )
 
     if patterns:
-        candle["markers"] = _pattern_markers(patterns)
+        daily = bool(data["candles"]) and isinstance(data["candles"][0]["time"], str)
+        candle["markers"] = _pattern_markers(patterns, daily)
 
     chart = {
         "width": 0,
@@ -114,4 +228,4 @@ def render_price_chart(
         "series": series,
     }
 
-    renderLightweightCharts([chart])
\ No newline at end of file
+    renderLightweightCharts([chart])
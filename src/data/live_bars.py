@@ -0,0 +1,370 @@
+# src/data/live_bars.py
+"""
+Live Bar Aggregator — turns a trade / quote stream into rolling OHLCV bars.
+
+Ticks are folded into 1m / 5m / 15m bars as they arrive. When a tick lands
+in a new bucket (or close_due() is called after a quiet spell) the open bar
+is closed and every registered on_bar_close callback fires — so intraday
+setups are re-evaluated once per closed bar instead of on every click.
+
+Closed 5m bars can be written into the ticker's local bar pyramid
+(src/data/resample.py), which is what the dashboard's intraday setup reads.
+They are written in batches (STORE_BATCH bars per update_pyramid call),
+since every call reloads and rewrites each pyramid level.
+
+A recorded tick file stands in for the live stream:
+
+    python -m src.data.live_bars HDFCBANK.NS --replay ticks.csv
+
+Tick file format (CSV or JSONL): ts, price[, volume]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from src.data.resample import normalize_bars, update_pyramid
+from src.utils.config import MARKET_OPEN, MARKET_TIMEZONE
+from src.utils.logger import get_logger
+
+logger = get_logger("live_bars")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────────────────────────────────────
+
+INTERVALS = {
+    "1m":  pd.Timedelta(minutes=1),
+    "5m":  pd.Timedelta(minutes=5),
+    "15m": pd.Timedelta(minutes=15),
+}
+
+STORE_INTERVAL = "5m"             # finest level kept in the bar pyramid
+STORE_BATCH = 3                   # closed 5m bars per pyramid write (= one 15m bar)
+
+BarCallback = Callable[[str, Dict], None]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Aggregator
+# ─────────────────────────────────────────────────────────────────────────────
+
+class BarAggregator:
+    """
+    Rolling OHLCV bars for several intervals from one tick stream.
+
+    Args:
+        ticker    : symbol (store key when `store` is on)
+        intervals : subset of INTERVALS
+        max_bars  : closed bars kept in memory per interval
+        store     : append closed 5m bars to the local bar pyramid
+        store_batch : closed 5m bars buffered per pyramid write; flush()
+                      writes whatever is pending
+    """
+
+    def __init__(
+        self,
+        ticker: str,
+        intervals: Iterable[str] = ("1m", "5m", "15m"),
+        max_bars: int = 500,
+        store: bool = False,
+        store_batch: int = STORE_BATCH,
+    ):
+        self.ticker = ticker
+        self.intervals = list(intervals)
+        self.store = store and STORE_INTERVAL in self.intervals
+        self.store_batch = max(int(store_batch), 1)
+        self._open: Dict[str, Optional[Dict]] = {iv: None for iv in self.intervals}
+        self._closed: Dict[str, deque] = {iv: deque(maxlen=max_bars) for iv in self.intervals}
+        self._callbacks: List[BarCallback] = []
+        self._pending: List[Dict] = []
+        self._last_cum_volume: Optional[float] = None
+        self._last_cum_day = None
+
+    # ── Subscriptions ────────────────────────────────────────────────────────
+
+    def on_bar_close(self, callback: BarCallback) -> None:
+        """
+        Register callback(interval, bar) fired for every closed bar.
+        """
+        self._callbacks.append(callback)
+
+    # ── Input ────────────────────────────────────────────────────────────────
+
+    def add_tick(
+        self,
+        ts,
+        price: float,
+        volume: float = 0.0,
+        cum_volume: Optional[float] = None,
+    ) -> List[Tuple[str, Dict]]:
+        """
+        Fold one trade / quote into every interval.
+
+        Quote feeds usually carry day-cumulative volume: pass it as
+        `cum_volume` and the per-tick volume is derived from the change. The
+        first tick of a session (new day, or the counter reset) carries the
+        whole cum_volume. So does the first tick after start, if it falls in
+        the session's opening bar. A stream joined mid-session starts
+        counting from its first tick.
+
+        Returns the (interval, bar) pairs closed by this tick.
+        """
+        ts = _to_market_time(ts)
+        price = float(price)
+
+        if cum_volume is not None:
+            cum_volume = float(cum_volume)
+            prev = self._last_cum_volume
+            if prev is not None and ts.date() == self._last_cum_day and cum_volume >= prev:
+                volume = cum_volume - prev
+            elif prev is not None or ts < _session_open(ts) + min(INTERVALS[iv] for iv in self.intervals):
+                volume = cum_volume
+            else:
+                volume = 0.0
+            self._last_cum_volume = cum_volume
+            self._last_cum_day = ts.date()
+
+        closed = []
+        for iv in self.intervals:
+            bar = self._open[iv]
+
+            # Fast path: tick inside the open bar (no bucket arithmetic)
+            if bar is not None and bar["date"] <= ts < bar["date"] + INTERVALS[iv]:
+                bar["high"] = max(bar["high"], price)
+                bar["low"] = min(bar["low"], price)
+                bar["close"] = price
+                bar["volume"] += float(volume)
+                continue
+
+            start = _bucket(ts, iv)
+
+            if bar is not None and start > bar["date"]:
+                closed.append((iv, self._close(iv)))
+                bar = None
+
+            if bar is None:
+                self._open[iv] = {
+                    "date": start, "open": price, "high": price,
+                    "low": price, "close": price, "volume": float(volume),
+                }
+            # else: tick older than the open bar — a late print, dropped
+
+        self._emit(closed)
+        return closed
+
+    def close_due(self, now) -> List[Tuple[str, Dict]]:
+        """
+        Close bars whose interval has ended by `now` (no tick needed).
+        """
+        now = _to_market_time(now)
+        closed = [
+            (iv, self._close(iv))
+            for iv in self.intervals
+            if self._open[iv] is not None and self._open[iv]["date"] + INTERVALS[iv] <= now
+        ]
+        self._emit(closed)
+        return closed
+
+    def flush(self) -> List[Tuple[str, Dict]]:
+        """
+        Close every open bar (end of stream / session) and write any
+        pending bars to the pyramid.
+        """
+        closed = [(iv, self._close(iv)) for iv in self.intervals if self._open[iv] is not None]
+        self.store_pending()
+        self._emit(closed)
+        return closed
+
+    def store_pending(self) -> int:
+        """
+        Write buffered closed 5m bars to the bar pyramid in one
+        update_pyramid call. Returns bars written.
+        """
+        if not self._pending:
+            return 0
+        bars, self._pending = self._pending, []
+        try:
+            update_pyramid(self.ticker, fine_df=pd.DataFrame(bars), base_level=STORE_INTERVAL)
+        except Exception as exc:
+            logger.warning(f"{self.ticker}: {len(bars)} bars not stored ({exc})")
+            return 0
+        return len(bars)
+
+    def seed(self, interval: str, df: pd.DataFrame) -> None:
+        """
+        Preload closed history (e.g. the pyramid's 15m bars) so setups have
+        enough context from the first live bar.
+        """
+        bars = normalize_bars(df)[["date", "open", "high", "low", "close", "volume"]]
+        self._closed[interval].extend(bars.to_dict("records"))
+
+    # ── Output ───────────────────────────────────────────────────────────────
+
+    def bars(self, interval: str, include_open: bool = False) -> pd.DataFrame:
+        """
+        Closed bars of one interval (plus the forming bar if asked).
+        """
+        rows = list(self._closed[interval])
+        if include_open and self._open[interval] is not None:
+            rows.append(dict(self._open[interval]))
+        return pd.DataFrame(rows, columns=["date", "open", "high", "low", "close", "volume"])
+
+    # ── Internals ────────────────────────────────────────────────────────────
+
+    def _close(self, interval: str) -> Dict:
+        bar = self._open[interval]
+        self._open[interval] = None
+        self._closed[interval].append(bar)
+
+        if self.store and interval == STORE_INTERVAL:
+            self._pending.append(dict(bar))
+            if len(self._pending) >= self.store_batch:
+                self.store_pending()
+        return bar
+
+    def _emit(self, closed: List[Tuple[str, Dict]]) -> None:
+        for iv, bar in closed:
+            for callback in self._callbacks:
+                callback(iv, bar)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Setup re-evaluation
+# ─────────────────────────────────────────────────────────────────────────────
+
+def watch_intraday_setup(
+    aggregator: BarAggregator,
+    daily_df: pd.DataFrame,
+    on_setup: Callable[[Dict], None],
+    interval: str = "15m",
+) -> None:
+    """
+    Rebuild the intraday setup on each closed `interval` bar only.
+    """
+    from src.domain.setup_engine import build_intraday_setup
+
+    def _on_close(iv: str, bar: Dict) -> None:
+        if iv != interval:
+            return
+        setup = build_intraday_setup(aggregator.bars(interval), daily_df, aggregator.ticker)
+        setup["bar_time"] = bar["date"]
+        on_setup(setup)
+
+    aggregator.on_bar_close(_on_close)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Recorded streams
+# ─────────────────────────────────────────────────────────────────────────────
+
+def read_ticks(path: str | Path) -> Iterator[Dict]:
+    """
+    Yield ticks from a recorded CSV or JSONL file (ts, price[, volume]).
+    """
+    path = Path(path)
+    if path.suffix in (".jsonl", ".json"):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    for row in pd.read_csv(path).to_dict("records"):
+        yield row
+
+
+def record_ticks(ticks: Iterable[Dict], path: str | Path) -> int:
+    """
+    Append ticks to a JSONL file for later replay. Returns rows written.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    n = 0
+    with open(path, "a") as f:
+        for tick in ticks:
+            f.write(json.dumps(tick, default=str) + "\n")
+            n += 1
+    return n
+
+
+def replay_ticks(
+    aggregator: BarAggregator,
+    ticks: Iterable[Dict],
+    flush: bool = True,
+) -> int:
+    """
+    Feed recorded ticks through the aggregator as if they were live.
+    """
+    n = 0
+    for tick in ticks:
+        aggregator.add_tick(
+            tick["ts"],
+            tick["price"],
+            volume=tick.get("volume", 0.0) or 0.0,
+            cum_volume=tick.get("cum_volume"),
+        )
+        n += 1
+    if flush:
+        aggregator.flush()
+    return n
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _to_market_time(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    if ts.tz is None:
+        return ts.tz_localize(MARKET_TIMEZONE)
+    return ts.tz_convert(MARKET_TIMEZONE)
+
+
+def _session_open(ts: pd.Timestamp) -> pd.Timestamp:
+    hour, minute = map(int, MARKET_OPEN.split(":"))
+    return ts.normalize() + pd.Timedelta(hours=hour, minutes=minute)
+
+
+def _bucket(ts: pd.Timestamp, interval: str) -> pd.Timestamp:
+    # 1m / 5m / 15m all divide the 09:15 open, so a plain floor is anchored
+    return ts.floor(INTERVALS[interval])
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    from src.data.prices import load_prices
+    from src.data.resample import load_bars
+
+    parser = argparse.ArgumentParser(description="Replay a recorded tick stream into bars")
+    parser.add_argument("ticker", help="Yahoo ticker, e.g. HDFCBANK.NS")
+    parser.add_argument("--replay", required=True, help="Recorded tick file (CSV / JSONL)")
+    parser.add_argument("--store", action="store_true", help="Write closed 5m bars to the bar pyramid")
+    args = parser.parse_args()
+
+    aggregator = BarAggregator(args.ticker, store=args.store)
+    aggregator.seed("15m", load_bars(args.ticker, "15m"))
+
+    def _print(setup: Dict) -> None:
+        logger.info(
+            f"{setup['bar_time']} {setup['bias']} entry={setup['entry_zone']} "
+            f"SL={setup['stop_loss']} T1={setup['target_1']}"
+        )
+
+    watch_intraday_setup(aggregator, load_prices(args.ticker, "1y"), _print)
+    n = replay_ticks(aggregator, read_ticks(args.replay))
+    logger.info(f"Replayed {n} ticks → {len(aggregator.bars('15m'))} 15m bars")
+
+
+if __name__ == "__main__":
+    main()
@@ -165,17 +165,17 @@ def fetch_news(
 
                 try:
                     ps = entry.get("published_parsed")
-                    published = (
-                        datetime(*ps[:6], tzinfo=timezone.utc).strftime("%d %b %Y, %H:%M")
-                        if ps else "—"
-                    )
+                    published_dt = datetime(*ps[:6], tzinfo=timezone.utc) if ps else None
                 except Exception:
-                    published = "—"
+                    published_dt = None
+                published = published_dt.strftime("%d %b %Y, %H:%M") if published_dt else "—"
+                published_ts = published_dt.isoformat() if published_dt else ""
 
                 results.append({
                     "headline":  title,
                     "source":    entry.get("source", {}).get("title", "News"),
                     "published": published,
+                    "published_ts": published_ts,
                     "url":       entry.get("link", ""),
                 })
                 if len(results) >= max_items:
@@ -227,6 +227,7 @@ def analyze_news_sentiment(news_items: List[Dict]) -> Dict:
             "headline":     headline,
             "source":       item.get("source", "—"),
             "published":    item.get("published", "—"),
+            "published_ts": item.get("published_ts", ""),
             "url":          item.get("url", ""),
             "label":        label,
             "confidence":   conf,
@@ -299,8 +300,25 @@ def get_news_signal(
     company: str,
     ticker: str = "",
     max_items: int = 10,
+    archive: bool = False,
 ) -> Dict:
+    """
+    Fetch and score live headlines for a stock.
+
+    With archive=True the scored headlines are also appended to the local
+    news archive (src/data/news_archive.py) so they can be replayed
+    point-in-time by the backtester later.
+    """
     items  = fetch_news(company, ticker=ticker, max_items=max_items)
     result = analyze_news_sentiment(items)
     result["headlines"] = [d["headline"] for d in result["details"]]
+
+    if archive and ticker:
+        try:
+            from src.data.news_archive import append_scored_news
+            append_scored_news(ticker, result["details"])
+        except Exception:
+            # Archiving is best-effort — never break the live signal
+            pass
+
     return result
@@ -0,0 +1,326 @@
+# src/data/news_archive.py
+"""
+News Archive — append-only local store of scored headlines.
+
+The live news engine (src/data/news.py) only ever sees the current RSS
+snapshot. This module keeps every scored headline it has seen, one CSV per
+ticker, so sentiment can be replayed point-in-time for backtesting.
+
+Layout:
+    data/news_archive/<TICKER>.csv   (one row per headline, append-only)
+
+Point-in-time rule:
+    A headline counts towards trading day D if it was published on D before
+    the NSE close (15:30 IST), or after the close on D-1. Headlines without a
+    publish time fall back to the moment they were archived, so the archive
+    never leaks a headline into a day before it was actually seen.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import DATA_DIR
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────────────────────────────────────
+
+ARCHIVE_DIR = DATA_DIR / "news_archive"
+
+_MARKET_TZ = "Asia/Kolkata"
+
+# Shifting IST timestamps by (24:00 − 15:30) rolls post-close news into the
+# next calendar day when the timestamp is normalised to midnight.
+_POST_CLOSE_SHIFT = pd.Timedelta(hours=8, minutes=30)
+
+_COLUMNS = [
+    "key",
+    "ticker",
+    "published",
+    "archived_at",
+    "headline",
+    "source",
+    "url",
+    "label",
+    "confidence",
+    "impact_type",
+    "weight",
+    "signed_score",
+]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Writing
+# ─────────────────────────────────────────────────────────────────────────────
+
+def archive_path(ticker: str) -> Path:
+    """
+    Resolve the archive file for a ticker.
+    """
+    return ARCHIVE_DIR / f"{ticker.replace('/', '_')}.csv"
+
+
+def append_scored_news(
+    ticker: str,
+    details: Iterable[Dict],
+    archived_at: Optional[datetime] = None,
+) -> int:
+    """
+    Append scored headlines to the ticker's archive.
+
+    Args:
+        ticker      : Yahoo ticker, e.g. "HDFCBANK.NS"
+        details     : the "details" list from analyze_news_sentiment()
+        archived_at : archive timestamp (defaults to now, UTC)
+
+    Headlines already present (same text + publish time) are skipped, so
+    calling this on every refresh of the same RSS feed is safe.
+
+    Returns:
+        Number of new rows written.
+    """
+    archived_at = archived_at or datetime.now(timezone.utc)
+    path = archive_path(ticker)
+
+    existing_keys = set()
+    if path.exists():
+        existing_keys = set(pd.read_csv(path, usecols=["key"])["key"])
+
+    rows = []
+    for d in details:
+        published_ts = d.get("published_ts") or ""
+        key = _headline_key(d["headline"], published_ts)
+        if key in existing_keys:
+            continue
+        existing_keys.add(key)
+
+        rows.append({
+            "key":          key,
+            "ticker":       ticker,
+            "published":    published_ts or archived_at.isoformat(),
+            "archived_at":  archived_at.isoformat(),
+            "headline":     d["headline"],
+            "source":       d.get("source", "—"),
+            "url":          d.get("url", ""),
+            "label":        d["label"],
+            "confidence":   float(d["confidence"]),
+            "impact_type":  d.get("impact_type", "General"),
+            "weight":       float(d.get("weight", 0.6)),
+            "signed_score": float(d.get("signed_score", 0.0)),
+        })
+
+    if not rows:
+        return 0
+
+    ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame(rows, columns=_COLUMNS).to_csv(
+        path,
+        mode="a",
+        header=not path.exists(),
+        index=False,
+    )
+    return len(rows)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Reading
+# ─────────────────────────────────────────────────────────────────────────────
+
+def load_news_archive(ticker: str) -> pd.DataFrame:
+    """
+    Load the full archive for a ticker in a single read.
+
+    Adds:
+        published   : tz-aware UTC timestamp
+        trade_date  : trading day the headline can first influence (naive date)
+        signed_raw  : ±confidence (unweighted), 0 for NEUTRAL
+    """
+    path = archive_path(ticker)
+    if not path.exists():
+        return pd.DataFrame(columns=_COLUMNS + ["trade_date", "signed_raw"])
+
+    df = pd.read_csv(path)
+    df["published"] = pd.to_datetime(df["published"], utc=True, errors="coerce")
+    df["archived_at"] = pd.to_datetime(df["archived_at"], utc=True, errors="coerce")
+    df["published"] = df["published"].fillna(df["archived_at"])
+
+    local = df["published"].dt.tz_convert(_MARKET_TZ).dt.tz_localize(None)
+    df["trade_date"] = (local + _POST_CLOSE_SHIFT).dt.normalize()
+
+    sign = np.select(
+        [df["label"] == "POSITIVE", df["label"] == "NEGATIVE"],
+        [1.0, -1.0],
+        default=0.0,
+    )
+    df["signed_raw"] = sign * df["confidence"]
+
+    return df.sort_values("published").reset_index(drop=True)
+
+
+def sentiment_as_of(
+    ticker: str,
+    as_of,
+    lookback_days: int = 3,
+    archive: Optional[pd.DataFrame] = None,
+) -> Dict:
+    """
+    Reconstruct the news signal as it would have looked on trading day `as_of`.
+
+    Only headlines whose trade_date falls within the `lookback_days` calendar
+    days ending on `as_of` are used. The result has the same shape as
+    analyze_news_sentiment(), so it can be fed straight into
+    predict_news_price_impact() or make_final_decision().
+
+    Args:
+        ticker        : Yahoo ticker
+        as_of         : date-like (the trading day being decided)
+        lookback_days : calendar-day window of headlines to aggregate
+        archive       : pre-loaded load_news_archive() frame (optional)
+    """
+    from src.data.news import _build_summary, _empty_sentiment
+
+    df = archive if archive is not None else load_news_archive(ticker)
+    if df.empty:
+        return _empty_sentiment()
+
+    day = _to_day(as_of)
+    start = day - pd.Timedelta(days=lookback_days - 1)
+
+    window = df[(df["trade_date"] >= start) & (df["trade_date"] <= day)]
+    if window.empty:
+        return _empty_sentiment()
+
+    bull_count    = int((window["label"] == "POSITIVE").sum())
+    bear_count    = int((window["label"] == "NEGATIVE").sum())
+    neutral_count = len(window) - bull_count - bear_count
+
+    avg_raw      = float(window["signed_raw"].mean())
+    avg_weighted = float(window["signed_score"].mean())
+
+    details: List[Dict] = [
+        {
+            "headline":     r.headline,
+            "source":       r.source,
+            "published":    r.published.strftime("%d %b %Y, %H:%M"),
+            "published_ts": r.published.isoformat(),
+            "url":          "" if pd.isna(r.url) else r.url,
+            "label":        r.label,
+            "confidence":   float(r.confidence),
+            "impact_type":  r.impact_type,
+            "weight":       float(r.weight),
+            "signed_score": float(r.signed_score),
+        }
+        for r in window.itertuples(index=False)
+    ]
+
+    bullish_items = [d for d in details if d["label"] == "POSITIVE"]
+    bearish_items = [d for d in details if d["label"] == "NEGATIVE"]
+
+    return {
+        "sentiment_score": round(avg_raw, 3),
+        "weighted_score":  round(avg_weighted, 3),
+        "bull_count":      bull_count,
+        "bear_count":      bear_count,
+        "neutral_count":   neutral_count,
+        "top_bullish":     max(bullish_items, key=lambda x: x["signed_score"], default=None),
+        "top_bearish":     min(bearish_items, key=lambda x: x["signed_score"], default=None),
+        "summary":         _build_summary(avg_weighted, bull_count, bear_count, neutral_count),
+        "details":         details,
+        "headlines":       [d["headline"] for d in details],
+    }
+
+
+def daily_sentiment_series(
+    ticker: str,
+    dates: Optional[Iterable] = None,
+    lookback_days: int = 3,
+) -> pd.DataFrame:
+    """
+    Point-in-time daily sentiment for a whole history in one read.
+
+    Row D of the output equals sentiment_as_of(ticker, D, lookback_days)
+    for the scalar fields, computed with a single groupby + rolling sum.
+
+    Args:
+        ticker        : Yahoo ticker
+        dates         : dates to align to (e.g. price_df["date"]); defaults
+                        to every calendar day covered by the archive
+        lookback_days : calendar-day window of headlines to aggregate
+
+    Returns DataFrame indexed by date with columns:
+        sentiment_score, weighted_score,
+        bull_count, bear_count, neutral_count, n_headlines
+    """
+    out_cols = [
+        "sentiment_score", "weighted_score",
+        "bull_count", "bear_count", "neutral_count", "n_headlines",
+    ]
+
+    if dates is not None:
+        idx = pd.DatetimeIndex([_to_day(d) for d in dates])
+    else:
+        idx = None
+
+    df = load_news_archive(ticker)
+    if df.empty:
+        empty_idx = idx if idx is not None else pd.DatetimeIndex([])
+        out = pd.DataFrame(0.0, index=empty_idx, columns=out_cols)
+        out.index.name = "date"
+        return out
+
+    daily = df.assign(
+        bull=(df["label"] == "POSITIVE").astype(float),
+        bear=(df["label"] == "NEGATIVE").astype(float),
+        neutral=(df["label"] == "NEUTRAL").astype(float),
+        n=1.0,
+    ).groupby("trade_date")[["signed_raw", "signed_score", "bull", "bear", "neutral", "n"]].sum()
+
+    first, last = daily.index.min(), daily.index.max()
+    if idx is not None and len(idx):
+        first, last = min(first, idx.min()), max(last, idx.max())
+    calendar = pd.date_range(first, last, freq="D")
+
+    rolled = (
+        daily.reindex(calendar, fill_value=0.0)
+        .rolling(lookback_days, min_periods=1)
+        .sum()
+    )
+
+    n = rolled["n"].replace(0.0, np.nan)
+    out = pd.DataFrame({
+        "sentiment_score": (rolled["signed_raw"] / n).fillna(0.0).round(3),
+        "weighted_score":  (rolled["signed_score"] / n).fillna(0.0).round(3),
+        "bull_count":      rolled["bull"].astype(int),
+        "bear_count":      rolled["bear"].astype(int),
+        "neutral_count":   rolled["neutral"].astype(int),
+        "n_headlines":     rolled["n"].astype(int),
+    })
+
+    if idx is not None:
+        out = out.reindex(idx).fillna(0)
+    out.index.name = "date"
+    return out
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _to_day(value) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert(_MARKET_TZ).tz_localize(None)
+    return ts.normalize()
+
+
+def _headline_key(headline: str, published: str) -> str:
+    raw = f"{headline.strip().lower()}|{published}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
@@ -0,0 +1,288 @@
+# src/data/resample.py
+"""
+OHLCV Resampling — one local bar pyramid per ticker.
+
+    5m → 15m → 1h → 1d → 1w
+
+Every level is derived from the level below with a vectorised groupby
+(first / max / min / last / sum), so intraday setups, swing setups, weekly
+context and charts all read from the same bars instead of separate
+downloads. Buckets are anchored to the NSE session:
+
+    15m : 09:15, 09:30, …           (IST)
+    1h  : 09:15, 10:15, … 15:15     (IST, session-anchored)
+    1d  : IST calendar day           (naive date, like daily downloads)
+    1w  : Monday of the ISO week     (naive date)
+
+The pyramid is cached per ticker and updated incrementally: new fine bars
+only rebuild the buckets they fall into, level by level.
+
+Layout:
+    data/bars/<TICKER>/<level>.parquet   (.csv when pyarrow is missing)
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+from src.utils.config import DATA_DIR, MARKET_TIMEZONE
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────────────────────────────────────
+
+BARS_DIR = DATA_DIR / "bars"
+
+LEVELS = ["5m", "15m", "1h", "1d", "1w"]
+INTRADAY_LEVELS = {"5m", "15m", "1h"}
+
+FINE_RETENTION_DAYS = 120         # intraday levels are trimmed to this window
+
+_SESSION_OPEN = pd.Timedelta(hours=9, minutes=15)
+
+_AGG = {
+    "open":   "first",
+    "high":   "max",
+    "low":    "min",
+    "close":  "last",
+    "volume": "sum",
+}
+
+try:
+    import pyarrow  # noqa: F401
+    _STORE_SUFFIX = ".parquet"
+except ImportError:
+    _STORE_SUFFIX = ".csv"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────────────────────────────────────
+
+def resample_ohlcv(df: pd.DataFrame, level: str) -> pd.DataFrame:
+    """
+    Aggregate OHLCV bars into `level` buckets.
+
+    Args:
+        df    : bars with date, open, high, low, close, volume
+                (intraday dates tz-aware or naive IST)
+        level : one of LEVELS
+
+    Returns:
+        DataFrame(date, open, high, low, close, volume) sorted by date.
+    """
+    if df.empty:
+        return _empty(level)
+
+    df = normalize_bars(df)
+    bucket = bucket_start(df["date"], level)
+
+    out = (
+        df[list(_AGG)]
+        .groupby(bucket.rename("date"), sort=True)
+        .agg(_AGG)
+        .reset_index()
+    )
+    return out
+
+
+def bucket_start(dates: pd.Series, level: str) -> pd.Series:
+    """
+    Start of the `level` bucket each timestamp falls in.
+    """
+    if level == "5m":
+        return dates.dt.floor("5min")
+    if level == "15m":
+        return dates.dt.floor("15min")
+    if level == "1h":
+        day = dates.dt.normalize()
+        return day + _SESSION_OPEN + ((dates - day - _SESSION_OPEN) // pd.Timedelta(hours=1)) * pd.Timedelta(hours=1)
+
+    days = _naive_days(dates)
+    if level == "1d":
+        return days
+    if level == "1w":
+        return days - pd.to_timedelta(days.dt.weekday, unit="D")
+
+    raise ValueError(f"Unsupported level: {level}")
+
+
+def normalize_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Flat schema with a "date" column; intraday stamps in IST.
+
+    yfinance intraday frames come back with a "datetime" column, daily
+    frames with "date" — both are accepted.
+    """
+    if "date" not in df.columns and "datetime" in df.columns:
+        df = df.rename(columns={"datetime": "date"})
+
+    dates = pd.to_datetime(df["date"])
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert(MARKET_TIMEZONE)
+    elif not (dates == dates.dt.normalize()).all():
+        dates = dates.dt.tz_localize(MARKET_TIMEZONE)
+
+    df = df.assign(date=dates)
+    return df.sort_values("date").reset_index(drop=True)
+
+
+def update_pyramid(
+    ticker: str,
+    fine_df: Optional[pd.DataFrame] = None,
+    daily_df: Optional[pd.DataFrame] = None,
+    base_level: str = "5m",
+) -> Dict[str, pd.DataFrame]:
+    """
+    Merge new bars into the ticker's pyramid and persist it.
+
+    Args:
+        ticker     : store key
+        fine_df    : new intraday bars at `base_level` (overlaps are fine;
+                     newer rows replace stored ones)
+        daily_df   : daily history to seed the 1d level for days not covered
+                     by intraday bars (e.g. a 1-year daily download)
+        base_level : resolution of fine_df ("5m" or "15m")
+
+    Returns {level: DataFrame} for every level.
+    """
+    pyramid = load_pyramid(ticker)
+    start = LEVELS.index(base_level)
+    dirty: Dict[str, pd.Timestamp] = {}
+
+    if fine_df is not None and not fine_df.empty:
+        fine = resample_ohlcv(fine_df, base_level)
+        pyramid[base_level] = _merge(pyramid[base_level], fine)
+        pyramid[base_level] = _trim(pyramid[base_level])
+        since = fine["date"].min()
+
+        for parent, child in zip(LEVELS[start:], LEVELS[start + 1:]):
+            since = bucket_start(pd.Series([since]), child).iloc[0]
+            parent_df = pyramid[parent]
+            parent_since = since if child in INTRADAY_LEVELS else _as_parent_time(since, parent)
+            fresh = resample_ohlcv(parent_df[parent_df["date"] >= parent_since], child)
+            pyramid[child] = _merge(pyramid[child][pyramid[child]["date"] < since], fresh)
+            if child in INTRADAY_LEVELS:
+                pyramid[child] = _trim(pyramid[child])
+            dirty[child] = since
+        dirty[base_level] = fine["date"].min()
+
+    if daily_df is not None and not daily_df.empty:
+        seeded = _seed_daily(pyramid["1d"], pyramid[base_level], daily_df)
+        if not seeded.equals(pyramid["1d"]):
+            pyramid["1d"] = seeded
+            pyramid["1w"] = resample_ohlcv(seeded, "1w")
+            dirty["1d"] = dirty["1w"] = seeded["date"].min()
+
+    for level in dirty:
+        _write(ticker, level, pyramid[level])
+
+    return pyramid
+
+
+def load_pyramid(ticker: str) -> Dict[str, pd.DataFrame]:
+    """
+    Every stored level for a ticker (empty frames where missing).
+    """
+    return {level: load_bars(ticker, level) for level in LEVELS}
+
+
+def load_bars(ticker: str, level: str) -> pd.DataFrame:
+    """
+    Stored bars of one level (empty frame if none).
+    """
+    path = bars_path(ticker, level)
+    if not path.exists():
+        return _empty(level)
+
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+        dates = pd.to_datetime(df["date"], utc=level in INTRADAY_LEVELS)
+        df["date"] = dates.dt.tz_convert(MARKET_TIMEZONE) if level in INTRADAY_LEVELS else dates
+
+    return df
+
+
+def bars_path(ticker: str, level: str) -> Path:
+    """
+    Resolve the store file for a (ticker, level) pair.
+    """
+    return BARS_DIR / ticker.replace("/", "_") / f"{level}{_STORE_SUFFIX}"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _empty(level: str) -> pd.DataFrame:
+    dtype = f"datetime64[ns, {MARKET_TIMEZONE}]" if level in INTRADAY_LEVELS else "datetime64[ns]"
+    return pd.DataFrame({
+        "date":   pd.Series(dtype=dtype),
+        **{c: pd.Series(dtype=float) for c in _AGG},
+    })
+
+
+def _naive_days(dates: pd.Series) -> pd.Series:
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert(MARKET_TIMEZONE).dt.tz_localize(None)
+    return dates.dt.normalize()
+
+
+def _as_parent_time(since: pd.Timestamp, parent: str) -> pd.Timestamp:
+    # Daily/weekly bucket starts are naive; intraday parents are IST-aware
+    if parent in INTRADAY_LEVELS:
+        return since.tz_localize(MARKET_TIMEZONE)
+    return since
+
+
+def _merge(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    if old.empty:
+        return new.reset_index(drop=True)
+    if new.empty:
+        return old.reset_index(drop=True)
+    merged = pd.concat([old, new], ignore_index=True)
+    merged = merged.drop_duplicates(subset="date", keep="last")
+    return merged.sort_values("date").reset_index(drop=True)
+
+
+def _trim(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        return df
+    cutoff = df["date"].max() - pd.Timedelta(days=FINE_RETENTION_DAYS)
+    return df[df["date"] >= cutoff].reset_index(drop=True)
+
+
+def _seed_daily(
+    stored_daily: pd.DataFrame,
+    fine: pd.DataFrame,
+    daily_df: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Merge daily-download rows for days without intraday coverage; days built
+    from intraday bars (the finer source) are kept as they are. Downloaded
+    rows replace earlier seeded ones, so a partial bar seeded mid-session is
+    corrected by the next download.
+    """
+    seed = resample_ohlcv(daily_df, "1d")
+    if not fine.empty:
+        covered = set(_naive_days(fine["date"]))
+        seed = seed[~seed["date"].isin(covered)]
+    return _merge(stored_daily, seed)
+
+
+def _write(ticker: str, level: str, df: pd.DataFrame) -> None:
+    path = bars_path(ticker, level)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+
+    if path.suffix == ".parquet":
+        df.to_parquet(tmp, index=False)
+    else:
+        df.to_csv(tmp, index=False)
+    tmp.replace(path)
@@ -1,9 +1,18 @@
 # src/dl/dataset.py
 
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
 import torch
 from torch.utils.data import Dataset
-import pandas as pd
-from typing import List
+
+from src.utils.config import DATA_DIR
+
+
+WINDOW_DIR = DATA_DIR / "dl_windows"
 
 
 class TimeSeriesDataset(Dataset):
@@ -54,4 +63,141 @@ class TimeSeriesDataset(Dataset):
         x_tensor = torch.tensor(x, dtype=torch.float32)
         y_tensor = torch.tensor([y], dtype=torch.float32)
 
-        return x_tensor, y_tensor
\ No newline at end of file
+        return x_tensor, y_tensor
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Multi-ticker memory-mapped windows
+# ─────────────────────────────────────────────────────────────────────────────
+
+def build_window_store(
+    frames: Dict[str, pd.DataFrame],
+    feature_cols: List[str],
+    target_col: str,
+    name: str,
+    root: Optional[Path] = None,
+) -> Path:
+    """
+    Write many tickers' features / targets / dates as flat .npy arrays.
+
+    Layout (rows of all tickers back to back):
+        data/dl_windows/<name>/features.npy   (rows, features) float32
+        data/dl_windows/<name>/targets.npy    (rows,) float32
+        data/dl_windows/<name>/dates.npy      (rows,) int64 ns
+        data/dl_windows/<name>/meta.json      tickers, offsets, lengths
+
+    Each frame needs a "date" column and must be free of NaNs.
+    """
+    store = Path(root or WINDOW_DIR) / name
+    store.mkdir(parents=True, exist_ok=True)
+
+    tickers, lengths = [], []
+    features, targets, dates = [], [], []
+    for ticker, df in frames.items():
+        missing = set(feature_cols + [target_col, "date"]) - set(df.columns)
+        if missing:
+            raise ValueError(f"{ticker}: missing columns {missing}")
+
+        tickers.append(ticker)
+        lengths.append(len(df))
+        features.append(df[feature_cols].to_numpy(dtype=np.float32))
+        targets.append(df[target_col].to_numpy(dtype=np.float32))
+        dates.append(pd.DatetimeIndex(df["date"]).as_unit("ns").asi8)
+
+    np.save(store / "features.npy", np.concatenate(features))
+    np.save(store / "targets.npy", np.concatenate(targets))
+    np.save(store / "dates.npy", np.concatenate(dates))
+    (store / "meta.json").write_text(json.dumps({
+        "tickers":      tickers,
+        "lengths":      lengths,
+        "offsets":      np.concatenate([[0], np.cumsum(lengths)[:-1]]).tolist(),
+        "feature_cols": feature_cols,
+        "target_col":   target_col,
+    }, indent=2))
+    return store
+
+
+def chronological_split(
+    store: Path,
+    seq_len: int = 30,
+    val_frac: float = 0.3,
+    embargo: int = 5,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Train / validation window ids (window id = row of its target) split by
+    calendar date across all tickers.
+
+    Validation holds the windows whose target date falls in the last
+    `val_frac` of the pooled dates. The last `embargo` training windows of
+    each ticker before that cutoff are dropped, so no training target
+    (e.g. a 5-day forward return) reaches into the validation period.
+    Windows never cross ticker boundaries.
+    """
+    meta = json.loads((Path(store) / "meta.json").read_text())
+    dates = np.load(Path(store) / "dates.npy", mmap_mode="r")
+
+    ends = np.concatenate([
+        np.arange(offset + seq_len, offset + length)
+        for offset, length in zip(meta["offsets"], meta["lengths"])
+    ]) if meta["lengths"] else np.array([], dtype=np.int64)
+    if len(ends) == 0:
+        raise ValueError(f"No sequences of length {seq_len} in {store}")
+
+    dates = np.asarray(dates)
+    # Cutoff over all rows, so every seq_len gets the same validation targets
+    cutoff = np.quantile(dates, 1.0 - val_frac, method="lower")
+    is_val = dates[ends] > cutoff
+
+    # Purge: drop training windows within `embargo` rows of their ticker's
+    # first validation row (or the end of its history). Dates rise within a
+    # ticker, so its validation rows are a suffix of its block.
+    first_val = np.repeat(
+        np.add(meta["offsets"], meta["lengths"]),
+        [max(length - seq_len, 0) for length in meta["lengths"]],
+    )
+    val_rows = np.flatnonzero(dates > cutoff)
+    nxt = np.searchsorted(val_rows, ends)
+    has_val = nxt < len(val_rows)
+    first_val[has_val] = np.minimum(first_val[has_val], val_rows[nxt[has_val]])
+
+    train = ends[~is_val & (ends + embargo < first_val)]
+    val = ends[is_val]
+    return train, val
+
+
+class MemmapWindowDataset(Dataset):
+    """
+    (seq_len, features) windows read from a build_window_store() store.
+
+    Arrays are memory-mapped lazily in each DataLoader worker, so many
+    tickers' histories can be pooled without holding them in RAM or
+    copying them into worker processes. Sample k is the window ending
+    just before row window_ids[k], with that row's target (the same
+    alignment as TimeSeriesDataset).
+    """
+
+    def __init__(self, store: Path, window_ids: np.ndarray, seq_len: int = 30) -> None:
+        self.store = Path(store)
+        self.window_ids = np.asarray(window_ids, dtype=np.int64)
+        self.seq_len = seq_len
+        self._features = None
+        self._targets = None
+
+    def __len__(self) -> int:
+        return len(self.window_ids)
+
+    def __getitem__(self, idx: int):
+        if self._features is None:
+            self._features = np.load(self.store / "features.npy", mmap_mode="r")
+            self._targets = np.load(self.store / "targets.npy", mmap_mode="r")
+
+        end = self.window_ids[idx]
+        x = np.array(self._features[end - self.seq_len:end])
+        y = np.array(self._targets[end:end + 1])
+        return torch.from_numpy(x), torch.from_numpy(y)
+
+    def __getstate__(self):
+        # Workers re-open their own memory maps
+        state = self.__dict__.copy()
+        state["_features"] = state["_targets"] = None
+        return state
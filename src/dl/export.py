@@ -0,0 +1,357 @@
+# src/dl/export.py
+"""
+DL Model Export — int8 / TorchScript serving variants of the LSTM and TCN.
+
+The trained models are float32 state dicts that are loaded into eager
+modules. For CPU serving every model is exported to two variants next to
+its .pt file:
+
+    models/lstm_HDFCBANK_NS.script.pt   TorchScript, float32
+    models/lstm_HDFCBANK_NS.int8.pt     TorchScript, dynamically quantized
+                                        (int8 weights for LSTM + Linear)
+    models/lstm_HDFCBANK_NS.export.json parity report
+
+Dynamic quantization covers nn.LSTM and nn.Linear only; the TCN's Conv1d
+layers stay float32, so its int8 variant only shrinks the regressor head.
+
+Each variant is compared with the float model on a batch of 30-bar windows
+(max |deviation| and how often the sign of the predicted return agrees —
+the decision engine only looks at the sign) and timed on single windows.
+Exports run only from training (src/dl/train.py, src/dl/hpo.py) and this
+CLI. load_serving_model() is the request-path entry point and only reads
+the parity report: it returns whichever of float / TorchScript / int8
+passed with the lowest latency, and the float model when the report is
+missing or older than the source .pt. On tiny models int8 is not always
+faster — the per-call quantize / dequantize can outweigh the smaller
+matmuls — so the choice is measured rather than assumed.
+
+Run (export + benchmark the default models):
+    python -m src.dl.export
+    python -m src.dl.export --ticker HDFCBANK.NS     # parity on real windows
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import time
+import warnings
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import torch
+
+from src.dl.lstm import load_model as load_lstm
+from src.dl.temporal_cnn import load_model as load_tcn
+from src.utils.logger import get_logger
+
+logger = get_logger("dl_export")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────────────────────────────────────
+
+WINDOW = 30
+TOLERANCE = 2e-3                  # max |deviation| in predicted return
+SIGN_AGREEMENT = 0.98             # min share of windows with the same sign
+
+VARIANTS = ("script", "int8")
+LATENCY_REPEATS = 50
+
+_LOADERS: Dict[str, Callable[..., torch.nn.Module]] = {
+    "lstm": load_lstm,
+    "tcn":  load_tcn,
+}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Export
+# ─────────────────────────────────────────────────────────────────────────────
+
+@torch.no_grad()
+def export_dl_model(
+    kind: str,
+    model_path: str | Path,
+    num_features: int,
+    sample: Optional[np.ndarray] = None,
+    tolerance: float = TOLERANCE,
+) -> Dict:
+    """
+    Write the TorchScript and int8 variants of a trained LSTM / TCN and
+    check them against the float model.
+
+    Args:
+        kind         : "lstm" or "tcn"
+        model_path   : float32 state dict, e.g. models/lstm_HDFCBANK_NS.pt
+        num_features : model input features
+        sample       : (N, T, F) parity windows; seeded N(0, 1) windows
+                       when omitted (harsher than real features)
+        tolerance    : max |deviation| for a variant to pass
+
+    Returns the parity report (also written to <stem>.export.json):
+        kind, source, source_mtime, variants → {file, latency_ms,
+        max_deviation, mean_deviation, sign_agreement, passed}
+    with "float" (the source model) included as the baseline.
+    """
+    model_path = Path(model_path)
+    model = _LOADERS[kind](str(model_path), num_features=num_features)
+
+    if sample is None:
+        sample = np.random.default_rng(0).standard_normal((256, serving_seq_len(model_path), num_features))
+    x = torch.from_numpy(np.array(sample, dtype=np.float32))
+    reference = model(x).squeeze(-1).numpy()
+
+    with warnings.catch_warnings():
+        # torch.ao.quantization is deprecated in favour of torchao
+        warnings.simplefilter("ignore")
+        modules = {
+            "script": torch.jit.trace(model, x[:1]),
+            "int8":   torch.jit.trace(_quantize(model), x[:1]),
+        }
+
+    report = {
+        "kind":         kind,
+        "source":       model_path.name,
+        "source_mtime": model_path.stat().st_mtime,
+        "variants":     {
+            "float": {
+                "file":       model_path.name,
+                "latency_ms": _latency(model, x),
+                **_parity(reference, reference, tolerance),
+            },
+        },
+    }
+    for variant, module in modules.items():
+        path = variant_path(model_path, variant)
+        tmp = _tmp_path(path)
+        torch.jit.save(module, str(tmp))
+        tmp.replace(path)
+
+        loaded = torch.jit.load(str(path))
+        preds = loaded(x).squeeze(-1).numpy()
+        report["variants"][variant] = {
+            "file":       path.name,
+            "latency_ms": _latency(loaded, x),
+            **_parity(reference, preds, tolerance),
+        }
+
+    path = _report_path(model_path)
+    tmp = _tmp_path(path)
+    tmp.write_text(json.dumps(report, indent=2))
+    tmp.replace(path)
+    return report
+
+
+def variant_path(model_path: str | Path, variant: str) -> Path:
+    """
+    models/lstm_HDFCBANK_NS.pt → models/lstm_HDFCBANK_NS.<variant>.pt
+    """
+    model_path = Path(model_path)
+    return model_path.with_name(f"{model_path.stem}.{variant}.pt")
+
+
+def _quantize(model: torch.nn.Module) -> torch.nn.Module:
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.LSTM, torch.nn.Linear}, dtype=torch.qint8,
+    )
+
+
+def _parity(reference: np.ndarray, preds: np.ndarray, tolerance: float) -> Dict:
+    deviation = np.abs(preds - reference)
+    agreement = float(np.mean(np.sign(preds) == np.sign(reference)))
+    return {
+        "max_deviation":  float(deviation.max()),
+        "mean_deviation": float(deviation.mean()),
+        "sign_agreement": round(agreement, 4),
+        "passed":         bool(deviation.max() <= tolerance and agreement >= SIGN_AGREEMENT),
+    }
+
+
+def _latency(model, x: torch.Tensor, repeats: int = LATENCY_REPEATS) -> float:
+    # Mean ms for one window (after a warm-up call)
+    model(x[:1])
+    start = time.perf_counter()
+    for i in range(repeats):
+        model(x[i % len(x)].unsqueeze(0))
+    return round(1000 * (time.perf_counter() - start) / repeats, 4)
+
+
+def _report_path(model_path: Path) -> Path:
+    return model_path.with_name(f"{model_path.stem}.export.json")
+
+
+def _tmp_path(path: Path) -> Path:
+    # One temp file per process / thread, so concurrent exports never share one
+    return path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Serving
+# ─────────────────────────────────────────────────────────────────────────────
+
+def load_serving_model(
+    kind: str,
+    model_path: str | Path,
+    num_features: int,
+    variant: Optional[str] = None,
+) -> torch.nn.Module:
+    """
+    Fastest serving variant of a trained LSTM / TCN that passed parity.
+
+    Never exports: reads the parity report written by export_dl_model().
+    `variant` forces "int8", "script" or "float"; otherwise the passed
+    variant with the lowest measured latency is used (the float model when
+    neither export beats it, or the report is missing or stale).
+    """
+    model_path = Path(model_path)
+    if variant == "float":
+        return _LOADERS[kind](str(model_path), num_features=num_features)
+
+    report = _load_report(model_path)
+    if report is None:
+        logger.info(f"{model_path.name}: no current export, serving float model (run python -m src.dl.export)")
+        return _LOADERS[kind](str(model_path), num_features=num_features)
+
+    if variant is None:
+        passed = {v: r for v, r in report["variants"].items() if r.get("passed")}
+        variant = min(passed, key=lambda v: passed[v]["latency_ms"], default="float")
+
+    path = variant_path(model_path, variant)
+    if variant == "float" or not path.exists():
+        return _LOADERS[kind](str(model_path), num_features=num_features)
+    return torch.jit.load(str(path), map_location="cpu").eval()
+
+
+def serving_seq_len(model_path: str | Path) -> int:
+    """
+    Input window of a model: the tuned seq_len recorded by src/dl/hpo.py,
+    else WINDOW.
+    """
+    path = hpo_config_path(model_path)
+    if not path.exists():
+        return WINDOW
+    return int(json.loads(path.read_text())["params"].get("seq_len", WINDOW))
+
+
+def hpo_config_path(model_path: str | Path) -> Path:
+    """
+    models/lstm_universe.pt → models/lstm_universe.hpo.json
+    """
+    model_path = Path(model_path)
+    return model_path.with_name(f"{model_path.stem}.hpo.json")
+
+
+def _load_report(model_path: Path) -> Optional[Dict]:
+    # Stale when the float model was retrained after the export
+    path = _report_path(model_path)
+    if not path.exists():
+        return None
+    report = json.loads(path.read_text())
+    if model_path.exists() and model_path.stat().st_mtime > report.get("source_mtime", 0):
+        return None
+    return report
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Benchmark
+# ─────────────────────────────────────────────────────────────────────────────
+
+@torch.no_grad()
+def benchmark(
+    kind: str,
+    model_path: str | Path,
+    num_features: int,
+    sample: Optional[np.ndarray] = None,
+    repeats: int = 200,
+) -> Dict[str, Dict]:
+    """
+    Float vs TorchScript vs int8 for one model.
+
+    Returns dict per variant: file_kb, load_ms, latency_ms (one window),
+    batch_ms (whole sample), max_deviation.
+    """
+    model_path = Path(model_path)
+    report = _load_report(model_path) or export_dl_model(kind, model_path, num_features, sample)
+
+    if sample is None:
+        sample = np.random.default_rng(1).standard_normal((256, serving_seq_len(model_path), num_features))
+    x = torch.from_numpy(np.array(sample, dtype=np.float32))
+
+    loaders = {
+        "float":  (model_path, lambda: _LOADERS[kind](str(model_path), num_features=num_features)),
+        **{
+            v: (variant_path(model_path, v), lambda v=v: torch.jit.load(str(variant_path(model_path, v))))
+            for v in VARIANTS
+        },
+    }
+
+    results: Dict[str, Dict] = {}
+    reference = None
+    for name, (path, load) in loaders.items():
+        start = time.perf_counter()
+        model = load()
+        load_ms = 1000 * (time.perf_counter() - start)
+
+        latency_ms = _latency(model, x, repeats)
+
+        start = time.perf_counter()
+        preds = model(x).squeeze(-1).numpy()
+        batch_ms = 1000 * (time.perf_counter() - start)
+
+        reference = preds if reference is None else reference
+        results[name] = {
+            "file_kb":       round(path.stat().st_size / 1024, 1),
+            "load_ms":       round(load_ms, 2),
+            "latency_ms":    latency_ms,
+            "batch_ms":      round(batch_ms, 2),
+            "max_deviation": float(np.abs(preds - reference).max()),
+            "passed":        report["variants"].get(name, {}).get("passed", True),
+        }
+
+    return results
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    from src.pipeline.analysis_service import DEFAULT_MODEL_PATHS
+    from src.pipeline.signal_pipeline import DL_FEATURE_COLS
+
+    parser = argparse.ArgumentParser(description="Export and benchmark int8 / TorchScript DL models")
+    parser.add_argument("--ticker", default=None, help="Check parity on this ticker's feature windows")
+    parser.add_argument("--timeframe", default="2y", choices=["1y", "2y", "5y"])
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    history = None
+    if args.ticker:
+        from src.dl.streaming import _feature_history
+        history = _feature_history(args.ticker, args.timeframe, DL_FEATURE_COLS)
+
+    for kind in ("lstm", "tcn"):
+        path = DEFAULT_MODEL_PATHS[kind]
+        sample = None
+        if history is not None:
+            windows = np.lib.stride_tricks.sliding_window_view(history, serving_seq_len(path), axis=0)
+            sample = windows.transpose(0, 2, 1)
+        report = export_dl_model(kind, path, len(DL_FEATURE_COLS), sample, args.tolerance)
+        print(f"\n{kind.upper()} ({path})")
+        for variant, r in report["variants"].items():
+            status = "ok" if r["passed"] else "FAILED"
+            print(f"  {variant:<7} parity {status}: max dev {r['max_deviation']:.2e}, "
+                  f"sign agreement {r['sign_agreement']:.1%}")
+
+        print(f"  {'variant':<7} {'size KB':>8} {'load ms':>8} {'1-window ms':>12} {'batch ms':>9} {'max dev':>9}")
+        for variant, r in benchmark(kind, path, len(DL_FEATURE_COLS), sample).items():
+            print(f"  {variant:<7} {r['file_kb']:>8} {r['load_ms']:>8} {r['latency_ms']:>12} "
+                  f"{r['batch_ms']:>9} {r['max_deviation']:>9.2e}")
+
+
+if __name__ == "__main__":
+    main()
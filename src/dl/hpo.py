@@ -0,0 +1,372 @@
+# src/dl/hpo.py
+"""
+DL Hyperparameter Search — parallel trials with successive halving.
+
+Random configurations of one architecture (LSTM or TCN) are trained in
+worker processes, each pinned to `threads` torch threads so N workers do
+not oversubscribe the CPU. Trials advance through rungs of growing epoch
+budgets; after each rung only the best 1 / eta continue:
+
+    rung 0 : 27 trials ×  2 epochs
+    rung 1 :  9 trials →  6 epochs   (resumed from their rung-0 state)
+    rung 2 :  3 trials → 18 epochs
+
+All trials read one shared window store (src/dl/dataset.py), built once
+from the prepared feature frames and memory-mapped by every worker.
+
+Output:
+    data/hpo/<arch>_<tag>/leaderboard.csv   one row per trial, best first
+    data/hpo/<arch>_<tag>/trial_<id>/       state.pt (last-epoch weights +
+                                            optimizer, for resuming), best.pt
+    models/<arch>_<tag>.pt                  best model (promoted)
+    models/<arch>_<tag>.hpo.json            its hyperparameters
+    models/<arch>_<tag>.{script,int8}.pt    serving variants (src/dl/export.py)
+
+Run:
+    python -m src.dl.hpo lstm HDFCBANK.NS --trials 27 --workers 4
+    python -m src.dl.hpo tcn --nifty50 --threads 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import torch
+
+from src.dl.export import hpo_config_path
+from src.dl.train import (
+    ARCHITECTURES,
+    FEATURE_COLS,
+    MODEL_DIR,
+    TARGET_COL,
+    export_serving_variants,
+    fit_model,
+    make_loaders,
+    prepare_frame,
+)
+from src.dl.dataset import build_window_store
+from src.utils.config import DATA_DIR, DL_BATCH_SIZE, DL_EPOCHS, RANDOM_SEED
+from src.utils.logger import get_logger
+
+logger = get_logger("dl_hpo")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────────────────────────────────────
+
+HPO_DIR = DATA_DIR / "hpo"
+
+SEARCH_SPACE = {
+    "lstm": {
+        "hidden_size": [32, 64, 128],
+        "num_layers":  [1, 2, 3],
+        "dropout":     [0.0, 0.1, 0.2, 0.3],
+    },
+    "tcn": {
+        "channels":    [[16, 32], [32, 32, 64], [32, 64, 64, 64]],
+        "kernel_size": [2, 3, 5],
+        "dropout":     [0.0, 0.1, 0.2, 0.3],
+    },
+}
+SEQ_LENS = [20, 30, 60]
+LR_RANGE = (3e-4, 3e-3)           # sampled log-uniformly
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Search space
+# ─────────────────────────────────────────────────────────────────────────────
+
+def sample_configs(arch: str, n_trials: int, seed: int = RANDOM_SEED) -> List[Dict]:
+    """
+    `n_trials` random configurations: model kwargs plus seq_len and lr.
+    """
+    rng = np.random.default_rng(seed)
+    space = SEARCH_SPACE[arch]
+
+    configs = []
+    for _ in range(n_trials):
+        params = {name: values[rng.integers(len(values))] for name, values in space.items()}
+        params["seq_len"] = int(SEQ_LENS[rng.integers(len(SEQ_LENS))])
+        params["lr"] = float(np.exp(rng.uniform(*np.log(LR_RANGE))))
+        configs.append(_plain(params))
+    return configs
+
+
+def rung_budgets(min_epochs: int, max_epochs: int, eta: int) -> List[int]:
+    """
+    Cumulative epochs per rung: min_epochs · eta^k, capped at max_epochs.
+    """
+    budgets = [min_epochs]
+    while budgets[-1] < max_epochs:
+        budgets.append(min(budgets[-1] * eta, max_epochs))
+    return budgets
+
+
+def _plain(params: Dict) -> Dict:
+    # NumPy scalars → JSON-friendly Python values
+    return {k: (v.item() if isinstance(v, np.generic) else v) for k, v in params.items()}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Worker side
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _init_worker(threads: int) -> None:
+    # One pool process per `threads` cores; no nested intra-op pools
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+
+def _build_model(arch: str, params: Dict) -> torch.nn.Module:
+    model_cls, _ = ARCHITECTURES[arch]
+    kwargs = {k: v for k, v in params.items() if k not in ("seq_len", "lr")}
+    return model_cls(num_features=len(FEATURE_COLS), **kwargs)
+
+
+def run_trial_rung(job: Dict) -> Dict:
+    """
+    Train one trial up to the rung's cumulative epoch budget, resuming
+    from its previous rung. Runs inside a pool worker.
+
+    Returns dict: trial, val_loss (best so far), epochs, seconds
+    """
+    params, trial_dir = job["params"], Path(job["trial_dir"])
+    torch.manual_seed(RANDOM_SEED + job["trial"])
+
+    model = _build_model(job["arch"], params)
+    optimizer = torch.optim.Adam(model.parameters(), lr=params["lr"])
+
+    state_path = trial_dir / "state.pt"
+    done, best_loss = 0, float("inf")
+    if state_path.exists():
+        state = torch.load(state_path, map_location="cpu", weights_only=False)
+        model.load_state_dict(state["model"])
+        optimizer.load_state_dict(state["optimizer"])
+        done, best_loss = state["epochs"], state["best_loss"]
+
+    train_loader, val_loader = make_loaders(
+        Path(job["store"]), params["seq_len"], job["batch_size"], job["val_frac"], num_workers=0,
+    )
+
+    # The model keeps its last-epoch weights so state.pt pairs them with
+    # the matching Adam state; this rung's best weights go to rung_best.pt
+    # and replace best.pt only when they beat earlier rungs
+    rung_best = trial_dir / "rung_best.pt"
+    start = time.perf_counter()
+    result = fit_model(
+        model,
+        train_loader,
+        val_loader,
+        epochs=job["budget"] - done,
+        patience=job["patience"],
+        checkpoint_path=rung_best,
+        name=f"trial {job['trial']}",
+        optimizer=optimizer,
+        restore_best=False,
+    )
+
+    trial_dir.mkdir(parents=True, exist_ok=True)
+    if result["best_val_loss"] < best_loss:
+        best_loss = result["best_val_loss"]
+        rung_best.replace(trial_dir / "best.pt")
+    else:
+        rung_best.unlink(missing_ok=True)
+    torch.save({
+        "model":     model.state_dict(),
+        "optimizer": optimizer.state_dict(),
+        "epochs":    done + result["epochs_run"],
+        "best_loss": best_loss,
+    }, state_path)
+
+    return {
+        "trial":           job["trial"],
+        "val_loss":        best_loss,
+        "epochs":          done + result["epochs_run"],
+        "seconds":         time.perf_counter() - start,
+        "samples_per_sec": result["samples_per_sec"],
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Search
+# ─────────────────────────────────────────────────────────────────────────────
+
+def run_search(
+    arch: str,
+    tickers: str | Sequence[str],
+    timeframe: str = "5y",
+    n_trials: int = 27,
+    min_epochs: int = 2,
+    max_epochs: int = DL_EPOCHS,
+    eta: int = 3,
+    patience: int = 3,
+    batch_size: int = DL_BATCH_SIZE,
+    val_frac: float = 0.3,
+    n_workers: Optional[int] = None,
+    threads: int = 1,
+    tag: Optional[str] = None,
+    promote: bool = True,
+    frames: Optional[Dict[str, pd.DataFrame]] = None,
+) -> pd.DataFrame:
+    """
+    Successive-halving search over SEARCH_SPACE[arch].
+
+    Args:
+        min_epochs / max_epochs / eta : rung budgets (rung_budgets())
+        patience  : early stopping inside each rung
+        n_workers : trial processes (default: cores // threads)
+        threads   : torch threads per trial process
+        promote   : copy the best trial to models/<arch>_<tag>.pt
+        frames    : pre-built feature frames (skips downloading)
+
+    Returns the leaderboard (also written to leaderboard.csv): trial,
+    params, rung, epochs, val_loss, seconds — best first.
+    """
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    tag = tag or (tickers[0].replace(".", "_") if len(tickers) == 1 else "universe")
+    run_dir = HPO_DIR / f"{arch}_{tag}"
+    shutil.rmtree(run_dir, ignore_errors=True)
+    run_dir.mkdir(parents=True)
+
+    # ── Shared data: prepared once, memory-mapped by every trial ─────────────
+    if frames is None:
+        frames = {}
+        for ticker in tickers:
+            try:
+                frames[ticker] = prepare_frame(ticker, timeframe)
+            except Exception as exc:
+                logger.warning(f"{ticker}: skipped ({exc})")
+    frames = {t: df for t, df in frames.items() if len(df) > max(SEQ_LENS)}
+    if not frames:
+        raise ValueError("No training data for any ticker")
+    store = build_window_store(frames, FEATURE_COLS, TARGET_COL, name=f"hpo_{tag}")
+
+    configs = sample_configs(arch, n_trials)
+    budgets = rung_budgets(min_epochs, max_epochs, eta)
+    n_workers = n_workers or max((os.cpu_count() or 1) // threads, 1)
+    board = {
+        i: {"trial": i, "params": json.dumps(p), "rung": -1, "epochs": 0,
+            "val_loss": math.inf, "seconds": 0.0}
+        for i, p in enumerate(configs)
+    }
+
+    logger.info(
+        f"{arch.upper()} search: {n_trials} trials, rungs {budgets} epochs, "
+        f"{n_workers} workers × {threads} threads, {len(frames)} tickers"
+    )
+    start = time.perf_counter()
+
+    alive = list(board)
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=mp.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads,),
+    ) as pool:
+        for rung, budget in enumerate(budgets):
+            jobs = [{
+                "arch":       arch,
+                "trial":      i,
+                "params":     configs[i],
+                "budget":     budget,
+                "patience":   patience,
+                "batch_size": batch_size,
+                "val_frac":   val_frac,
+                "store":      str(store),
+                "trial_dir":  str(run_dir / f"trial_{i:03d}"),
+            } for i in alive]
+
+            for out in pool.map(run_trial_rung, jobs):
+                row = board[out["trial"]]
+                row.update(rung=rung, epochs=out["epochs"], val_loss=out["val_loss"])
+                row["seconds"] += out["seconds"]
+
+            ranked = sorted(alive, key=lambda i: board[i]["val_loss"])
+            logger.info(
+                f"rung {rung} ({budget} epochs): best val MSE "
+                f"{board[ranked[0]]['val_loss']:.6f} (trial {ranked[0]})"
+            )
+            alive = ranked[:max(len(ranked) // eta, 1)]
+            if len(ranked) == 1:
+                break
+
+    leaderboard = (
+        pd.DataFrame(board.values())
+        .sort_values(["rung", "val_loss"], ascending=[False, True])
+        .reset_index(drop=True)
+    )
+    leaderboard.to_csv(run_dir / "leaderboard.csv", index=False)
+    logger.info(f"Search finished in {time.perf_counter() - start:.1f}s → {run_dir / 'leaderboard.csv'}")
+
+    if promote:
+        best = leaderboard.iloc[0]
+        path = MODEL_DIR / f"{arch}_{tag}.pt"
+        shutil.copyfile(run_dir / f"trial_{int(best['trial']):03d}" / "best.pt", path)
+        hpo_config_path(path).write_text(json.dumps({
+            "arch":     arch,
+            "params":   json.loads(best["params"]),
+            "val_loss": float(best["val_loss"]),
+            "epochs":   int(best["epochs"]),
+            "tickers":  list(frames),
+        }, indent=2))
+        export_serving_variants(arch, path)
+        logger.info(f"Best trial {int(best['trial'])} promoted to {path}")
+
+    return leaderboard
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Successive-halving search for the LSTM / TCN")
+    parser.add_argument("arch", choices=list(ARCHITECTURES))
+    parser.add_argument("tickers", nargs="*", default=["HDFCBANK.NS"], help="Yahoo tickers")
+    parser.add_argument("--nifty50", action="store_true", help="Search on all NIFTY 50 tickers")
+    parser.add_argument("--timeframe", default="5y", choices=["1y", "2y", "5y"])
+    parser.add_argument("--trials", type=int, default=27)
+    parser.add_argument("--min-epochs", type=int, default=2)
+    parser.add_argument("--max-epochs", type=int, default=DL_EPOCHS)
+    parser.add_argument("--eta", type=int, default=3, help="Keep the best 1/eta trials per rung")
+    parser.add_argument("--workers", type=int, default=None, help="Trial processes (default: cores // threads)")
+    parser.add_argument("--threads", type=int, default=1, help="Torch threads per trial process")
+    parser.add_argument("--tag", default=None, help="Model file suffix (default: ticker or 'universe')")
+    parser.add_argument("--no-promote", action="store_true", help="Do not copy the best model to models/")
+    args = parser.parse_args()
+
+    tickers = args.tickers
+    if args.nifty50:
+        from src.data.nifty50 import NIFTY_50
+        tickers = list(NIFTY_50.values())
+
+    leaderboard = run_search(
+        args.arch,
+        tickers,
+        timeframe=args.timeframe,
+        n_trials=args.trials,
+        min_epochs=args.min_epochs,
+        max_epochs=args.max_epochs,
+        eta=args.eta,
+        n_workers=args.workers,
+        threads=args.threads,
+        tag=args.tag,
+        promote=not args.no_promote,
+    )
+    print(leaderboard.head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -138,10 +138,17 @@ def load_model(
     num_features: int,
     device: str = "cpu",
 ) -> LSTMPricePredictor:
-    model = LSTMPricePredictor(num_features=num_features)
     import os
     if not os.path.exists(path) or os.path.getsize(path) == 0:
          raise ValueError(f"Invalid model file: {path}")
-    model.load_state_dict(torch.load(path, map_location=device))
+    state = torch.load(path, map_location=device)
+
+    # Size from the weights, so tuned models (src/dl/hpo.py) load too
+    model = LSTMPricePredictor(
+        num_features=num_features,
+        hidden_size=state["lstm.weight_hh_l0"].shape[1],
+        num_layers=sum(k.startswith("lstm.weight_hh_l") for k in state),
+    )
+    model.load_state_dict(state)
     model.eval()
     return model
\ No newline at end of file
@@ -0,0 +1,537 @@
+# src/dl/streaming.py
+"""
+Streaming DL Inference — score one new bar without re-running the window.
+
+The windowed models (src/dl/lstm.py) are fed the last 30 bars on every
+call. For live scoring the recurrent state can instead be carried from bar
+to bar:
+
+    StreamingLSTM  : per-ticker (h, c) state; each new bar is one LSTM
+                     timestep, and several tickers advance in one batched
+                     call
+    IncrementalTCN : per-ticker ring buffers of each dilated conv's recent
+                     inputs; each new bar computes one output per layer
+
+The TCN's receptive field (29 bars) fits in the 30-bar window, so the
+incremental TCN matches the windowed model exactly after warm-up. The LSTM's
+carried state has seen the whole history rather than the last 30 bars, so
+it tracks the windowed prediction closely but not exactly. With
+`check_every` set, StreamingLSTM compares itself against the windowed model
+on its last `window` bars and re-syncs the state when the deviation exceeds
+`tolerance`. The CLI checks against the window serving uses: 30 bars, or
+the seq_len a tuned model recorded (src/dl/hpo.py).
+
+State can be checkpointed to disk and warm-started from history.
+
+Run (replay a ticker's history, report deviation and per-bar cost):
+    python -m src.dl.streaming HDFCBANK.NS
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import torch
+
+from src.dl.lstm import LSTMPricePredictor
+from src.dl.temporal_cnn import TemporalCNN
+from src.utils.logger import get_logger
+
+logger = get_logger("dl_streaming")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────────────────────────────────────
+
+WINDOW = 30                       # windowed models' sequence length
+TOLERANCE = 1e-3                  # max |stream − windowed| before re-sync
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# LSTM
+# ─────────────────────────────────────────────────────────────────────────────
+
+class StreamingLSTM:
+    """
+    Stateful one-bar-at-a-time inference for LSTMPricePredictor.
+
+    All tickers' states live in one (layers, slots, hidden) tensor pair and
+    their last `window` bars in one ring array, so a batched update is a
+    gather, one LSTM step and a scatter.
+
+    Args:
+        model       : trained LSTMPricePredictor (put in eval mode)
+        window      : windowed model's sequence length (reference checks)
+        check_every : compare with the windowed model every N bars per
+                      ticker once `window` bars are buffered (None = never)
+        tolerance   : deviation that triggers a re-sync from the window
+        capacity    : initial ticker slots (grows as needed)
+    """
+
+    def __init__(
+        self,
+        model: LSTMPricePredictor,
+        window: int = WINDOW,
+        check_every: Optional[int] = None,
+        tolerance: float = TOLERANCE,
+        capacity: int = 64,
+    ):
+        self.model = model.eval()
+        self.window = window
+        self.check_every = check_every
+        self.tolerance = tolerance
+
+        lstm = model.lstm
+        self.num_features = lstm.input_size
+        self._shape = (lstm.num_layers, lstm.hidden_size)
+
+        self._slot: Dict[str, int] = {}
+        self._h = torch.zeros(lstm.num_layers, capacity, lstm.hidden_size)
+        self._c = torch.zeros_like(self._h)
+        self._steps = np.zeros(capacity, dtype=np.int64)
+        self._ring = np.zeros((capacity, window, self.num_features), dtype=np.float32)
+        self.last_deviation: Dict[str, float] = {}
+
+    # ── State ────────────────────────────────────────────────────────────────
+
+    def tickers(self) -> list:
+        return list(self._slot)
+
+    def reset(self, ticker: str) -> None:
+        slot = self._slot.get(ticker)
+        if slot is None:
+            return
+        self._h[:, slot] = 0.0
+        self._c[:, slot] = 0.0
+        self._steps[slot] = 0
+        self.last_deviation.pop(ticker, None)
+
+    @torch.no_grad()
+    def warm_start(self, ticker: str, history: np.ndarray) -> float:
+        """
+        Run the LSTM over a ticker's history (T, F) once and keep the final
+        state. Returns the prediction for the last bar.
+        """
+        history = np.array(history, dtype=np.float32)
+        _, (h, c) = self.model.lstm(torch.from_numpy(history).unsqueeze(0))
+
+        slot = self._slots([ticker])[0]
+        self._h[:, slot], self._c[:, slot] = h[:, 0], c[:, 0]
+        self._steps[slot] = len(history)
+        tail = np.arange(max(len(history) - self.window, 0), len(history))
+        self._ring[slot, tail % self.window] = history[tail]
+        return float(self.model.regressor(h[-1]).item())
+
+    def save_state(self, path: str | Path) -> None:
+        """
+        Checkpoint every ticker's (h, c), step count and window buffer.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        torch.save({
+            "shape":  self._shape,
+            "window": self.window,
+            "states": {
+                t: {
+                    "h":     self._h[:, s].clone(),
+                    "c":     self._c[:, s].clone(),
+                    "steps": int(self._steps[s]),
+                    "ring":  self._ring[s].copy(),
+                }
+                for t, s in self._slot.items()
+            },
+        }, path)
+
+    def load_state(self, path: str | Path) -> None:
+        """
+        Restore a checkpoint written by save_state() (same model shape).
+        """
+        saved = torch.load(path, map_location="cpu", weights_only=False)
+        if tuple(saved["shape"]) != self._shape or saved["window"] != self.window:
+            raise ValueError(f"State shape {saved['shape']} does not match the model")
+
+        for ticker, s in saved["states"].items():
+            slot = self._slots([ticker])[0]
+            self._h[:, slot], self._c[:, slot] = s["h"], s["c"]
+            self._steps[slot] = s["steps"]
+            self._ring[slot] = s["ring"]
+
+    # ── Inference ────────────────────────────────────────────────────────────
+
+    def update(self, ticker: str, bar: np.ndarray) -> float:
+        """
+        Advance one ticker by one bar (F features). Returns its prediction.
+        """
+        return self.update_many({ticker: bar})[ticker]
+
+    @torch.no_grad()
+    def update_many(self, bars: Dict[str, np.ndarray]) -> Dict[str, float]:
+        """
+        Advance several tickers by one bar each in a single batched LSTM
+        step. Tickers without state start from zeros.
+        """
+        tickers = list(bars)
+        if not tickers:
+            return {}
+
+        slots = self._slots(tickers)
+        x = np.stack([np.asarray(bars[t], dtype=np.float32) for t in tickers])
+
+        idx = torch.from_numpy(slots)
+        h0 = self._h.index_select(1, idx)
+        c0 = self._c.index_select(1, idx)
+        _, (h, c) = self.model.lstm(torch.from_numpy(x).unsqueeze(1), (h0, c0))
+        self._h[:, idx], self._c[:, idx] = h, c
+
+        self._ring[slots, self._steps[slots] % self.window] = x
+        self._steps[slots] += 1
+
+        preds = self.model.regressor(h[-1]).squeeze(-1).tolist()
+        out = dict(zip(tickers, preds))
+
+        if self.check_every is not None:
+            steps = self._steps[slots]
+            due = (steps >= self.window) & (steps % self.check_every == 0)
+            for i in np.flatnonzero(due):
+                out[tickers[i]] = self._check(tickers[i], preds[i])
+
+        return out
+
+    @torch.no_grad()
+    def windowed_prediction(self, ticker: str) -> Optional[float]:
+        """
+        Reference: the windowed model on the buffered last `window` bars.
+        """
+        rows = self._window_rows(ticker)
+        if rows is None:
+            return None
+        return float(self.model(torch.from_numpy(rows).unsqueeze(0)).item())
+
+    # ── Internals ────────────────────────────────────────────────────────────
+
+    def _slots(self, tickers) -> np.ndarray:
+        for ticker in tickers:
+            if ticker not in self._slot:
+                self._slot[ticker] = len(self._slot)
+        needed = len(self._slot)
+
+        capacity = self._h.shape[1]
+        if needed > capacity:
+            grow = max(needed, 2 * capacity) - capacity
+            self._h = torch.cat([self._h, torch.zeros(self._shape[0], grow, self._shape[1])], dim=1)
+            self._c = torch.cat([self._c, torch.zeros(self._shape[0], grow, self._shape[1])], dim=1)
+            self._steps = np.concatenate([self._steps, np.zeros(grow, dtype=np.int64)])
+            self._ring = np.concatenate([self._ring, np.zeros((grow,) + self._ring.shape[1:], dtype=np.float32)])
+
+        return np.array([self._slot[t] for t in tickers], dtype=np.int64)
+
+    def _window_rows(self, ticker: str) -> Optional[np.ndarray]:
+        slot = self._slot.get(ticker)
+        if slot is None or self._steps[slot] < self.window:
+            return None
+        n = self._steps[slot]
+        return self._ring[slot, np.arange(n - self.window, n) % self.window]
+
+    @torch.no_grad()
+    def _check(self, ticker: str, streamed: float) -> float:
+        rows = self._window_rows(ticker)
+        if rows is None:
+            return streamed
+
+        x = torch.from_numpy(rows).unsqueeze(0)
+        _, (h, c) = self.model.lstm(x)
+        reference = float(self.model.regressor(h[-1]).item())
+
+        deviation = abs(streamed - reference)
+        self.last_deviation[ticker] = deviation
+        if deviation <= self.tolerance:
+            return streamed
+
+        # Re-sync: the windowed model's state becomes the carried state
+        logger.warning(f"{ticker}: stream deviates by {deviation:.2e}, re-syncing from window")
+        slot = self._slot[ticker]
+        self._h[:, slot], self._c[:, slot] = h[:, 0], c[:, 0]
+        return reference
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# TCN
+# ─────────────────────────────────────────────────────────────────────────────
+
+class IncrementalTCN:
+    """
+    Fast-WaveNet style one-bar-at-a-time inference for TemporalCNN.
+
+    Every dilated causal conv keeps a per-ticker buffer of its last
+    (kernel − 1) · dilation + 1 inputs; a new bar shifts each buffer by one
+    column and needs exactly one output per conv. Zero-initialised buffers
+    are the model's causal zero padding, so a stream started at bar 0 gives
+    the same output as running TemporalCNN over the whole history — and,
+    once `receptive_field` bars are in, the same as the 30-bar window.
+
+    Args:
+        model    : trained TemporalCNN (put in eval mode)
+        window   : windowed model's sequence length (reference checks)
+        capacity : initial ticker slots (grows as needed)
+    """
+
+    def __init__(self, model: TemporalCNN, window: int = WINDOW, capacity: int = 64):
+        self.model = model.eval()
+        self.window = window
+
+        # (conv1, conv2, downsample) per block — dropout is off in eval
+        self._blocks = [(b.net[0], b.net[4], b.downsample) for b in model.tcn]
+        self._convs = [conv for c1, c2, _ in self._blocks for conv in (c1, c2)]
+        self._lengths = [(c.kernel_size[0] - 1) * c.dilation[0] + 1 for c in self._convs]
+        self.num_features = self._convs[0].in_channels
+        self.receptive_field = 1 + sum(length - 1 for length in self._lengths)
+
+        self._slot: Dict[str, int] = {}
+        self._buffers = [
+            torch.zeros(capacity, conv.in_channels, length)
+            for conv, length in zip(self._convs, self._lengths)
+        ]
+        self._steps = np.zeros(capacity, dtype=np.int64)
+        self._ring = np.zeros((capacity, window, self.num_features), dtype=np.float32)
+
+    # ── State ────────────────────────────────────────────────────────────────
+
+    def tickers(self) -> list:
+        return list(self._slot)
+
+    def reset(self, ticker: str) -> None:
+        slot = self._slot.get(ticker)
+        if slot is None:
+            return
+        for buf in self._buffers:
+            buf[slot] = 0.0
+        self._steps[slot] = 0
+
+    @torch.no_grad()
+    def warm_start(self, ticker: str, history: np.ndarray) -> float:
+        """
+        Run the TCN over a ticker's history (T, F) once and keep each conv's
+        trailing inputs. Returns the prediction for the last bar.
+        """
+        history = np.array(history, dtype=np.float32)
+        x = torch.from_numpy(history).T.unsqueeze(0)          # (1, F, T)
+
+        slot = self._slots([ticker])[0]
+        inputs = []
+        for block in self.model.tcn:
+            hidden = block.net[:4](x)                           # conv1 → relu
+            inputs += [x, hidden]
+            x = block(x)
+
+        for buf, inp, length in zip(self._buffers, inputs, self._lengths):
+            tail = inp[0, :, -length:]
+            buf[slot] = 0.0
+            buf[slot, :, length - tail.shape[1]:] = tail
+
+        self._steps[slot] = len(history)
+        tail = np.arange(max(len(history) - self.window, 0), len(history))
+        self._ring[slot, tail % self.window] = history[tail]
+        return float(self.model.regressor(x[:, :, -1]).item())
+
+    def save_state(self, path: str | Path) -> None:
+        """
+        Checkpoint every ticker's conv buffers, step count and window buffer.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        torch.save({
+            "lengths": self._lengths,
+            "window":  self.window,
+            "states": {
+                t: {
+                    "buffers": [buf[s].clone() for buf in self._buffers],
+                    "steps":   int(self._steps[s]),
+                    "ring":    self._ring[s].copy(),
+                }
+                for t, s in self._slot.items()
+            },
+        }, path)
+
+    def load_state(self, path: str | Path) -> None:
+        """
+        Restore a checkpoint written by save_state() (same architecture).
+        """
+        saved = torch.load(path, map_location="cpu", weights_only=False)
+        if list(saved["lengths"]) != self._lengths or saved["window"] != self.window:
+            raise ValueError(f"State layout {saved['lengths']} does not match the model")
+
+        for ticker, s in saved["states"].items():
+            slot = self._slots([ticker])[0]
+            for buf, saved_buf in zip(self._buffers, s["buffers"]):
+                buf[slot] = saved_buf
+            self._steps[slot] = s["steps"]
+            self._ring[slot] = s["ring"]
+
+    # ── Inference ────────────────────────────────────────────────────────────
+
+    def update(self, ticker: str, bar: np.ndarray) -> float:
+        """
+        Advance one ticker by one bar (F features). Returns its prediction.
+        """
+        return self.update_many({ticker: bar})[ticker]
+
+    @torch.no_grad()
+    def update_many(self, bars: Dict[str, np.ndarray]) -> Dict[str, float]:
+        """
+        Advance several tickers by one bar each: one output column per conv
+        for the whole batch.
+        """
+        tickers = list(bars)
+        if not tickers:
+            return {}
+
+        slots = self._slots(tickers)
+        x_np = np.stack([np.asarray(bars[t], dtype=np.float32) for t in tickers])
+        idx = torch.from_numpy(slots)
+
+        x = torch.from_numpy(x_np)                              # (N, C)
+        buffers = iter(self._buffers)
+        for conv1, conv2, downsample in self._blocks:
+            hidden = torch.relu(self._push(next(buffers), idx, x, conv1))
+            out = torch.relu(self._push(next(buffers), idx, hidden, conv2))
+            res = x if downsample is None else downsample(x.unsqueeze(-1)).squeeze(-1)
+            x = torch.relu(out + res)
+
+        self._ring[slots, self._steps[slots] % self.window] = x_np
+        self._steps[slots] += 1
+
+        preds = self.model.regressor(x).squeeze(-1).tolist()
+        return dict(zip(tickers, preds))
+
+    @torch.no_grad()
+    def windowed_prediction(self, ticker: str) -> Optional[float]:
+        """
+        Reference: the windowed model on the buffered last `window` bars.
+        """
+        slot = self._slot.get(ticker)
+        if slot is None or self._steps[slot] < self.window:
+            return None
+        n = self._steps[slot]
+        rows = self._ring[slot, np.arange(n - self.window, n) % self.window]
+        return float(self.model(torch.from_numpy(rows).unsqueeze(0)).item())
+
+    # ── Internals ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _push(buffer: torch.Tensor, idx: torch.Tensor, x: torch.Tensor, conv) -> torch.Tensor:
+        # Shift the tickers' buffers by one column, then one dilated output
+        window = torch.cat([buffer.index_select(0, idx)[:, :, 1:], x.unsqueeze(-1)], dim=-1)
+        buffer[idx] = window
+        return torch.nn.functional.conv1d(window, conv.weight, conv.bias, dilation=conv.dilation).squeeze(-1)
+
+    def _slots(self, tickers) -> np.ndarray:
+        for ticker in tickers:
+            if ticker not in self._slot:
+                self._slot[ticker] = len(self._slot)
+        needed = len(self._slot)
+
+        capacity = len(self._steps)
+        if needed > capacity:
+            grow = max(needed, 2 * capacity) - capacity
+            self._buffers = [
+                torch.cat([buf, torch.zeros((grow,) + buf.shape[1:])]) for buf in self._buffers
+            ]
+            self._steps = np.concatenate([self._steps, np.zeros(grow, dtype=np.int64)])
+            self._ring = np.concatenate([self._ring, np.zeros((grow,) + self._ring.shape[1:], dtype=np.float32)])
+
+        return np.array([self._slot[t] for t in tickers], dtype=np.int64)
+
+
+def compare_with_windowed(
+    stream: StreamingLSTM | IncrementalTCN,
+    history: np.ndarray,
+    warmup: Optional[int] = None,
+) -> Dict[str, float]:
+    """
+    Replay a (T, F) history bar by bar and compare every streamed
+    prediction after `warmup` bars with the windowed model.
+
+    Returns dict: max_deviation, mean_deviation, bars, stream_ms_per_bar,
+    windowed_ms_per_bar.
+    """
+    history = np.asarray(history, dtype=np.float32)
+    warmup = warmup or stream.window
+    ticker = "__compare__"
+    stream.reset(ticker)
+
+    streamed, windowed = [], []
+    stream_s = window_s = 0.0
+    for t, bar in enumerate(history):
+        start = time.perf_counter()
+        pred = stream.update(ticker, bar)
+        stream_s += time.perf_counter() - start
+
+        if t + 1 >= warmup:
+            start = time.perf_counter()
+            ref = stream.windowed_prediction(ticker)
+            window_s += time.perf_counter() - start
+            if ref is not None:
+                streamed.append(pred)
+                windowed.append(ref)
+
+    stream.reset(ticker)
+    deviation = np.abs(np.array(streamed) - np.array(windowed))
+    return {
+        "max_deviation":       float(deviation.max()) if len(deviation) else 0.0,
+        "mean_deviation":      float(deviation.mean()) if len(deviation) else 0.0,
+        "bars":                len(deviation),
+        "stream_ms_per_bar":   1000 * stream_s / max(len(history), 1),
+        "windowed_ms_per_bar": 1000 * window_s / max(len(windowed), 1),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _feature_history(ticker: str, timeframe: str, feature_cols: Iterable[str]) -> np.ndarray:
+    from src.data.prices import load_prices
+    from src.domain.indicators import add_indicators
+    from src.ml.features import build_features
+
+    df = build_features(add_indicators(load_prices(ticker, timeframe))).dropna()
+    return df[list(feature_cols)].to_numpy(dtype=np.float32)
+
+
+def main() -> None:
+    from src.dl.export import serving_seq_len
+    from src.dl.lstm import load_model as load_lstm
+    from src.dl.temporal_cnn import load_model as load_tcn
+    from src.pipeline.analysis_service import DEFAULT_MODEL_PATHS
+    from src.pipeline.signal_pipeline import DL_FEATURE_COLS
+
+    parser = argparse.ArgumentParser(description="Streaming vs windowed DL inference check")
+    parser.add_argument("ticker", help="Yahoo ticker, e.g. HDFCBANK.NS")
+    parser.add_argument("--timeframe", default="2y", choices=["1y", "2y", "5y"])
+    args = parser.parse_args()
+
+    history = _feature_history(args.ticker, args.timeframe, DL_FEATURE_COLS)
+
+    # Compare against the window serving uses (tuned models record their own)
+    lstm_path, tcn_path = DEFAULT_MODEL_PATHS["lstm"], DEFAULT_MODEL_PATHS["tcn"]
+    lstm = StreamingLSTM(
+        load_lstm(lstm_path, num_features=len(DL_FEATURE_COLS)),
+        window=serving_seq_len(lstm_path),
+    )
+    print(f"LSTM ({lstm.window}-bar window):", compare_with_windowed(lstm, history))
+
+    tcn = IncrementalTCN(
+        load_tcn(tcn_path, num_features=len(DL_FEATURE_COLS)),
+        window=serving_seq_len(tcn_path),
+    )
+    warmup = max(tcn.receptive_field, tcn.window)
+    print(f"TCN ({tcn.window}-bar window): ", compare_with_windowed(tcn, history, warmup=warmup))
+
+
+if __name__ == "__main__":
+    main()
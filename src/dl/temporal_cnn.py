@@ -140,7 +140,15 @@ def load_model(
     num_features: int,
     device: str = "cpu",
 ) -> TemporalCNN:
-    model = TemporalCNN(num_features=num_features)
-    model.load_state_dict(torch.load(path, map_location=device))
+    state = torch.load(path, map_location=device)
+
+    # Channels / kernel from the weights, so tuned models (src/dl/hpo.py) load too
+    n_blocks = sum(k.endswith(".net.0.weight") for k in state)
+    model = TemporalCNN(
+        num_features=num_features,
+        channels=[state[f"tcn.{i}.net.0.weight"].shape[0] for i in range(n_blocks)],
+        kernel_size=state["tcn.0.net.0.weight"].shape[2],
+    )
+    model.load_state_dict(state)
     model.eval()
     return model
\ No newline at end of file
@@ -1,147 +1,376 @@
 # src/dl/train.py
+"""
+DL Training — LSTM and Temporal CNN on windows pooled from many tickers.
 
-import torch
-from torch.utils.data import DataLoader, random_split
+    prices → indicators → features (per ticker)
+        → data/dl_windows/<tag>/  memory-mapped rows of every ticker
+        → chronological split by date (validation = most recent period,
+          training targets that overlap it are purged)
+        → fit_model() for each architecture: early stopping on validation
+          MSE, best weights restored and checkpointed
+        → TorchScript / int8 serving variants exported (src/dl/export.py)
+
+Both models share fit_model(), which logs epoch time and samples / sec.
+
+Run:
+    python -m src.dl.train HDFCBANK.NS
+    python -m src.dl.train --nifty50 --workers 4 --patience 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import time
 from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import pandas as pd
+import torch
+from torch.utils.data import DataLoader
 
 from src.data.prices import load_prices
 from src.domain.indicators import add_indicators
 from src.ml.features import build_features
 
-from src.dl.dataset import TimeSeriesDataset
-from src.dl.lstm import LSTMPricePredictor, train_lstm, save_model as save_lstm
+from src.dl.dataset import MemmapWindowDataset, build_window_store, chronological_split
+from src.dl.export import export_dl_model, hpo_config_path
+from src.dl.lstm import LSTMPricePredictor, save_model as save_lstm
 from src.dl.temporal_cnn import TemporalCNN, save_model as save_tcn
+from src.utils.config import (
+    DL_BATCH_SIZE,
+    DL_EPOCHS,
+    DL_LEARNING_RATE,
+    DL_NUM_WORKERS,
+    DL_PATIENCE,
+    RANDOM_SEED,
+)
+from src.utils.logger import get_logger
+
+logger = get_logger("dl_train")
 
 
 MODEL_DIR = Path("models")
 MODEL_DIR.mkdir(exist_ok=True)
+CHECKPOINT_DIR = MODEL_DIR / "checkpoints"
 
+FEATURE_COLS = ["rsi_norm", "ema_spread", "macd_diff", "atr_pct"]
+TARGET_COL = "future_return_5d"
+HORIZON = 5                       # bars spanned by TARGET_COL
 
-def train_dl_models(
-    ticker: str,
-    timeframe: str = "5y",
-    seq_len: int = 30,
-    batch_size: int = 64,
-    epochs: int = 30,
+ARCHITECTURES = {
+    "lstm": (LSTMPricePredictor, save_lstm),
+    "tcn":  (TemporalCNN, save_tcn),
+}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Training loop
+# ─────────────────────────────────────────────────────────────────────────────
+
+def fit_model(
+    model: torch.nn.Module,
+    train_loader: DataLoader,
+    val_loader: DataLoader,
+    epochs: int = DL_EPOCHS,
+    lr: float = DL_LEARNING_RATE,
+    patience: int = DL_PATIENCE,
     device: str = "cpu",
-) -> None:
+    checkpoint_path: Optional[Path] = None,
+    name: str = "model",
+    optimizer: Optional[torch.optim.Optimizer] = None,
+    restore_best: bool = True,
+) -> Dict:
     """
-    Train LSTM and Temporal CNN models for 5-day return prediction.
+    MSE training with early stopping.
+
+    Stops after `patience` epochs without a lower validation loss, then
+    restores the best weights (keeps the last epoch's with
+    restore_best=False, e.g. to resume later with the matching optimizer
+    state). With `checkpoint_path` the best weights are also written there
+    whenever they improve. Pass `optimizer` to continue a run (e.g. a
+    resumed hyperparameter-search trial); by default a fresh Adam with `lr`
+    is used.
+
+    Returns dict:
+        best_epoch, best_val_loss, epochs_run, stopped_early, seconds,
+        samples_per_sec, history (per epoch: train_loss, val_loss,
+        seconds, samples_per_sec)
     """
+    model.to(device)
+    optimizer = optimizer or torch.optim.Adam(model.parameters(), lr=lr)
+    criterion = torch.nn.MSELoss()
 
-    # -----------------------------
-    # Load & prepare data
-    # -----------------------------
+    best_loss, best_epoch, best_state = float("inf"), 0, None
+    history = []
+    total_samples = 0
+    start = time.perf_counter()
+
+    for epoch in range(1, epochs + 1):
+        epoch_start = time.perf_counter()
+        model.train()
+        train_loss, seen = 0.0, 0
+
+        for x, y in train_loader:
+            x, y = x.to(device), y.to(device)
+
+            optimizer.zero_grad()
+            loss = criterion(model(x), y)
+            loss.backward()
+            optimizer.step()
+
+            train_loss += loss.item() * len(x)
+            seen += len(x)
+
+        model.eval()
+        val_loss, val_seen = 0.0, 0
+        with torch.no_grad():
+            for x, y in val_loader:
+                x, y = x.to(device), y.to(device)
+                val_loss += criterion(model(x), y).item() * len(x)
+                val_seen += len(x)
+
+        seconds = time.perf_counter() - epoch_start
+        total_samples += seen + val_seen
+        row = {
+            "epoch":           epoch,
+            "train_loss":      train_loss / max(seen, 1),
+            "val_loss":        val_loss / max(val_seen, 1),
+            "seconds":         round(seconds, 3),
+            "samples_per_sec": round((seen + val_seen) / seconds, 1),
+        }
+        history.append(row)
+
+        improved = row["val_loss"] < best_loss
+        if improved:
+            best_loss, best_epoch = row["val_loss"], epoch
+            best_state = copy.deepcopy(model.state_dict())
+            if checkpoint_path is not None:
+                checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+                torch.save(best_state, checkpoint_path)
+
+        logger.info(
+            f"{name} epoch {epoch:03d} | train MSE {row['train_loss']:.6f} | "
+            f"val MSE {row['val_loss']:.6f}{' *' if improved else ''} | "
+            f"{seconds:.2f}s, {row['samples_per_sec']:,.0f} samples/s"
+        )
+
+        if epoch - best_epoch >= patience:
+            logger.info(f"{name}: no improvement for {patience} epochs, stopping")
+            break
+
+    if restore_best and best_state is not None:
+        model.load_state_dict(best_state)
+    model.eval()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "best_epoch":      best_epoch,
+        "best_val_loss":   best_loss,
+        "epochs_run":      len(history),
+        "stopped_early":   len(history) < epochs,
+        "seconds":         round(elapsed, 2),
+        "samples_per_sec": round(total_samples / max(elapsed, 1e-9), 1),
+        "history":         history,
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Data
+# ─────────────────────────────────────────────────────────────────────────────
+
+def prepare_frame(ticker: str, timeframe: str = "5y") -> pd.DataFrame:
+    """
+    Prices → indicators → features, NaN rows dropped.
+    """
     df = load_prices(ticker, timeframe)
     df = add_indicators(df)
     df = build_features(df)
-    df = df.dropna().reset_index(drop=True)
-
-    feature_cols = [
-        "rsi_norm",
-        "ema_spread",
-        "macd_diff",
-        "atr_pct",
-    ]
-
-    dataset = TimeSeriesDataset(
-        df=df,
-        feature_cols=feature_cols,
-        target_col="future_return_5d",
-        seq_len=seq_len,
-    )
+    return df.dropna().reset_index(drop=True)
 
-    # -----------------------------
-    # Train / Validation split
-    # -----------------------------
-    train_size = int(0.7 * len(dataset))
-    val_size = len(dataset) - train_size
 
-    train_ds, val_ds = random_split(
-        dataset,
-        [train_size, val_size],
-        generator=torch.Generator().manual_seed(42),
-    )
+def make_loaders(
+    store: Path,
+    seq_len: int = 30,
+    batch_size: int = DL_BATCH_SIZE,
+    val_frac: float = 0.3,
+    num_workers: int = DL_NUM_WORKERS,
+):
+    """
+    Chronologically split train / validation DataLoaders over a window
+    store. Training batches are shuffled (within the training period).
+    """
+    train_ids, val_ids = chronological_split(store, seq_len, val_frac, embargo=HORIZON)
+    if len(train_ids) == 0 or len(val_ids) == 0:
+        raise ValueError("Not enough history for a train / validation split")
 
+    loader_kwargs = {
+        "batch_size":         batch_size,
+        "num_workers":        num_workers,
+        "persistent_workers": num_workers > 0,
+    }
     train_loader = DataLoader(
-        train_ds,
-        batch_size=batch_size,
+        MemmapWindowDataset(store, train_ids, seq_len),
         shuffle=True,
+        generator=torch.Generator().manual_seed(RANDOM_SEED),
+        **loader_kwargs,
     )
-
     val_loader = DataLoader(
-        val_ds,
-        batch_size=batch_size,
+        MemmapWindowDataset(store, val_ids, seq_len),
         shuffle=False,
+        **loader_kwargs,
     )
+    return train_loader, val_loader
+
+
+def export_serving_variants(arch: str, path: Path) -> None:
+    """
+    Write the TorchScript / int8 serving variants of a freshly saved model
+    (src/dl/export.py). A failed export is logged; serving then falls back
+    to the float model.
+    """
+    try:
+        export_dl_model(arch, path, num_features=len(FEATURE_COLS))
+    except Exception as exc:
+        logger.warning(f"{path.name}: export failed ({exc}), serving will use the float model")
+
 
-    num_features = len(feature_cols)
+# ─────────────────────────────────────────────────────────────────────────────
+# Entry point
+# ─────────────────────────────────────────────────────────────────────────────
+
+def train_dl_models(
+    tickers: str | Sequence[str],
+    timeframe: str = "5y",
+    seq_len: int = 30,
+    batch_size: int = DL_BATCH_SIZE,
+    epochs: int = DL_EPOCHS,
+    lr: float = DL_LEARNING_RATE,
+    patience: int = DL_PATIENCE,
+    num_workers: int = DL_NUM_WORKERS,
+    val_frac: float = 0.3,
+    device: str = "cpu",
+    tag: Optional[str] = None,
+    models: Sequence[str] = ("lstm", "tcn"),
+    frames: Optional[Dict[str, pd.DataFrame]] = None,
+) -> Dict:
+    """
+    Train LSTM and Temporal CNN models for 5-day return prediction on
+    windows pooled from `tickers`.
+
+    Models are saved as models/<arch>_<tag>.pt, where tag defaults to the
+    ticker (HDFCBANK_NS) for a single ticker and "universe" otherwise.
+    `frames` (ticker → feature frame) skips downloading.
+
+    Returns dict:
+        tickers, train_windows, val_windows, and per architecture the
+        fit_model() summary plus model_path
+    """
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    tag = tag or (tickers[0].replace(".", "_") if len(tickers) == 1 else "universe")
+    torch.manual_seed(RANDOM_SEED)
 
     # -----------------------------
-    # LSTM Training
+    # Load & pool data
     # -----------------------------
-    print("Training LSTM...")
-    lstm = LSTMPricePredictor(num_features=num_features)
-    train_lstm(
-        model=lstm,
-        train_loader=train_loader,
-        val_loader=val_loader,
-        epochs=epochs,
-        device=device,
-    )
+    if frames is None:
+        frames = {}
+        for ticker in tickers:
+            try:
+                frames[ticker] = prepare_frame(ticker, timeframe)
+            except Exception as exc:
+                logger.warning(f"{ticker}: skipped ({exc})")
+    frames = {t: df for t, df in frames.items() if len(df) > seq_len}
+    if not frames:
+        raise ValueError("No training data for any ticker")
+
+    store = build_window_store(frames, FEATURE_COLS, TARGET_COL, name=tag)
+    train_loader, val_loader = make_loaders(store, seq_len, batch_size, val_frac, num_workers)
 
-    lstm_path = MODEL_DIR / f"lstm_{ticker.replace('.', '_')}.pt"
-    save_lstm(lstm, str(lstm_path))
-    print(f"LSTM saved to {lstm_path}")
+    summary: Dict[str, object] = {
+        "tickers":       list(frames),
+        "train_windows": len(train_loader.dataset),
+        "val_windows":   len(val_loader.dataset),
+    }
+    logger.info(
+        f"{len(frames)} tickers | {summary['train_windows']:,} train / "
+        f"{summary['val_windows']:,} val windows | {num_workers} loader workers"
+    )
 
     # -----------------------------
-    # Temporal CNN Training
+    # Train each architecture
     # -----------------------------
-    print("Training Temporal CNN...")
-    tcn = TemporalCNN(num_features=num_features)
-    tcn.to(device)
+    for arch in models:
+        model_cls, save = ARCHITECTURES[arch]
+        model = model_cls(num_features=len(FEATURE_COLS))
 
-    optimizer = torch.optim.Adam(tcn.parameters(), lr=1e-3)
-    criterion = torch.nn.MSELoss()
+        result = fit_model(
+            model,
+            train_loader,
+            val_loader,
+            epochs=epochs,
+            lr=lr,
+            patience=patience,
+            device=device,
+            checkpoint_path=CHECKPOINT_DIR / f"{arch}_{tag}.best.pt",
+            name=arch.upper(),
+        )
 
-    for epoch in range(1, epochs + 1):
-        tcn.train()
-        train_loss = 0.0
+        path = MODEL_DIR / f"{arch}_{tag}.pt"
+        save(model.cpu(), str(path))
+        # A tuned config from an earlier search no longer describes this model
+        hpo_config_path(path).unlink(missing_ok=True)
+        export_serving_variants(arch, path)
+        logger.info(
+            f"{arch.upper()} saved to {path} (best epoch {result['best_epoch']}, "
+            f"val MSE {result['best_val_loss']:.6f}, {result['samples_per_sec']:,.0f} samples/s)"
+        )
+        summary[arch] = {**result, "model_path": str(path)}
 
-        for x, y in train_loader:
-            x, y = x.to(device), y.to(device)
+    return summary
 
-            optimizer.zero_grad()
-            preds = tcn(x)
-            loss = criterion(preds, y)
-            loss.backward()
-            optimizer.step()
 
-            train_loss += loss.item()
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
 
-        tcn.eval()
-        val_loss = 0.0
-        with torch.no_grad():
-            for x, y in val_loader:
-                x, y = x.to(device), y.to(device)
-                preds = tcn(x)
-                val_loss += criterion(preds, y).item()
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train LSTM / TCN return models")
+    parser.add_argument("tickers", nargs="*", default=["HDFCBANK.NS"], help="Yahoo tickers")
+    parser.add_argument("--nifty50", action="store_true", help="Train on all NIFTY 50 tickers")
+    parser.add_argument("--timeframe", default="5y", choices=["1y", "2y", "5y"])
+    parser.add_argument("--epochs", type=int, default=DL_EPOCHS)
+    parser.add_argument("--batch-size", type=int, default=DL_BATCH_SIZE)
+    parser.add_argument("--patience", type=int, default=DL_PATIENCE)
+    parser.add_argument("--workers", type=int, default=DL_NUM_WORKERS, help="DataLoader worker processes")
+    parser.add_argument("--models", nargs="+", default=["lstm", "tcn"], choices=list(ARCHITECTURES))
+    parser.add_argument("--tag", default=None, help="Model file suffix (default: ticker or 'universe')")
+    args = parser.parse_args()
 
+    tickers = args.tickers
+    if args.nifty50:
+        from src.data.nifty50 import NIFTY_50
+        tickers = list(NIFTY_50.values())
+
+    summary = train_dl_models(
+        tickers,
+        timeframe=args.timeframe,
+        batch_size=args.batch_size,
+        epochs=args.epochs,
+        patience=args.patience,
+        num_workers=args.workers,
+        device="cuda" if torch.cuda.is_available() else "cpu",
+        tag=args.tag,
+        models=args.models,
+    )
+    for arch in args.models:
+        r = summary[arch]
         print(
-            f"Epoch {epoch:03d} | "
-            f"Train MSE: {train_loss / len(train_loader):.6f} | "
-            f"Val MSE: {val_loss / len(val_loader):.6f}"
+            f"{arch.upper()}: best epoch {r['best_epoch']}/{r['epochs_run']}, "
+            f"val MSE {r['best_val_loss']:.6f}, {r['seconds']}s, "
+            f"{r['samples_per_sec']:,.0f} samples/s → {r['model_path']}"
         )
 
-    tcn_path = MODEL_DIR / f"tcn_{ticker.replace('.', '_')}.pt"
-    save_tcn(tcn, str(tcn_path))
-    print(f"TCN saved to {tcn_path}")
-
 
 if __name__ == "__main__":
-    train_dl_models(
-        ticker="HDFCBANK.NS",
-        timeframe="5y",
-        epochs=40,
-        device="cuda" if torch.cuda.is_available() else "cpu",
-    )
\ No newline at end of file
+    main()
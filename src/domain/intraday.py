@@ -2,6 +2,9 @@
 
 import pandas as pd
 import numpy as np
+from typing import Dict, Iterable, Optional
+
+from src.utils.config import MARKET_TIMEZONE
 
 
 def add_intraday_features(df: pd.DataFrame) -> pd.DataFrame:
@@ -15,13 +18,9 @@ def add_intraday_features(df: pd.DataFrame) -> pd.DataFrame:
     data = df.copy()
 
     # -----------------------------
-    # VWAP (intraday anchor)
+    # VWAP (resets every session at 09:15 IST)
     # -----------------------------
-    typical_price = (data["high"] + data["low"] + data["close"]) / 3
-    cumulative_vp = (typical_price * data["volume"]).cumsum()
-    cumulative_vol = data["volume"].cumsum()
-
-    data["vwap"] = cumulative_vp / (cumulative_vol + 1e-9)
+    data["vwap"] = session_vwap(data)
 
     # -----------------------------
     # Fast EMAs (intraday trend)
@@ -73,4 +72,138 @@ def intraday_bias(df: pd.DataFrame) -> str:
     ):
         return "BEARISH"
 
-    return "NEUTRAL"
\ No newline at end of file
+    return "NEUTRAL"
+
+
+def session_vwap(df: pd.DataFrame) -> pd.Series:
+    """
+    VWAP that resets at each session open (09:15 IST).
+
+    Vectorised over any number of sessions with one groupby-cumsum.
+    """
+    typical_price = (df["high"] + df["low"] + df["close"]) / 3
+    pv = typical_price * df["volume"]
+    session = session_keys(df["date"])
+
+    cumulative_vp = pv.groupby(session.values).cumsum()
+    cumulative_vol = df["volume"].groupby(session.values).cumsum()
+
+    return cumulative_vp / (cumulative_vol + 1e-9)
+
+
+def anchored_vwap(
+    df: pd.DataFrame,
+    anchors: Iterable,
+) -> pd.DataFrame:
+    """
+    VWAP accumulated from each anchor timestamp onwards (NaN before it).
+
+    Anchors are arbitrary events: a pivot low, an earnings date, a gap.
+    All anchors are computed together as one (bars x anchors) cumsum.
+
+    Returns:
+        DataFrame indexed like df, one column per anchor (named by the
+        anchor's timestamp).
+    """
+    anchors = list(anchors)
+    if not anchors:
+        return pd.DataFrame(index=df.index)
+
+    dates = pd.to_datetime(df["date"])
+    anchor_ts = pd.to_datetime(pd.Series(anchors))
+    if dates.dt.tz is not None and anchor_ts.dt.tz is None:
+        anchor_ts = anchor_ts.dt.tz_localize(dates.dt.tz)
+
+    typical_price = ((df["high"] + df["low"] + df["close"]) / 3).to_numpy(dtype=float)
+    volume = df["volume"].to_numpy(dtype=float)
+
+    # active[i, j] — bar i is at/after anchor j
+    active = dates.to_numpy()[:, None] >= anchor_ts.to_numpy()[None, :]
+
+    cumulative_vp = np.cumsum(np.where(active, (typical_price * volume)[:, None], 0.0), axis=0)
+    cumulative_vol = np.cumsum(np.where(active, volume[:, None], 0.0), axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = np.where(active, cumulative_vp / cumulative_vol, np.nan)
+
+    return pd.DataFrame(values, index=df.index, columns=[str(a) for a in anchor_ts])
+
+
+def session_keys(dates: pd.Series) -> pd.Series:
+    """
+    Trading-session key (IST calendar day) for each bar.
+    """
+    dates = pd.to_datetime(dates)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert(MARKET_TIMEZONE)
+    return dates.dt.normalize()
+
+
+class IncrementalVWAP:
+    """
+    Bar-by-bar session VWAP plus anchored VWAPs.
+
+    Keeps running sums, so each update is O(1 + anchors) instead of
+    recomputing the whole series. The session VWAP resets on the first bar
+    of a new IST day; anchored VWAPs start on the bar at/after their anchor.
+
+    Usage:
+        state = IncrementalVWAP.from_frame(intraday_df, anchors=[pivot_ts])
+        values = state.update(new_bar)      # {"vwap": ..., "avwap:<ts>": ...}
+    """
+
+    def __init__(self, anchors: Optional[Iterable] = None):
+        self.session = None
+        self.session_pv = 0.0
+        self.session_vol = 0.0
+        self.anchors: Dict[pd.Timestamp, list] = {}
+        for anchor in anchors or []:
+            self.add_anchor(anchor)
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        anchors: Optional[Iterable] = None,
+    ) -> "IncrementalVWAP":
+        state = cls(anchors)
+        for bar in df[["date", "high", "low", "close", "volume"]].itertuples(index=False):
+            state.update(bar._asdict())
+        return state
+
+    def add_anchor(self, anchor) -> None:
+        """
+        Start tracking a VWAP anchored at `anchor` (from the next bar at or
+        after it).
+        """
+        self.anchors[pd.Timestamp(anchor)] = [0.0, 0.0]
+
+    def update(self, bar: Dict) -> Dict[str, float]:
+        """
+        Fold one bar in and return the current VWAP values.
+        """
+        ts = pd.Timestamp(bar["date"])
+        session = session_keys(pd.Series([ts])).iloc[0]
+        if session != self.session:
+            self.session = session
+            self.session_pv = 0.0
+            self.session_vol = 0.0
+
+        typical_price = (bar["high"] + bar["low"] + bar["close"]) / 3
+        volume = float(bar["volume"])
+        pv = typical_price * volume
+
+        self.session_pv += pv
+        self.session_vol += volume
+        values = {"vwap": self.session_pv / (self.session_vol + 1e-9)}
+
+        for anchor, sums in self.anchors.items():
+            anchor_cmp = anchor.tz_localize(ts.tz) if ts.tz is not None and anchor.tz is None else anchor
+            if ts < anchor_cmp:
+                values[f"avwap:{anchor}"] = float("nan")
+                continue
+            sums[0] += pv
+            sums[1] += volume
+            values[f"avwap:{anchor}"] = sums[0] / (sums[1] + 1e-9)
+
+        return values
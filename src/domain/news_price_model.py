@@ -13,11 +13,17 @@ Logic:
 
 This is a heuristic model, not an ML model. It is transparent and
 explainable — every number can be traced back to a news item.
+
+predict_news_price_impact_batch() evaluates the same heuristic with NumPy
+for many tickers and all horizons at once (universe-wide ranking).
 """
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -37,6 +43,14 @@ _HORIZONS = {
     "5d": "3–5 trading days",
 }
 
+# Horizon scaling: longer horizon = larger potential move
+_HORIZON_SCALE = {"1d": 0.6, "3d": 1.0, "5d": 1.4}
+
+_HIGH_IMPACT_TYPES = {"Earnings", "Regulatory", "Management"}
+
+_DIRECTIONS = np.array(["FLAT", "UP", "DOWN"])
+_CONFIDENCES = np.array(["LOW", "MEDIUM", "HIGH"])
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # Public API
@@ -47,6 +61,7 @@ def predict_news_price_impact(
     news_result: Dict,
     atr: float,
     horizon: str = "3d",
+    explain: bool = True,
 ) -> Dict:
     """
     Predict expected price range driven by current news sentiment.
@@ -56,6 +71,7 @@ def predict_news_price_impact(
         news_result   : output of analyze_news_sentiment()
         atr           : current ATR (absolute ₹ value)
         horizon       : "1d" | "3d" | "5d"
+        explain       : build the plain-English explanation (skip when ranking)
 
     Returns dict:
         predicted_price   : float  (point estimate)
@@ -65,7 +81,7 @@ def predict_news_price_impact(
         direction         : UP | DOWN | FLAT
         confidence        : HIGH | MEDIUM | LOW
         horizon_label     : str
-        explanation       : plain-English paragraph
+        explanation       : plain-English paragraph ("" when explain=False)
     """
     weighted_score = news_result.get("weighted_score", 0.0)
     bull_count     = news_result.get("bull_count", 0)
@@ -77,59 +93,35 @@ def predict_news_price_impact(
     if total == 0 or current_price <= 0:
         return _flat_prediction(current_price, horizon)
 
-    # ── Step 1: base move % ─────────────────────────────────────────────────
     # Scale by how "loud" the high-impact news is
-    high_impact_types = {"Earnings", "Regulatory", "Management"}
-    high_impact_items = [d for d in details if d.get("impact_type") in high_impact_types]
-    high_impact_boost  = 1.0 + 0.3 * (len(high_impact_items) / max(total, 1))
-
-    atr_pct     = atr / current_price if current_price > 0 else _ATR_BASELINE
-    atr_scaling = atr_pct / _ATR_BASELINE   # >1 means more volatile stock
-
-    # Horizon scaling: longer horizon = larger potential move
-    horizon_scale = {"1d": 0.6, "3d": 1.0, "5d": 1.4}.get(horizon, 1.0)
-
-    base_move_pct = (
-        weighted_score
-        * _BASE_MOVE_PCT
-        * high_impact_boost
-        * atr_scaling
-        * horizon_scale
+    high_impact_items = [d for d in details if d.get("impact_type") in _HIGH_IMPACT_TYPES]
+
+    out = _impact_arrays(
+        current_price=np.array([current_price], dtype=float),
+        weighted_score=np.array([weighted_score], dtype=float),
+        bull_count=np.array([bull_count], dtype=float),
+        bear_count=np.array([bear_count], dtype=float),
+        neutral_count=np.array([neutral_count], dtype=float),
+        high_impact_count=np.array([len(high_impact_items)], dtype=float),
+        atr=np.array([atr], dtype=float),
+        horizon_scale=np.array([_HORIZON_SCALE.get(horizon, 1.0)]),
     )
 
-    # ── Step 2: uncertainty band ─────────────────────────────────────────────
-    # If all headlines agree → narrow band; mixed → wide band
-    agreement = abs(bull_count - bear_count) / max(total, 1)
-    band_width_pct = atr_pct * (1.5 - agreement)   # wide when mixed
-
-    # ── Step 3: predicted prices ─────────────────────────────────────────────
-    predicted_price = round(current_price * (1 + base_move_pct), 2)
-    price_low       = round(current_price * (1 + base_move_pct - band_width_pct), 2)
-    price_high      = round(current_price * (1 + base_move_pct + band_width_pct), 2)
-
-    expected_move_pct = round(base_move_pct * 100, 2)
-
-    # ── Step 4: direction + confidence ───────────────────────────────────────
-    if abs(expected_move_pct) < 0.3:
-        direction = "FLAT"
-    elif expected_move_pct > 0:
-        direction = "UP"
-    else:
-        direction = "DOWN"
-
-    if agreement > 0.7 and abs(weighted_score) > 0.3:
-        confidence = "HIGH"
-    elif agreement > 0.4 or abs(weighted_score) > 0.15:
-        confidence = "MEDIUM"
-    else:
-        confidence = "LOW"
-
-    explanation = _build_explanation(
-        direction, expected_move_pct, confidence,
-        bull_count, bear_count, neutral_count,
-        high_impact_items, current_price, predicted_price,
-        price_low, price_high, horizon,
-    )
+    predicted_price   = float(out["predicted_price"][0, 0])
+    price_low         = float(out["price_low"][0, 0])
+    price_high        = float(out["price_high"][0, 0])
+    expected_move_pct = float(out["expected_move_pct"][0, 0])
+    direction         = str(out["direction"][0, 0])
+    confidence        = str(out["confidence"][0, 0])
+
+    explanation = ""
+    if explain:
+        explanation = _build_explanation(
+            direction, expected_move_pct, confidence,
+            bull_count, bear_count, neutral_count,
+            high_impact_items, current_price, predicted_price,
+            price_low, price_high, horizon,
+        )
 
     return {
         "predicted_price":    predicted_price,
@@ -143,10 +135,204 @@ def predict_news_price_impact(
     }
 
 
+def predict_news_price_impact_batch(
+    current_price: Sequence[float],
+    weighted_score: Sequence[float],
+    bull_count: Sequence[int],
+    bear_count: Sequence[int],
+    neutral_count: Sequence[int],
+    atr: Sequence[float],
+    high_impact_count: Optional[Sequence[int]] = None,
+    horizons: Sequence[str] = ("1d", "3d", "5d"),
+    tickers: Optional[Sequence[str]] = None,
+    explain: bool = False,
+    high_impact_types: Optional[Sequence[Iterable[str]]] = None,
+) -> pd.DataFrame:
+    """
+    Vectorised news-impact forecast for many tickers × horizons at once.
+
+    Same maths as predict_news_price_impact(), evaluated with NumPy on
+    (n_tickers, n_horizons) arrays. Explanation strings are only built when
+    explain=True, so universe-wide ranking stays cheap.
+
+    Args:
+        current_price     : latest close per ticker (₹)
+        weighted_score    : analyze_news_sentiment()["weighted_score"] per ticker
+        bull_count        : bullish headline counts
+        bear_count        : bearish headline counts
+        neutral_count     : neutral headline counts
+        atr               : absolute ATR per ticker (₹)
+        high_impact_count : Earnings/Regulatory/Management headline counts
+                            (defaults to 0 — no boost)
+        horizons          : any of "1d" | "3d" | "5d"
+        tickers           : labels for the output rows (defaults to 0..n-1)
+        explain           : add an "explanation" column
+        high_impact_types : per-ticker impact-type names, only used in the
+                            explanation text
+
+    Returns long-format DataFrame, one row per (ticker, horizon):
+        ticker, horizon, predicted_price, price_low, price_high,
+        expected_move_pct, direction, confidence, horizon_label
+        [, explanation]
+    """
+    price = np.asarray(current_price, dtype=float)
+    n = len(price)
+    hi_count = (
+        np.zeros(n) if high_impact_count is None
+        else np.asarray(high_impact_count, dtype=float)
+    )
+    horizons = list(horizons)
+
+    out = _impact_arrays(
+        current_price=price,
+        weighted_score=np.asarray(weighted_score, dtype=float),
+        bull_count=np.asarray(bull_count, dtype=float),
+        bear_count=np.asarray(bear_count, dtype=float),
+        neutral_count=np.asarray(neutral_count, dtype=float),
+        high_impact_count=hi_count,
+        atr=np.asarray(atr, dtype=float),
+        horizon_scale=np.array([_HORIZON_SCALE.get(h, 1.0) for h in horizons]),
+    )
+
+    labels = list(tickers) if tickers is not None else list(range(n))
+    result = pd.DataFrame({
+        "ticker":            np.repeat(labels, len(horizons)),
+        "horizon":           np.tile(horizons, n),
+        "predicted_price":   out["predicted_price"].ravel(),
+        "price_low":         out["price_low"].ravel(),
+        "price_high":        out["price_high"].ravel(),
+        "expected_move_pct": out["expected_move_pct"].ravel(),
+        "direction":         out["direction"].ravel(),
+        "confidence":        out["confidence"].ravel(),
+    })
+    result["horizon_label"] = result["horizon"].map(lambda h: _HORIZONS.get(h, h))
+
+    if explain:
+        valid = out["valid"].ravel()
+        bull  = np.repeat(np.asarray(bull_count), len(horizons))
+        bear  = np.repeat(np.asarray(bear_count), len(horizons))
+        neut  = np.repeat(np.asarray(neutral_count), len(horizons))
+        types = (
+            [list(t) for t in high_impact_types] if high_impact_types is not None
+            else [[] for _ in range(n)]
+        )
+        row_types = [types[i] for i in range(n) for _ in horizons]
+
+        result["explanation"] = [
+            _build_explanation(
+                r.direction, r.expected_move_pct, r.confidence,
+                int(bull[i]), int(bear[i]), int(neut[i]),
+                [{"impact_type": t} for t in row_types[i]],
+                None, r.predicted_price, r.price_low, r.price_high, r.horizon,
+            )
+            if valid[i] else _FLAT_EXPLANATION
+            for i, r in enumerate(result.itertuples(index=False))
+        ]
+
+    return result
+
+
+def news_batch_inputs(news_results: Sequence[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Collect analyze_news_sentiment() outputs into the arrays expected by
+    predict_news_price_impact_batch().
+
+    Returns dict with keys:
+        weighted_score, bull_count, bear_count, neutral_count,
+        high_impact_count, high_impact_types
+    """
+    high_impact = [
+        [d.get("impact_type") for d in r.get("details", [])
+         if d.get("impact_type") in _HIGH_IMPACT_TYPES]
+        for r in news_results
+    ]
+    return {
+        "weighted_score":    np.array([r.get("weighted_score", 0.0) for r in news_results], dtype=float),
+        "bull_count":        np.array([r.get("bull_count", 0) for r in news_results], dtype=int),
+        "bear_count":        np.array([r.get("bear_count", 0) for r in news_results], dtype=int),
+        "neutral_count":     np.array([r.get("neutral_count", 0) for r in news_results], dtype=int),
+        "high_impact_count": np.array([len(h) for h in high_impact], dtype=int),
+        "high_impact_types": [sorted(set(h)) for h in high_impact],
+    }
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Helpers
 # ─────────────────────────────────────────────────────────────────────────────
 
+_FLAT_EXPLANATION = "Insufficient news data to generate a price prediction."
+
+
+def _impact_arrays(
+    current_price: np.ndarray,
+    weighted_score: np.ndarray,
+    bull_count: np.ndarray,
+    bear_count: np.ndarray,
+    neutral_count: np.ndarray,
+    high_impact_count: np.ndarray,
+    atr: np.ndarray,
+    horizon_scale: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Core heuristic on (n,) inputs × (h,) horizon scales → (n, h) outputs.
+
+    Rows with no headlines or a non-positive price come back flat.
+    """
+    price = current_price[:, None]
+    total = bull_count + bear_count + neutral_count
+    valid = (total > 0) & (current_price > 0)
+    safe_total = np.maximum(total, 1)
+
+    # ── Step 1: base move % ─────────────────────────────────────────────────
+    high_impact_boost = 1.0 + 0.3 * (high_impact_count / safe_total)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        atr_pct = np.where(current_price > 0, atr / current_price, _ATR_BASELINE)
+    atr_scaling = atr_pct / _ATR_BASELINE   # >1 means more volatile stock
+
+    base_move_pct = (
+        (weighted_score * _BASE_MOVE_PCT * high_impact_boost * atr_scaling)[:, None]
+        * horizon_scale[None, :]
+    )
+    base_move_pct = np.where(valid[:, None], base_move_pct, 0.0)
+
+    # ── Step 2: uncertainty band ─────────────────────────────────────────────
+    # If all headlines agree → narrow band; mixed → wide band
+    agreement = np.abs(bull_count - bear_count) / safe_total
+    band_width_pct = np.where(valid, atr_pct * (1.5 - agreement), 0.0)[:, None]
+
+    # ── Step 3: predicted prices ─────────────────────────────────────────────
+    predicted_price = np.round(price * (1 + base_move_pct), 2)
+    price_low       = np.round(price * (1 + base_move_pct - band_width_pct), 2)
+    price_high      = np.round(price * (1 + base_move_pct + band_width_pct), 2)
+
+    expected_move_pct = np.round(base_move_pct * 100, 2)
+
+    # ── Step 4: direction + confidence ───────────────────────────────────────
+    direction_idx = np.where(
+        np.abs(expected_move_pct) < 0.3, 0,
+        np.where(expected_move_pct > 0, 1, 2),
+    )
+
+    abs_score = np.abs(weighted_score)
+    confidence_idx = np.where(
+        (agreement > 0.7) & (abs_score > 0.3), 2,
+        np.where((agreement > 0.4) | (abs_score > 0.15), 1, 0),
+    )
+    confidence_idx = np.where(valid, confidence_idx, 0)
+    confidence_idx = np.broadcast_to(confidence_idx[:, None], direction_idx.shape)
+
+    return {
+        "valid":             np.broadcast_to(valid[:, None], direction_idx.shape),
+        "predicted_price":   predicted_price,
+        "price_low":         price_low,
+        "price_high":        price_high,
+        "expected_move_pct": expected_move_pct,
+        "direction":         _DIRECTIONS[direction_idx],
+        "confidence":        _CONFIDENCES[confidence_idx],
+    }
+
+
 def _flat_prediction(price: float, horizon: str) -> Dict:
     return {
         "predicted_price":   round(price, 2),
@@ -156,7 +342,7 @@ def _flat_prediction(price: float, horizon: str) -> Dict:
         "direction":         "FLAT",
         "confidence":        "LOW",
         "horizon_label":     _HORIZONS.get(horizon, horizon),
-        "explanation":       "Insufficient news data to generate a price prediction.",
+        "explanation":       _FLAT_EXPLANATION,
     }
 
 
@@ -3,7 +3,7 @@
 Trade Setup Engine — generates actionable Intraday and Swing trade setups.
 
 Intraday setup  → uses 15-min candles (last 5 trading days)
-Swing setup     → uses daily candles (last 6 months)
+Swing setup     → uses daily candles (last 6 months), weekly bars for context
 
 Both setups produce:
     entry_zone   : (low, high) price range to enter
@@ -25,7 +25,7 @@ import numpy as np
 import pandas as pd
 
 from src.domain.indicators import add_indicators
-from src.domain.intraday import add_intraday_features, intraday_bias
+from src.domain.intraday import add_intraday_features, anchored_vwap, intraday_bias
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -96,6 +96,11 @@ def build_intraday_setup(
             "Resistance": round(resistance, 2),
         }
 
+        # VWAP anchored at the window's pivot low (where buyers last took over)
+        low_anchor = intra.loc[intra["low"].idxmin(), "date"]
+        avwap = float(anchored_vwap(intra, [low_anchor]).iloc[-1, 0])
+        key_levels["AVWAP (Low)"] = round(avwap, 2)
+
         plan = _intraday_plan(
             bias, price, vwap, ema_9, ema_21,
             entry_low, entry_high, stop_loss, target_1, target_2,
@@ -125,13 +130,16 @@ def build_intraday_setup(
 def build_swing_setup(
     daily_df: pd.DataFrame,
     ticker: str = "",
+    weekly_df: Optional[pd.DataFrame] = None,
 ) -> Dict:
     """
     Generate a swing trade setup from daily candles.
 
     Args:
-        daily_df : daily OHLCV (at least 60 rows recommended)
-        ticker   : symbol string
+        daily_df  : daily OHLCV (at least 60 rows recommended)
+        ticker    : symbol string
+        weekly_df : weekly OHLCV (src/data/resample.py); adds the previous
+                    week's range to the key levels
 
     Returns:
         Setup dict (see module docstring for keys).
@@ -189,6 +197,11 @@ def build_swing_setup(
             "52W Low":     round(float(df["low"].tail(252).min()), 2),
         }
 
+        if weekly_df is not None and len(weekly_df) >= 2:
+            prev_week = weekly_df.iloc[-2]
+            key_levels["Prev Week High"] = round(float(prev_week["high"]), 2)
+            key_levels["Prev Week Low"]  = round(float(prev_week["low"]), 2)
+
         plan = _swing_plan(
             bias, price, ema20, ema50, rsi, macd, macd_sig,
             entry_low, entry_high, stop_loss, target_1, target_2,
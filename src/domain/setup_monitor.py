@@ -0,0 +1,224 @@
+# src/domain/setup_monitor.py
+"""
+Setup Monitor — event-driven re-evaluation of open trade setups.
+
+Instead of rebuilding every intraday / swing setup on every bar, the monitor
+keeps each setup's levels in one table (entry zones in a pandas
+IntervalIndex) and, per batch of new bars, checks all setups at once with a
+vectorised comparison:
+
+    entered   : bar range overlaps the entry zone          (pending → active)
+    stopped   : bar breaches the stop loss                  (→ closed)
+    target_1  : bar reaches target 1                        (→ closed)
+    target_2  : bar reaches target 2                        (→ closed)
+
+Only setups that closed are rebuilt (via the `rebuild` callback); the rest
+cost one row of array arithmetic per bar, so monitoring the whole universe
+is cheap. Long setups are BULLISH / NEUTRAL (stop below, targets above),
+short setups are BEARISH. When a bar hits both stop and target the stop
+wins (conservative, as intrabar order is unknown).
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────────────────────────────────────
+
+_COLUMNS = [
+    "setup_id", "ticker", "mode", "bias", "entry_low", "entry_high",
+    "stop_loss", "target_1", "target_2", "status", "created_at",
+]
+
+RebuildFn = Callable[[str, str], Optional[Dict]]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Monitor
+# ─────────────────────────────────────────────────────────────────────────────
+
+class SetupMonitor:
+    """
+    Tracks open setups across tickers and fires only on level crosses.
+
+    Args:
+        rebuild : callback(ticker, mode) → new setup dict (or None), called
+                  for each setup that was stopped out or hit a target
+    """
+
+    def __init__(self, rebuild: Optional[RebuildFn] = None):
+        self.rebuild = rebuild
+        self._setups = pd.DataFrame(columns=_COLUMNS)
+        self._zones = pd.IntervalIndex.from_arrays([], [], closed="both")
+        self._next_id = 0
+
+    # ── Registration ─────────────────────────────────────────────────────────
+
+    def add(self, ticker: str, setup: Dict, created_at=None) -> Optional[int]:
+        """
+        Start monitoring a setup from build_intraday_setup / build_swing_setup.
+
+        Setups with an error or a zero-width entry zone are ignored.
+        Returns the setup id.
+        """
+        if setup.get("error"):
+            return None
+        entry_low, entry_high = setup["entry_zone"]
+        if not entry_high > 0:
+            return None
+
+        setup_id = self._next_id
+        self._next_id += 1
+
+        row = {
+            "setup_id":   setup_id,
+            "ticker":     ticker,
+            "mode":       setup["mode"],
+            "bias":       setup["bias"],
+            "entry_low":  float(min(entry_low, entry_high)),
+            "entry_high": float(max(entry_low, entry_high)),
+            "stop_loss":  float(setup["stop_loss"]),
+            "target_1":   float(setup["target_1"]),
+            "target_2":   float(setup["target_2"]),
+            "status":     "pending",
+            "created_at": created_at,
+        }
+        frame = pd.DataFrame([row], columns=_COLUMNS)
+        self._setups = frame if self._setups.empty else pd.concat([self._setups, frame], ignore_index=True)
+        self._reindex()
+        return setup_id
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def open_setups(self) -> pd.DataFrame:
+        """
+        Every setup still pending or active.
+        """
+        return self._setups[self._setups["status"].isin(["pending", "active"])].reset_index(drop=True)
+
+    def prune(self) -> pd.DataFrame:
+        """
+        Drop closed setups from the table and return them.
+        """
+        open_mask = self._setups["status"].isin(["pending", "active"])
+        closed = self._setups[~open_mask].reset_index(drop=True)
+        self._setups = self._setups[open_mask].reset_index(drop=True)
+        self._reindex()
+        return closed
+
+    def setups_at(self, ticker: str, price: float) -> pd.DataFrame:
+        """
+        Open setups of `ticker` whose entry zone contains `price`.
+        """
+        hit = self._zones.contains(price) & (self._setups["ticker"] == ticker).to_numpy()
+        open_ = self._setups["status"].isin(["pending", "active"]).to_numpy()
+        return self._setups[hit & open_].reset_index(drop=True)
+
+    # ── Bar processing ───────────────────────────────────────────────────────
+
+    def on_bars(self, bars: pd.DataFrame) -> pd.DataFrame:
+        """
+        Check all open setups against a batch of new bars.
+
+        Args:
+            bars : one or more bars per ticker — columns ticker, date, high,
+                   low, close (processed in date order)
+
+        Returns:
+            DataFrame of events (setup_id, ticker, mode, event, price, date).
+        """
+        events: List[pd.DataFrame] = []
+        if bars.empty or self._setups.empty:
+            return pd.DataFrame(columns=["setup_id", "ticker", "mode", "event", "price", "date"])
+
+        for _, batch in bars.sort_values("date").groupby("date", sort=True):
+            events.append(self._check(batch))
+
+        out = pd.concat(events, ignore_index=True)
+        self._rebuild_closed(out)
+        return out
+
+    # ── Internals ────────────────────────────────────────────────────────────
+
+    def _check(self, batch: pd.DataFrame) -> pd.DataFrame:
+        open_mask = self._setups["status"].isin(["pending", "active"]).to_numpy()
+        if not open_mask.any():
+            return pd.DataFrame(columns=["setup_id", "ticker", "mode", "event", "price", "date"])
+
+        # Align the latest bar of each ticker with every open setup
+        last = batch.drop_duplicates("ticker", keep="last").set_index("ticker")
+        tickers = self._setups["ticker"]
+        has_bar = tickers.isin(last.index).to_numpy() & open_mask
+        if not has_bar.any():
+            return pd.DataFrame(columns=["setup_id", "ticker", "mode", "event", "price", "date"])
+
+        high = last["high"].reindex(tickers).to_numpy(dtype=float)
+        low = last["low"].reindex(tickers).to_numpy(dtype=float)
+        date = last["date"].reindex(tickers).to_numpy()
+
+        s = self._setups
+        short = (s["bias"] == "BEARISH").to_numpy()
+        stop = s["stop_loss"].to_numpy(dtype=float)
+        t1 = s["target_1"].to_numpy(dtype=float)
+        t2 = s["target_2"].to_numpy(dtype=float)
+        pending = (s["status"] == "pending").to_numpy()
+        active = (s["status"] == "active").to_numpy()
+
+        # Entry: bar range overlaps the entry interval
+        entered = has_bar & pending & (low <= self._zones.right.to_numpy()) & (high >= self._zones.left.to_numpy())
+
+        live = has_bar & (active | entered)
+        stopped = live & np.where(short, high >= stop, low <= stop)
+        hit_t2 = live & ~stopped & np.where(short, low <= t2, high >= t2)
+        hit_t1 = live & ~stopped & ~hit_t2 & np.where(short, low <= t1, high >= t1)
+
+        status = s["status"].to_numpy(dtype=object).copy()
+        status[entered] = "active"
+        status[stopped] = "stopped"
+        status[hit_t1] = "target_1"
+        status[hit_t2] = "target_2"
+        self._setups["status"] = status
+
+        frames = []
+        for event, mask, price in (
+            ("entered",  entered, np.where(short, s["entry_low"], s["entry_high"])),
+            ("stopped",  stopped, stop),
+            ("target_1", hit_t1,  t1),
+            ("target_2", hit_t2,  t2),
+        ):
+            if mask.any():
+                frames.append(pd.DataFrame({
+                    "setup_id": s["setup_id"].to_numpy()[mask],
+                    "ticker":   tickers.to_numpy()[mask],
+                    "mode":     s["mode"].to_numpy()[mask],
+                    "event":    event,
+                    "price":    np.asarray(price, dtype=float)[mask],
+                    "date":     date[mask],
+                }))
+
+        if not frames:
+            return pd.DataFrame(columns=["setup_id", "ticker", "mode", "event", "price", "date"])
+        return pd.concat(frames, ignore_index=True)
+
+    def _rebuild_closed(self, events: pd.DataFrame) -> None:
+        if self.rebuild is None or events.empty:
+            return
+
+        closed = events[events["event"] != "entered"]
+        for ticker, mode in closed[["ticker", "mode"]].drop_duplicates().itertuples(index=False):
+            setup = self.rebuild(ticker, mode)
+            if setup is not None:
+                self.add(ticker, setup)
+
+    def _reindex(self) -> None:
+        self._zones = pd.IntervalIndex.from_arrays(
+            self._setups["entry_low"].astype(float),
+            self._setups["entry_high"].astype(float),
+            closed="both",
+        )
@@ -1,6 +1,6 @@
 # src/ml/explain.py
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 import numpy as np
 
 try:
@@ -52,18 +52,29 @@ def explain_prediction(
     model,
     x_row: np.ndarray,
     feature_names: List[str],
+    X_background: Optional[np.ndarray] = None,
 ) -> Dict[str, float]:
     """
     Explain a single prediction.
 
+    Tree models, and any model given `X_background`, use the explainer
+    cached per model (see src.ml.shap_explain.get_explainer); its
+    background is summarised from the first X_background passed. Other
+    models without a background get a one-off explainer with x_row as its
+    background, kept out of the cache.
+
     Returns:
         {feature_name: contribution}
     """
 
     if _SHAP_AVAILABLE:
-        explainer = shap.Explainer(model, x_row.reshape(1, -1))
-        shap_values = explainer(x_row.reshape(1, -1))
-        contribs = shap_values.values[0]
+        from src.ml.shap_explain import _TREE_TYPES, explain_batch
+
+        x = x_row.reshape(1, -1)
+        if X_background is not None or type(model).__name__ in _TREE_TYPES:
+            contribs = explain_batch(model, x, feature_names, X_background=X_background).values[0]
+        else:
+            contribs = shap.Explainer(model, x)(x).values[0]
 
     elif hasattr(model, "coef_"):
         contribs = model.coef_.ravel() * x_row
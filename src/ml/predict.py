@@ -4,7 +4,8 @@ from typing import Dict
 import numpy as np
 import pandas as pd
 
-from src.ml.model import load_model, predict, predict_proba
+from src.ml.model import load_model, load_schema, predict, predict_proba
+from src.utils.config import FEATURE_COLUMNS
 
 
 def predict_next_week(
@@ -12,14 +13,21 @@ def predict_next_week(
     company: str,
     model_name: str = "ml_return_model",
     task: str = "regression",
+    model=None,
 ) -> Dict[str, float]:
     """
     Predict next-week price movement using classical ML.
     If model not found, return neutral prediction.
+
+    Pass an already-loaded `model` to skip loading `model_name` from disk.
+
+    Features are the columns the model was trained on, in training order:
+    the saved schema (src/ml/train.py), else the model's feature_names_in_,
+    else FEATURE_COLUMNS.
     """
 
     try:
-        model = load_model(model_name)
+        model = model if model is not None else load_model(model_name)
     except Exception:
         return {
             "prediction": 0.0,
@@ -27,16 +35,20 @@ def predict_next_week(
             "confidence": 0.0,
         }
 
-    feature_cols = [
-        c for c in df.columns
-        if c not in (
-            "future_return_5d",
-            "future_direction_5d",
-            "date",
-        )
-    ]
+    schema = load_schema(model_name)
+    feature_cols = list(
+        schema.get("feature_columns")
+        or getattr(model, "feature_names_in_", FEATURE_COLUMNS)
+    )
+    task = schema.get("task", task)
+
+    missing = set(feature_cols) - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing model features: {sorted(missing)}")
 
-    latest_X = df[feature_cols].iloc[-1:].values
+    latest_X = df[feature_cols].iloc[-1:]
+    if not hasattr(model, "feature_names_in_"):
+        latest_X = latest_X.to_numpy()
     y_pred = predict(model, latest_X)[0]
 
     if task == "classification":
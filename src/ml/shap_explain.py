@@ -2,12 +2,26 @@
 """
 SHAP-based explainability for the ML ensemble.
 
-Uses TreeExplainer for RandomForest / GradientBoosting (exact, fast).
+Uses TreeExplainer for RandomForest / (Hist)GradientBoosting (exact, fast).
 Falls back to KernelExplainer for unsupported model types.
+
+Explainers are cached per model (identity + optional version) together with
+a fixed k-means summary of the background data, so a per-request
+explanation is a single explainer(X_row) call.
+
+KernelExplainer runs under a wall-time limit per explanation: nsamples is
+sized from the measured model cost (re-calibrated after each row), and the
+shap_values call runs on a worker thread with a deadline. When even the
+minimum sample count would overrun the limit, or the run misses its
+deadline, a baseline-ablation approximation is returned instead.
+explain_row() reports which method, limit and actual time each result took.
 """
 
 from __future__ import annotations
 
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from typing import Dict, List, Optional
 import numpy as np
 import pandas as pd
@@ -19,6 +33,51 @@ except ImportError:
     _SHAP_AVAILABLE = False
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────────────────────────────────────
+
+BACKGROUND_CLUSTERS = 20          # k-means centroids kept as the background
+_MAX_CACHED_EXPLAINERS = 8
+
+KERNEL_BUDGET_SECONDS = 2.0       # max wall time per KernelExplainer row
+_KERNEL_BUDGET_SHARE = 0.8        # keep headroom for SHAP's own overhead
+_KERNEL_WORKERS = 2               # concurrent KernelExplainer runs
+
+_TREE_TYPES = {
+    "RandomForestClassifier",
+    "RandomForestRegressor",
+    "GradientBoostingClassifier",
+    "GradientBoostingRegressor",
+    "HistGradientBoostingClassifier",
+    "HistGradientBoostingRegressor",
+    "DecisionTreeClassifier",
+    "DecisionTreeRegressor",
+    "ExtraTreesClassifier",
+    "ExtraTreesRegressor",
+    "XGBClassifier",
+    "XGBRegressor",
+    "LGBMClassifier",
+    "LGBMRegressor",
+}
+
+_LINEAR_TYPES = {
+    "LogisticRegression",
+    "LinearRegression",
+    "Ridge",
+    "Lasso",
+    "LinearSVC",
+    "SGDClassifier",
+}
+
+_EXPLAINER_CACHE: Dict[tuple, Dict] = {}
+_CACHE_LOCK = threading.Lock()
+
+# A run that misses its deadline cannot be interrupted; it finishes on its
+# worker thread and its result is discarded
+_KERNEL_POOL = ThreadPoolExecutor(max_workers=_KERNEL_WORKERS, thread_name_prefix="shap-kernel")
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Public API
 # ─────────────────────────────────────────────────────────────────────────────
@@ -28,16 +87,19 @@ def compute_shap_values(
     X_background: np.ndarray,
     X_explain: np.ndarray,
     feature_names: List[str],
+    version: Optional[str] = None,
 ) -> Optional[Dict[str, float]]:
     """
     Compute SHAP values for a single prediction row (X_explain).
 
     Args:
         model:          Trained sklearn model (RF / GBM / LogReg supported)
-        X_background:   Background dataset for KernelExplainer fallback
-                        (use a small representative sample, e.g. 50–100 rows)
+        X_background:   Background dataset for Linear / Kernel explainers;
+                        only read the first time `model` is explained
         X_explain:      Single row to explain, shape (1, n_features)
         feature_names:  Column names matching X_explain
+        version:        Model version tag (e.g. file mtime); a new tag
+                        rebuilds the cached explainer
 
     Returns:
         Dict mapping feature name → SHAP value (float), or None if SHAP
@@ -46,22 +108,127 @@ def compute_shap_values(
     if not _SHAP_AVAILABLE:
         return None
 
-    explainer = _build_explainer(model, X_background)
-    raw = explainer(X_explain)
+    return explain_row(
+        model,
+        X_background,
+        X_explain,
+        feature_names,
+        version=version,
+    )["values"]
 
-    # shap_values.values shape: (1, n_features) for regression
-    # or (1, n_features, n_classes) for multi-class — take class-1 slice
-    vals = raw.values
-    if vals.ndim == 3:
-        vals = vals[:, :, 1]          # class = UP (positive class)
-    shap_row = vals[0]                # shape: (n_features,)
+
+def explain_row(
+    model,
+    X_background: Optional[np.ndarray],
+    X_explain: np.ndarray,
+    feature_names: List[str],
+    version: Optional[str] = None,
+    budget_seconds: float = KERNEL_BUDGET_SECONDS,
+) -> Dict:
+    """
+    Explain one row and report how the explanation was produced.
+
+    Tree / linear models use their exact explainers. Other models use
+    KernelExplainer with nsamples sized to fit `budget_seconds`, and the
+    run is abandoned when it is still going at the deadline. In that case,
+    or when the budget cannot fit the minimum sample count, a
+    baseline-ablation approximation (one model call per feature ×
+    background centroid) is returned instead.
+
+    Returns dict with keys:
+        values          {feature: contribution}
+        method          "tree" | "linear" | "kernel" | "ablation"
+        nsamples        KernelExplainer samples (attempted ones when
+                        timed_out; None for the other methods)
+        budget_seconds  limit in force (None for exact explainers)
+        timed_out       KernelExplainer missed the deadline
+        seconds         wall time spent
+    """
+    if not _SHAP_AVAILABLE:
+        raise ImportError("shap is required for explanations")
+
+    start = time.perf_counter()
+    entry = get_explainer(model, X_background, version=version)
+    X_explain = np.asarray(X_explain, dtype=float).reshape(1, -1)
+
+    method, nsamples, budget, timed_out = entry["kind"], None, None, False
+
+    if entry["kind"] == "kernel":
+        budget = budget_seconds
+        nsamples = _kernel_nsamples(entry, X_explain.shape[1], budget)
+        shap_row = None
+        if nsamples is not None:
+            predicted = _kernel_seconds(entry, nsamples)
+            remaining = max(budget - (time.perf_counter() - start), 0.0)
+            future = _KERNEL_POOL.submit(_timed_shap_values, entry["explainer"], X_explain, nsamples)
+            try:
+                raw, seconds = future.result(timeout=remaining)
+                shap_row = _positive_class(_as_array(raw))[0]
+                _calibrate_kernel(entry, predicted, seconds)
+            except FutureTimeout:
+                future.cancel()
+                timed_out = True
+                # Only known to overrun — halve what the next row can afford
+                entry["row_seconds"] *= 2.0
+        if shap_row is None:
+            method = "ablation"
+            shap_row = _ablation_values(model, entry["background"], X_explain[0])
+    else:
+        shap_row = _positive_class(entry["explainer"](X_explain).values)[0]
 
     return {
-        name: float(v)
-        for name, v in zip(feature_names, shap_row)
+        "values":         {name: float(v) for name, v in zip(feature_names, shap_row)},
+        "method":         method,
+        "nsamples":       nsamples,
+        "budget_seconds": budget,
+        "timed_out":      timed_out,
+        "seconds":        round(time.perf_counter() - start, 4),
     }
 
 
+def explain_batch(
+    model,
+    X: np.ndarray,
+    feature_names: List[str],
+    X_background: Optional[np.ndarray] = None,
+    chunk_size: int = 512,
+    n_jobs: int = 1,
+    version: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    SHAP values for many rows (e.g. the full price history).
+
+    Rows are explained in chunks with one reused explainer. With n_jobs > 1
+    (tree models only) the rows are split into one contiguous group per
+    joblib worker; each task unpickles the model and builds its
+    TreeExplainer once, then walks its group in chunks.
+
+    Returns:
+        DataFrame of shape (len(X), n_features) — one column per feature.
+    """
+    if not _SHAP_AVAILABLE:
+        raise ImportError("shap is required for batch explanations")
+
+    X = np.asarray(X, dtype=float)
+    chunks = [X[i:i + chunk_size] for i in range(0, len(X), chunk_size)]
+
+    tree_model = type(model).__name__ in _TREE_TYPES
+    if n_jobs != 1 and tree_model and len(chunks) > 1:
+        from joblib import Parallel, delayed, effective_n_jobs
+
+        n_groups = min(effective_n_jobs(n_jobs), len(chunks))
+        groups = np.array_split(X, n_groups)
+        parts = Parallel(n_jobs=n_groups)(
+            delayed(_tree_shap_group)(model, group, chunk_size) for group in groups
+        )
+    else:
+        explainer = get_explainer(model, X_background, version=version)["explainer"]
+        parts = [_positive_class(explainer(chunk).values) for chunk in chunks]
+
+    vals = np.vstack(parts) if parts else np.empty((0, len(feature_names)))
+    return pd.DataFrame(vals, columns=feature_names)
+
+
 def rank_features_by_impact(
     shap_values: Dict[str, float],
     top_n: int = 9,
@@ -112,11 +279,9 @@ def global_feature_importance(
             )
         return {}
 
-    explainer = _build_explainer(model, X)
+    explainer = get_explainer(model, X)["explainer"]
     raw = explainer(X)
-    vals = raw.values
-    if vals.ndim == 3:
-        vals = vals[:, :, 1]
+    vals = _positive_class(raw.values)
 
     mean_abs = np.abs(vals).mean(axis=0)
     ranked = sorted(
@@ -128,53 +293,186 @@ def global_feature_importance(
     return {k: float(v) for k, v in ranked}
 
 
+def get_explainer(
+    model,
+    X_background: Optional[np.ndarray] = None,
+    version: Optional[str] = None,
+    n_clusters: int = BACKGROUND_CLUSTERS,
+) -> Dict:
+    """
+    Return the cached explainer for `model`, building it on first use.
+
+    The background is summarised once into k-means centroids and kept with
+    the explainer, so later calls ignore `X_background`. Tree models skip
+    the summary: TreeExplainer does not use a background.
+
+    Returns dict with keys:
+        explainer, background (np.ndarray | None), kind, version
+    """
+    key = (id(model), version)
+
+    with _CACHE_LOCK:
+        entry = _EXPLAINER_CACHE.get(key)
+        if entry is not None and entry["model"] is model:
+            return entry
+
+    tree_model = type(model).__name__ in _TREE_TYPES
+    background = None if tree_model else summarize_background(X_background, n_clusters)
+    explainer, kind = _build_explainer(model, background)
+    entry = {
+        "model":      model,
+        "explainer":  explainer,
+        "background": background,
+        "kind":       kind,
+        "version":    version,
+    }
+
+    with _CACHE_LOCK:
+        if len(_EXPLAINER_CACHE) >= _MAX_CACHED_EXPLAINERS:
+            _EXPLAINER_CACHE.pop(next(iter(_EXPLAINER_CACHE)))
+        _EXPLAINER_CACHE[key] = entry
+    return entry
+
+
+def summarize_background(
+    X: Optional[np.ndarray],
+    n_clusters: int = BACKGROUND_CLUSTERS,
+) -> Optional[np.ndarray]:
+    """
+    Reduce a background set to `n_clusters` k-means centroids.
+    """
+    if X is None:
+        return None
+
+    X = np.asarray(X, dtype=float)
+    X = X[np.isfinite(X).all(axis=1)]
+    if len(X) <= n_clusters:
+        return X
+
+    from sklearn.cluster import KMeans
+
+    km = KMeans(n_clusters=n_clusters, n_init=3, random_state=42).fit(X)
+    return km.cluster_centers_
+
+
+def clear_explainer_cache() -> None:
+    """
+    Drop every cached explainer (e.g. after retraining a model in place).
+    """
+    with _CACHE_LOCK:
+        _EXPLAINER_CACHE.clear()
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Internal helpers
 # ─────────────────────────────────────────────────────────────────────────────
 
-def _build_explainer(model, X_background: np.ndarray):
+def _build_explainer(model, X_background: Optional[np.ndarray]):
     """
     Pick the best SHAP explainer for the given model type.
 
     Priority:
-        TreeExplainer  → RF, GBM (exact, fast)
+        TreeExplainer  → RF, GBM, HistGBM (exact, fast)
         LinearExplainer → LogReg / LinearSVC
         KernelExplainer → anything else (slow, approximate)
     """
     model_cls = type(model).__name__
 
-    tree_types = {
-        "RandomForestClassifier",
-        "RandomForestRegressor",
-        "GradientBoostingClassifier",
-        "GradientBoostingRegressor",
-        "DecisionTreeClassifier",
-        "DecisionTreeRegressor",
-        "ExtraTreesClassifier",
-        "ExtraTreesRegressor",
-        "XGBClassifier",
-        "XGBRegressor",
-        "LGBMClassifier",
-        "LGBMRegressor",
-    }
-
-    linear_types = {
-        "LogisticRegression",
-        "LinearRegression",
-        "Ridge",
-        "Lasso",
-        "LinearSVC",
-        "SGDClassifier",
-    }
+    if model_cls in _TREE_TYPES:
+        return shap.TreeExplainer(model), "tree"
 
-    if model_cls in tree_types:
-        return shap.TreeExplainer(model)
+    if X_background is None:
+        raise ValueError(f"{model_cls} needs background data for SHAP")
 
-    if model_cls in linear_types:
+    if model_cls in _LINEAR_TYPES:
         # LinearExplainer needs a masker / background data
         masker = shap.maskers.Independent(X_background, max_samples=100)
-        return shap.LinearExplainer(model, masker)
+        return shap.LinearExplainer(model, masker), "linear"
 
     # Generic fallback
-    background = shap.sample(X_background, 50)
-    return shap.KernelExplainer(model.predict, background)
+    return shap.KernelExplainer(model.predict, X_background), "kernel"
+
+
+def _positive_class(vals: np.ndarray) -> np.ndarray:
+    # shap_values.values shape: (n, n_features) for regression
+    # or (n, n_features, n_classes) for classifiers — take class-1 slice
+    if vals.ndim == 3:
+        return vals[:, :, 1]          # class = UP (positive class)
+    return vals
+
+
+def _tree_shap_group(model, X: np.ndarray, chunk_size: int) -> np.ndarray:
+    # Runs in a worker process on an unpickled copy of the model; the copy
+    # is new on every task, so build the explainer here instead of caching it
+    explainer = shap.TreeExplainer(model)
+    parts = [
+        _positive_class(explainer(X[i:i + chunk_size]).values)
+        for i in range(0, len(X), chunk_size)
+    ]
+    return np.vstack(parts)
+
+
+def _as_array(raw) -> np.ndarray:
+    # KernelExplainer returns a list per output on older shap versions
+    if isinstance(raw, list):
+        return np.stack(raw, axis=-1)
+    return np.asarray(raw)
+
+
+def _model_row_seconds(entry: Dict) -> float:
+    # Measured once per explainer: model.predict cost per input row
+    if "row_seconds" not in entry:
+        probe = np.repeat(entry["background"], 10, axis=0)
+        start = time.perf_counter()
+        entry["model"].predict(probe)
+        entry["row_seconds"] = max((time.perf_counter() - start) / len(probe), 1e-9)
+    return entry["row_seconds"]
+
+
+def _timed_shap_values(explainer, X: np.ndarray, nsamples: int):
+    # Runs on a _KERNEL_POOL thread; times the shap_values call alone
+    start = time.perf_counter()
+    raw = explainer.shap_values(X, nsamples=nsamples, silent=True)
+    return raw, time.perf_counter() - start
+
+
+def _kernel_seconds(entry: Dict, nsamples: int) -> float:
+    # KernelExplainer evaluates the model on nsamples × background rows
+    return nsamples * len(entry["background"]) * _model_row_seconds(entry)
+
+
+def _kernel_nsamples(entry: Dict, n_features: int, budget: float) -> Optional[int]:
+    """
+    Largest nsamples that fits the budget, capped at SHAP's own "auto"
+    (2·M + 2048). None when even 2·M + 1 samples would overrun.
+    """
+    per_sample = len(entry["background"]) * _model_row_seconds(entry)
+    affordable = int(budget * _KERNEL_BUDGET_SHARE / per_sample)
+
+    lo, hi = 2 * n_features + 1, 2 * n_features + 2048
+    if affordable < lo:
+        return None
+    return min(affordable, hi)
+
+
+def _calibrate_kernel(entry: Dict, predicted: float, actual: float) -> None:
+    # Fold the observed overhead back in so the next row sizes better
+    if predicted > 0:
+        entry["row_seconds"] *= min(max(actual / predicted, 0.5), 4.0)
+
+
+def _ablation_values(model, background: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    Baseline ablation: contribution_i = f(x) − mean_b f(x with x_i := b_i).
+
+    Costs n_features × n_background model rows in one predict call.
+    """
+    n_bg, n_feat = len(background), len(x)
+    X = np.tile(x, (n_feat * n_bg, 1))
+    for i in range(n_feat):
+        X[i * n_bg:(i + 1) * n_bg, i] = background[:, i]
+
+    # Multi-output predict → keep the last output (positive class)
+    preds = np.asarray(model.predict(X), dtype=float).reshape(n_feat, n_bg, -1)[..., -1]
+    base = float(np.ravel(model.predict(x.reshape(1, -1)))[-1])
+    return base - preds.mean(axis=1)
@@ -0,0 +1,215 @@
+# src/ml/shap_history.py
+"""
+SHAP History — per-bar SHAP values for the full price history.
+
+Every historical bar of a ticker is explained once with the batched
+TreeSHAP path (src/ml/shap_explain.explain_batch) and stored column-wise,
+so the dashboard can plot SHAP drift without recomputing. Updates are
+incremental: only bars newer than the stored history are explained, and a
+new model version triggers a full rebuild.
+
+Layout:
+    data/shap/<TICKER>.parquet   (one row per bar: date, model_version,
+                                  one column per feature)
+    data/shap/<TICKER>.csv       (fallback when pyarrow is not installed)
+
+Run:
+    python -m src.ml.shap_history HDFCBANK.NS --timeframe 5y --jobs 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+from src.ml.shap_explain import explain_batch
+from src.utils.config import DATA_DIR, FEATURE_COLUMNS
+from src.utils.logger import get_logger
+
+logger = get_logger("shap_history")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────────────────────────────────────
+
+SHAP_DIR = DATA_DIR / "shap"
+
+try:
+    import pyarrow  # noqa: F401
+    _STORE_SUFFIX = ".parquet"
+except ImportError:
+    _STORE_SUFFIX = ".csv"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────────────────────────────────────
+
+def update_shap_history(
+    ticker: str,
+    feature_df: pd.DataFrame,
+    model,
+    version: str = "",
+    chunk_size: int = 512,
+    n_jobs: int = 1,
+) -> pd.DataFrame:
+    """
+    Explain every bar of `feature_df` not yet in the store and persist.
+
+    Args:
+        ticker      : Yahoo ticker, used as the store key
+        feature_df  : build_features() output with a "date" column
+        model       : fitted tree model (RF / GBM / HistGB …)
+        version     : model version tag; a change rebuilds the history
+        chunk_size  : rows per explainer call
+        n_jobs      : joblib processes across chunks (1 = in-process)
+
+    Returns the full stored history (date, model_version, <features>).
+    """
+    feat_cols = _model_columns(model, feature_df)
+    frame = feature_df.dropna(subset=feat_cols)
+
+    history = load_shap_history(ticker)
+    if not history.empty and (history["model_version"] != version).any():
+        history = history.iloc[0:0]
+
+    if not history.empty:
+        frame = frame[frame["date"] > history["date"].max()]
+
+    if frame.empty:
+        return history
+
+    start = time.perf_counter()
+    shap_df = explain_batch(
+        model,
+        frame[feat_cols].values,
+        feat_cols,
+        chunk_size=chunk_size,
+        n_jobs=n_jobs,
+        version=version,
+    )
+    elapsed = time.perf_counter() - start
+
+    shap_df.insert(0, "model_version", version)
+    shap_df.insert(0, "date", pd.to_datetime(frame["date"]).values)
+
+    history = pd.concat([history, shap_df], ignore_index=True) if not history.empty else shap_df
+    _write(ticker, history)
+
+    logger.info(
+        f"{ticker}: explained {len(shap_df)} bars in {elapsed:.2f}s "
+        f"({len(shap_df) / max(elapsed, 1e-9):.0f} rows/s)"
+    )
+    return history
+
+
+def load_shap_history(ticker: str) -> pd.DataFrame:
+    """
+    Stored SHAP history for a ticker (empty frame if none).
+    """
+    path = shap_path(ticker)
+    if not path.exists():
+        return pd.DataFrame()
+
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, dtype={"model_version": str}, keep_default_na=False)
+
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def shap_drift(
+    history: pd.DataFrame,
+    window: int = 20,
+    top_n: Optional[int] = 6,
+) -> pd.DataFrame:
+    """
+    Rolling mean |SHAP| per feature — how each driver's weight moves over time.
+
+    Returns a date-indexed frame with the `top_n` features by overall
+    mean |SHAP| (all features if top_n is None).
+    """
+    if history.empty:
+        return pd.DataFrame()
+
+    feat_cols = [c for c in history.columns if c not in ("date", "model_version")]
+    abs_vals = history.set_index("date")[feat_cols].abs()
+
+    if top_n is not None:
+        keep = abs_vals.mean().sort_values(ascending=False).index[:top_n]
+        abs_vals = abs_vals[keep]
+
+    return abs_vals.rolling(window, min_periods=1).mean()
+
+
+def shap_path(ticker: str) -> Path:
+    """
+    Resolve the store file for a ticker.
+    """
+    return SHAP_DIR / f"{ticker.replace('/', '_')}{_STORE_SUFFIX}"
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _model_columns(model, feature_df: pd.DataFrame) -> List[str]:
+    cols = list(getattr(model, "feature_names_in_", FEATURE_COLUMNS))
+    return [c for c in cols if c in feature_df.columns]
+
+
+def _write(ticker: str, history: pd.DataFrame) -> None:
+    SHAP_DIR.mkdir(parents=True, exist_ok=True)
+    path = shap_path(ticker)
+    tmp = path.with_suffix(".tmp")
+
+    if path.suffix == ".parquet":
+        history.to_parquet(tmp, index=False)
+    else:
+        history.to_csv(tmp, index=False)
+    tmp.replace(path)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    from src.data.prices import load_prices
+    from src.domain.indicators import add_indicators
+    from src.ml.features import build_features
+    from src.ml.model import load_model, model_version
+
+    parser = argparse.ArgumentParser(description="Build per-bar SHAP history")
+    parser.add_argument("tickers", nargs="+", help="Yahoo tickers, e.g. HDFCBANK.NS")
+    parser.add_argument("--timeframe", default="5y", choices=["1y", "2y", "5y"])
+    parser.add_argument("--model", default="ml_return_model")
+    parser.add_argument("--chunk-size", type=int, default=512)
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes across chunks")
+    args = parser.parse_args()
+
+    model = load_model(args.model)
+    version = model_version(args.model)
+
+    for ticker in args.tickers:
+        price_df = load_prices(ticker, args.timeframe)
+        feature_df = build_features(add_indicators(price_df))
+        update_shap_history(
+            ticker,
+            feature_df,
+            model,
+            version=version,
+            chunk_size=args.chunk_size,
+            n_jobs=args.jobs,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,358 @@
-import os
-import joblib
+# src/ml/train.py
+"""
+ML Training — FEATURE_COLUMNS → TARGET_RETURN with purged walk-forward CV.
+
+    prices → indicators → features (per ticker, pooled)
+        → walk-forward folds by date: train on everything before a test
+          block, minus the bars whose 5-day labels reach into it (purge)
+          and a further `embargo` bars
+        → every fold fitted and scored in parallel (joblib)
+        → final model fitted on all rows, saved with its feature schema
+
+Models come from build_model() (src/ml/model.py). The schema written next
+to the model (models/<name>.schema.json) is what predict_next_week uses to
+pick and order its input columns. Rows with feature gaps (indicator
+warm-up) are kept for models that handle NaN natively
+(hist_gradient_boosting) and dropped for the rest.
+
+compare_models() times and scores several model types on the same folds.
+
+Run:
+    python -m src.ml.train HDFCBANK.NS --timeframe 5y
+    python -m src.ml.train --nifty50 --model-type hist_gradient_boosting --jobs 4
+    python -m src.ml.train --nifty50 --compare      # RF vs GBM vs HistGBM
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.base import clone
 
 from src.data.prices import load_prices
+from src.domain.indicators import add_indicators
+from src.ml.evaluation import evaluate_directional, evaluate_regression
 from src.ml.features import build_features
-from src.ml.model import train_model
+from src.ml.model import NAN_NATIVE_MODELS, build_model, save_model
+from src.utils.config import (
+    FEATURE_COLUMNS,
+    ML_MODEL_NAME,
+    TARGET_DIRECTION,
+    TARGET_RETURN,
+)
+from src.utils.logger import get_logger
+
+logger = get_logger("ml_train")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────────────────────────────────────
+
+HORIZON = 5                       # bars spanned by TARGET_RETURN
+EMBARGO = 5                       # extra bars dropped before each test block
+N_FOLDS = 5
+MIN_TRAIN_FRAC = 0.4              # share of dates before the first test block
+
+MODEL_TYPES = [
+    "linear_regression",
+    "logistic_regression",
+    "random_forest",
+    "gradient_boosting",
+    "hist_gradient_boosting",
+]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Data
+# ─────────────────────────────────────────────────────────────────────────────
+
+def load_training_frame(tickers: Sequence[str], timeframe: str = "5y") -> pd.DataFrame:
+    """
+    Features and targets of every ticker, pooled and sorted by date.
+
+    Rows without a target are dropped; feature gaps stay NaN (see
+    train_ml_model). Failed downloads are skipped. Columns: date, ticker,
+    FEATURE_COLUMNS, targets.
+    """
+    frames = []
+    for ticker in tickers:
+        try:
+            df = build_features(add_indicators(load_prices(ticker, timeframe)))
+        except Exception as exc:
+            logger.warning(f"{ticker}: skipped ({exc})")
+            continue
+        df = df.dropna(subset=[TARGET_RETURN])
+        frames.append(df.assign(ticker=ticker))
+
+    if not frames:
+        raise ValueError("No training data for any ticker")
+
+    data = pd.concat(frames, ignore_index=True)
+    cols = ["date", "ticker"] + FEATURE_COLUMNS + [TARGET_RETURN, TARGET_DIRECTION]
+    return data[cols].sort_values(["date", "ticker"], kind="stable").reset_index(drop=True)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Folds
+# ─────────────────────────────────────────────────────────────────────────────
+
+def walk_forward_folds(
+    dates: pd.Series,
+    n_folds: int = N_FOLDS,
+    horizon: int = HORIZON,
+    embargo: int = EMBARGO,
+    min_train_frac: float = MIN_TRAIN_FRAC,
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Expanding-window (train, test) row indices over a pooled frame.
+
+    The unique dates after the first `min_train_frac` are cut into
+    `n_folds` consecutive test blocks. Each fold trains on rows dated
+    before its block, except the last horizon + embargo trading dates: a
+    label there spans bars inside the test block (purge) or sits right
+    next to it (embargo). Rows of all tickers on one date share a fold.
+    """
+    codes, uniques = pd.factorize(pd.Series(dates), sort=True)
+    n_dates = len(uniques)
+    first_test = int(n_dates * min_train_frac)
+    bounds = np.linspace(first_test, n_dates, n_folds + 1).astype(int)
+
+    folds = []
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        train = np.flatnonzero(codes < start - horizon - embargo)
+        test = np.flatnonzero((codes >= start) & (codes < end))
+        if len(train) and len(test):
+            folds.append((train, test))
+    return folds
 
 
+def _run_fold(
+    fold: int,
+    model,
+    X: np.ndarray,
+    y: np.ndarray,
+    train_idx: np.ndarray,
+    test_idx: np.ndarray,
+    task: str,
+) -> Dict:
+    # Runs in a joblib worker: fit one fold, score it on its test block
+    start = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pred = model.predict(X[test_idx])
+    predict_seconds = time.perf_counter() - start
+
+    y_test = y[test_idx]
+    if task == "classification":
+        # evaluate_directional thresholds at 0 → map labels {0, 1} to ±1
+        metrics = evaluate_directional(2 * y_test - 1, 2 * pred - 1)
+    else:
+        metrics = {**evaluate_regression(y_test, pred), **evaluate_directional(y_test, pred)}
+
+    return {
+        "fold":            fold,
+        "train_rows":      len(train_idx),
+        "test_rows":       len(test_idx),
+        "fit_seconds":     round(fit_seconds, 3),
+        "predict_seconds": round(predict_seconds, 4),
+        **metrics,
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Training
+# ─────────────────────────────────────────────────────────────────────────────
+
 def train_ml_model(
-    ticker="HDFCBANK.NS",
-    timeframe="1y",
-    model_name="ml_return_model",
-):
-    print("Loading price data...")
-    df = load_prices(ticker, timeframe)
+    tickers: str | Sequence[str] = "HDFCBANK.NS",
+    timeframe: str = "5y",
+    model_type: str = "random_forest",
+    task: str = "regression",
+    model_name: str = ML_MODEL_NAME,
+    n_folds: int = N_FOLDS,
+    embargo: int = EMBARGO,
+    n_jobs: int = -1,
+    data: Optional[pd.DataFrame] = None,
+) -> Dict:
+    """
+    Cross-validate `model_type` with purged walk-forward folds, then fit
+    it on all rows and save it with its schema.
+
+    Args:
+        task   : "regression" (TARGET_RETURN) or "classification"
+                 (TARGET_DIRECTION)
+        n_jobs : joblib workers for the folds (-1 = all cores)
+        data   : pre-built load_training_frame() output (skips downloading)
+
+    Returns dict:
+        model_path, folds (per fold: rows, fit / predict seconds, metrics),
+        cv (mean metrics), cv_seconds, fit_seconds
+    """
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    data = data if data is not None else load_training_frame(tickers, timeframe)
+    if model_type not in NAN_NATIVE_MODELS:
+        data = data.dropna(subset=FEATURE_COLUMNS).reset_index(drop=True)
+    target = TARGET_DIRECTION if task == "classification" else TARGET_RETURN
+
+    X = data[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    y = data[target].to_numpy()
+    model = build_model(model_type, task)
+
+    # ── Purged walk-forward CV, folds in parallel ───────────────────────────
+    folds = walk_forward_folds(data["date"], n_folds=n_folds, embargo=embargo)
+    if not folds:
+        raise ValueError("Not enough history for walk-forward folds")
+
+    logger.info(
+        f"{model_type} ({task}): {len(data):,} rows, {data['ticker'].nunique()} tickers, "
+        f"{len(folds)} folds, horizon {HORIZON} + embargo {embargo} bars"
+    )
+    start = time.perf_counter()
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_run_fold)(i, clone(model), X, y, train_idx, test_idx, task)
+        for i, (train_idx, test_idx) in enumerate(folds)
+    )
+    cv_seconds = time.perf_counter() - start
+
+    dates = data["date"].to_numpy()
+    for result, (_, test_idx) in zip(results, folds):
+        result["test_start"] = str(pd.Timestamp(dates[test_idx[0]]).date())
+        result["test_end"] = str(pd.Timestamp(dates[test_idx[-1]]).date())
+        logger.info(
+            f"fold {result['fold']} {result['test_start']} → {result['test_end']} | "
+            f"train {result['train_rows']:,} / test {result['test_rows']:,} | "
+            f"fit {result['fit_seconds']:.2f}s | accuracy {result['accuracy']:.3f}"
+        )
+
+    folds_df = pd.DataFrame(results)
+    metric_cols = [c for c in folds_df.columns if c not in (
+        "fold", "train_rows", "test_rows", "fit_seconds", "predict_seconds", "test_start", "test_end",
+    )]
+    cv = {c: float(folds_df[c].mean()) for c in metric_cols}
+
+    # ── Final model on every row ────────────────────────────────────────────
+    start = time.perf_counter()
+    model.fit(data[FEATURE_COLUMNS], y)
+    fit_seconds = time.perf_counter() - start
+
+    schema = {
+        "feature_columns": FEATURE_COLUMNS,
+        "target":          target,
+        "task":            task,
+        "model_type":      model_type,
+        "tickers":         sorted(data["ticker"].unique()),
+        "rows":            len(data),
+        "date_range":      [str(pd.Timestamp(dates[0]).date()), str(pd.Timestamp(dates[-1]).date())],
+        "cv":              {"folds": len(folds), "horizon": HORIZON, "embargo": embargo, **cv},
+        "trained_at":      datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "sklearn_version": sklearn.__version__,
+    }
+    path = save_model(model, model_name, schema=schema)
+    logger.info(f"Model saved to {path} (CV in {cv_seconds:.1f}s, final fit {fit_seconds:.1f}s)")
+
+    return {
+        "model_path":  str(path),
+        "folds":       results,
+        "cv":          cv,
+        "cv_seconds":  round(cv_seconds, 2),
+        "fit_seconds": round(fit_seconds, 2),
+    }
+
+
+def compare_models(
+    data: pd.DataFrame,
+    model_types: Sequence[str] = ("random_forest", "gradient_boosting", "hist_gradient_boosting"),
+    task: str = "regression",
+    n_folds: int = N_FOLDS,
+    embargo: int = EMBARGO,
+) -> pd.DataFrame:
+    """
+    Fit / predict time and walk-forward accuracy of several model types.
+
+    Every model sees the same rows (complete features) and the same folds,
+    fitted one fold at a time so timings are not skewed by sharing cores.
+
+    Returns one row per model type: rows, fit_seconds (all folds),
+    predict_us_per_row, and the mean fold metrics.
+    """
+    data = data.dropna(subset=FEATURE_COLUMNS).reset_index(drop=True)
+    target = TARGET_DIRECTION if task == "classification" else TARGET_RETURN
+    X = data[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    y = data[target].to_numpy()
+    folds = walk_forward_folds(data["date"], n_folds=n_folds, embargo=embargo)
+
+    rows = []
+    for model_type in model_types:
+        model = build_model(model_type, task)
+        results = pd.DataFrame([
+            _run_fold(i, clone(model), X, y, train_idx, test_idx, task)
+            for i, (train_idx, test_idx) in enumerate(folds)
+        ])
+        metrics = results.drop(columns=["fold", "train_rows", "test_rows", "fit_seconds", "predict_seconds"])
+        rows.append({
+            "model_type":         model_type,
+            "rows":               len(data),
+            "fit_seconds":        round(results["fit_seconds"].sum(), 2),
+            "predict_us_per_row": round(1e6 * results["predict_seconds"].sum() / results["test_rows"].sum(), 2),
+            **metrics.mean().round(4).to_dict(),
+        })
+        logger.info(f"{model_type}: fit {rows[-1]['fit_seconds']}s over {len(folds)} folds")
+
+    return pd.DataFrame(rows)
+
 
-    print("Building features...")
-    df = build_features(df)
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
 
-    print("Training ML model...")
-    model = train_model(df)
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the ML return model with purged walk-forward CV")
+    parser.add_argument("tickers", nargs="*", default=["HDFCBANK.NS"], help="Yahoo tickers")
+    parser.add_argument("--nifty50", action="store_true", help="Train on all NIFTY 50 tickers")
+    parser.add_argument("--timeframe", default="5y", choices=["1y", "2y", "5y"])
+    parser.add_argument("--model-type", default="random_forest", choices=MODEL_TYPES)
+    parser.add_argument("--task", default="regression", choices=["regression", "classification"])
+    parser.add_argument("--model-name", default=ML_MODEL_NAME)
+    parser.add_argument("--folds", type=int, default=N_FOLDS)
+    parser.add_argument("--embargo", type=int, default=EMBARGO)
+    parser.add_argument("--jobs", type=int, default=-1, help="Parallel folds (-1 = all cores)")
+    parser.add_argument("--compare", action="store_true", help="Benchmark RF / GBM / HistGBM instead of training")
+    args = parser.parse_args()
 
-    os.makedirs("models", exist_ok=True)
+    tickers = args.tickers
+    if args.nifty50:
+        from src.data.nifty50 import NIFTY_50
+        tickers = list(NIFTY_50.values())
 
-    model_path = f"models/{model_name}.joblib"
-    joblib.dump(model, model_path)
+    if args.compare:
+        data = load_training_frame(tickers, args.timeframe)
+        table = compare_models(data, task=args.task, n_folds=args.folds, embargo=args.embargo)
+        print(table.to_string(index=False))
+        return
 
-    print(f"Model saved to {model_path}")
+    summary = train_ml_model(
+        tickers,
+        timeframe=args.timeframe,
+        model_type=args.model_type,
+        task=args.task,
+        model_name=args.model_name,
+        n_folds=args.folds,
+        embargo=args.embargo,
+        n_jobs=args.jobs,
+    )
+    print(pd.DataFrame(summary["folds"]).to_string(index=False))
+    print("CV mean:", {k: round(v, 4) for k, v in summary["cv"].items()})
 
 
 if __name__ == "__main__":
-    train_ml_model()
\ No newline at end of file
+    main()
@@ -0,0 +1,359 @@
+# src/pipeline/analysis_service.py
+"""
+Analysis Service — the full per-ticker pipeline without any UI.
+
+    fetch → indicators → signals → decision → news forecast → S/R → setups
+
+run_analysis() is shared by the Streamlit dashboard (app.py) and the
+headless batch CLI (src/pipeline/cli.py), so both produce identical results.
+Every stage is timed so the pipeline can be benchmarked without a browser.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import pandas as pd
+
+from src.data.nifty50 import NIFTY_50
+from src.data.prices import load_prices
+from src.data.news import get_news_signal
+from src.data.resample import normalize_bars, resample_ohlcv, update_pyramid
+from src.domain.fundamentals import load_fundamentals
+from src.domain.news_price_model import predict_news_price_impact
+from src.domain.setup_engine import build_intraday_setup, build_swing_setup, _daily_atr
+from src.domain.support_resistance import get_support_resistance
+from src.pipeline.decision_engine import make_final_decision
+from src.pipeline.signal_pipeline import run_signal_pipeline
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────────────────────────────────────
+
+DEFAULT_MODEL_PATHS = {
+    "lstm": "models/lstm_HDFCBANK_NS.pt",
+    "tcn":  "models/tcn_HDFCBANK_NS.pt",
+    "ppo":  "models/ppo_hdfc.zip",
+}
+
+_TICKER_TO_COMPANY = {v: k for k, v in NIFTY_50.items()}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Public API
+# ─────────────────────────────────────────────────────────────────────────────
+
+def run_analysis(
+    ticker: str,
+    company: Optional[str] = None,
+    timeframe: str = "1y",
+    model_paths: Optional[Dict[str, str]] = None,
+    include_intraday: bool = True,
+    archive_news: bool = True,
+    news_horizon: str = "3d",
+    models: Optional[Dict] = None,
+) -> Dict:
+    """
+    Run the end-to-end analysis for one ticker.
+
+    Args:
+        ticker           : Yahoo ticker, e.g. "HDFCBANK.NS"
+        company          : display name (looked up in NIFTY_50 if omitted)
+        timeframe        : "1y" | "2y" | "5y"
+        model_paths      : overrides for DEFAULT_MODEL_PATHS
+        include_intraday : fetch 15-min bars and build the intraday setup
+        archive_news     : append scored headlines to the news archive
+        news_horizon     : horizon for the news-driven price forecast
+        models           : preloaded handles from load_pipeline_models()
+
+    Returns dict with keys:
+        ticker, company, timeframe,
+        price_df, intraday_df, indicator_df, fundamentals, news, signals, decision,
+        news_price_pred, sr, intraday_setup, swing_setup,
+        timings  ({stage: seconds})
+    """
+    company = company or _TICKER_TO_COMPANY.get(ticker, ticker)
+
+    data = fetch_market_data(
+        ticker,
+        company=company,
+        timeframe=timeframe,
+        include_intraday=include_intraday,
+        archive_news=archive_news,
+    )
+
+    return analyze_market_data(
+        data,
+        ticker,
+        company=company,
+        timeframe=timeframe,
+        model_paths=model_paths,
+        news_horizon=news_horizon,
+        models=models,
+    )
+
+
+def fetch_market_data(
+    ticker: str,
+    company: Optional[str] = None,
+    timeframe: str = "1y",
+    include_intraday: bool = True,
+    archive_news: bool = True,
+) -> Dict:
+    """
+    Fetch every network input of the pipeline.
+
+    Returns dict with keys:
+        price_df, fundamentals, news, intraday_df, weekly_df, timings
+    """
+    company = company or _TICKER_TO_COMPANY.get(ticker, ticker)
+    timings: Dict[str, float] = {}
+
+    with _timed(timings, "prices"):
+        price_df = load_prices(ticker, timeframe)
+
+    with _timed(timings, "fundamentals"):
+        fundamentals = load_fundamentals(ticker)
+
+    with _timed(timings, "news"):
+        news = get_news_signal(company, ticker=ticker, max_items=10, archive=archive_news)
+
+    intraday_df = pd.DataFrame()
+    if include_intraday:
+        with _timed(timings, "intraday"):
+            intraday_df = load_intraday(ticker)
+
+    with _timed(timings, "resample"):
+        weekly_df = load_weekly(ticker, price_df)
+
+    return {
+        "price_df":     price_df,
+        "fundamentals": fundamentals,
+        "news":         news,
+        "intraday_df":  intraday_df,
+        "weekly_df":    weekly_df,
+        "timings":      timings,
+    }
+
+
+def analyze_market_data(
+    data: Dict,
+    ticker: str,
+    company: Optional[str] = None,
+    timeframe: str = "1y",
+    model_paths: Optional[Dict[str, str]] = None,
+    news_horizon: str = "3d",
+    models: Optional[Dict] = None,
+) -> Dict:
+    """
+    Run every compute stage on already-fetched inputs.
+
+    Args:
+        data        : fetch_market_data()-shaped dict
+                      (price_df, fundamentals, news, intraday_df)
+        models      : preloaded handles from load_pipeline_models();
+                      loaded from model_paths when omitted
+
+    Returns the same dict as run_analysis().
+    """
+    company = company or _TICKER_TO_COMPANY.get(ticker, ticker)
+    paths = {**DEFAULT_MODEL_PATHS, **(model_paths or {})}
+    timings: Dict[str, float] = dict(data.get("timings", {}))
+
+    price_df     = data["price_df"]
+    fundamentals = data["fundamentals"]
+    news         = data["news"]
+    intraday_df  = data.get("intraday_df", pd.DataFrame())
+    weekly_df    = data.get("weekly_df")
+    if weekly_df is None or weekly_df.empty:
+        weekly_df = resample_ohlcv(price_df, "1w")
+
+    with _timed(timings, "signals"):
+        signals = run_signal_pipeline(
+            price_df=price_df,
+            fundamentals=fundamentals,
+            company=company,
+            lstm_model_path=paths["lstm"],
+            tcn_model_path=paths["tcn"],
+            ppo_model_path=paths["ppo"],
+            models=models,
+        )
+
+    # Keep the DataFrame out of the (JSON-friendly) signals dict
+    indicator_df = signals.pop("indicator_df", price_df)
+
+    # SHAP is timed inside the signal stage; report it on its own line
+    timings["shap"] = signals.get("shap_seconds", 0.0)
+    timings["signals"] = round(timings["signals"] - timings["shap"], 4)
+
+    with _timed(timings, "support_resistance"):
+        sr = get_support_resistance(price_df)
+
+    with _timed(timings, "news_forecast"):
+        try:
+            atr_val = _daily_atr(price_df)
+        except Exception:
+            atr_val = float(price_df["close"].std()) * 0.1
+        news_price_pred = predict_news_price_impact(
+            current_price=fundamentals.get("current_price", float(price_df["close"].iloc[-1])),
+            news_result=news,
+            atr=atr_val,
+            horizon=news_horizon,
+        )
+
+    with _timed(timings, "decision"):
+        decision = make_final_decision(
+            signals=signals,
+            news_sentiment=news["sentiment_score"],
+            shap_values=signals.get("shap_values"),
+            feature_values=signals.get("feature_values"),
+            company=company,
+        )
+
+    with _timed(timings, "setups"):
+        if not intraday_df.empty:
+            intraday_setup = build_intraday_setup(intraday_df, price_df, ticker)
+        else:
+            intraday_setup = unavailable_intraday_setup()
+        swing_setup = build_swing_setup(price_df, ticker, weekly_df=weekly_df)
+
+    timings["total"] = round(sum(timings.values()), 4)
+
+    return {
+        "ticker":          ticker,
+        "company":         company,
+        "timeframe":       timeframe,
+        "price_df":        price_df,
+        "intraday_df":     intraday_df,
+        "indicator_df":    indicator_df,
+        "fundamentals":    fundamentals,
+        "news":            news,
+        "signals":         signals,
+        "decision":        decision,
+        "news_price_pred": news_price_pred,
+        "sr":              sr,
+        "intraday_setup":  intraday_setup,
+        "swing_setup":     swing_setup,
+        "timings":         timings,
+    }
+
+
+def summarize_analysis(result: Dict) -> Dict:
+    """
+    Flatten a run_analysis() result into one JSON-safe row.
+
+    Drops the DataFrames and long text, keeping the numbers a batch job or a
+    columnar export needs (one row per ticker).
+    """
+    signals  = result["signals"]
+    decision = result["decision"]
+    news     = result["news"]
+    pred     = result["news_price_pred"]
+    swing    = result["swing_setup"]
+    intra    = result["intraday_setup"]
+    sr       = result["sr"]
+    price_df = result["price_df"]
+
+    row = {
+        "ticker":              result["ticker"],
+        "company":             result["company"],
+        "timeframe":           result["timeframe"],
+        "as_of":               str(price_df["date"].iloc[-1]) if "date" in price_df.columns else "",
+        "close":               float(price_df["close"].iloc[-1]),
+        "action":              decision["action"],
+        "confidence":          float(decision["confidence"]),
+        "score":               float(decision["score"]),
+        "ml_prob_up":          float(signals["ml_prob_up"]),
+        "lstm_return":         float(signals["lstm_return"]),
+        "tcn_return":          float(signals["tcn_return"]),
+        "regime":              signals["regime"],
+        "ppo_action":          signals["ppo_action"],
+        "shap_method":         signals.get("shap_meta", {}).get("method", ""),
+        "news_sentiment":      float(news["sentiment_score"]),
+        "news_weighted_score": float(news["weighted_score"]),
+        "news_direction":      pred["direction"],
+        "news_move_pct":       float(pred["expected_move_pct"]),
+        "swing_bias":          swing["bias"],
+        "swing_entry_low":     swing["entry_zone"][0],
+        "swing_entry_high":    swing["entry_zone"][1],
+        "swing_stop_loss":     swing["stop_loss"],
+        "swing_target_1":      swing["target_1"],
+        "swing_target_2":      swing["target_2"],
+        "intraday_bias":       intra["bias"],
+        "intraday_stop_loss":  intra["stop_loss"],
+        "intraday_target_1":   intra["target_1"],
+    }
+
+    for i, lv in enumerate(sr.get("supports", []), 1):
+        row[f"support_{i}"] = lv["price"]
+    for i, lv in enumerate(sr.get("resistances", []), 1):
+        row[f"resistance_{i}"] = lv["price"]
+
+    for stage, secs in result["timings"].items():
+        row[f"time_{stage}"] = secs
+
+    return row
+
+
+def unavailable_intraday_setup() -> Dict:
+    """
+    Placeholder intraday setup when 15-min data could not be loaded.
+    """
+    return {
+        "error": "Intraday data unavailable", "mode": "Intraday",
+        "bias": "NEUTRAL", "entry_zone": (0, 0), "stop_loss": 0,
+        "target_1": 0, "target_2": 0, "risk_reward": 0,
+        "pattern": "—", "key_levels": {}, "validity": "—",
+        "plan": "Intraday data could not be loaded.",
+    }
+
+
+def load_intraday(ticker: str, sessions: int = 5) -> pd.DataFrame:
+    """
+    Best-effort 15-min bars for the intraday setup.
+
+    5-min bars are merged into the ticker's local bar pyramid
+    (src/data/resample.py) and the 15-min level is read back from it;
+    a direct 15-min download is the fallback.
+    """
+    try:
+        from src.data.providers.yahoo import YahooProvider
+
+        provider = YahooProvider()
+        fine = provider.fetch_intraday_ohlcv(ticker, interval="5m", lookback_days=5)
+        if fine.empty:
+            return normalize_bars(
+                provider.fetch_intraday_ohlcv(ticker, interval="15m", lookback_days=5)
+            )
+
+        bars = update_pyramid(ticker, fine_df=fine)["15m"]
+        days = bars["date"].dt.normalize()
+        return bars[days >= days.drop_duplicates().iloc[-sessions:].min()].reset_index(drop=True)
+    except Exception:
+        return pd.DataFrame()
+
+
+def load_weekly(ticker: str, daily_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Weekly bars from the local pyramid, seeded with the daily history.
+    """
+    try:
+        return update_pyramid(ticker, daily_df=daily_df)["1w"]
+    except Exception:
+        return resample_ohlcv(daily_df, "1w")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+@contextmanager
+def _timed(timings: Dict[str, float], stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = round(time.perf_counter() - start, 4)
@@ -0,0 +1,164 @@
+# src/pipeline/cli.py
+"""
+Headless batch entry point for the full analysis pipeline.
+
+Examples:
+    python -m src.pipeline.cli HDFCBANK.NS INFY.NS --format json --output out.json
+    python -m src.pipeline.cli --all --format csv --output nifty50.csv
+    python -m src.pipeline.cli "HDFC Bank" --no-intraday
+
+JSON output keeps the full per-ticker result (minus raw price frames);
+csv / parquet output writes one summarize_analysis() row per ticker.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from src.data.nifty50 import NIFTY_50
+from src.pipeline.analysis_service import DEFAULT_MODEL_PATHS, run_analysis, summarize_analysis
+from src.pipeline.signal_pipeline import load_pipeline_models
+from src.utils.logger import get_logger
+
+logger = get_logger("cli")
+
+
+def resolve_tickers(names: List[str], use_all: bool = False) -> List[str]:
+    """
+    Accept Yahoo tickers or NIFTY_50 company names; --all expands the index.
+    """
+    if use_all:
+        return list(NIFTY_50.values())
+
+    tickers = []
+    for name in names:
+        if name in NIFTY_50:
+            tickers.append(NIFTY_50[name])
+        else:
+            tickers.append(name if name.endswith((".NS", ".BO")) else f"{name}.NS")
+    return tickers
+
+
+def analyze_many(
+    tickers: List[str],
+    timeframe: str = "1y",
+    workers: int = 1,
+    include_intraday: bool = True,
+) -> List[Dict]:
+    """
+    Run run_analysis() for each ticker; failures are reported, not raised.
+
+    Models are loaded once and shared by every ticker, so the cached SHAP
+    explainer (keyed on the model object) is built only once.
+    """
+    models = load_pipeline_models(
+        DEFAULT_MODEL_PATHS["lstm"],
+        DEFAULT_MODEL_PATHS["tcn"],
+        DEFAULT_MODEL_PATHS["ppo"],
+    )
+
+    def _one(ticker: str) -> Dict:
+        try:
+            return run_analysis(
+                ticker,
+                timeframe=timeframe,
+                include_intraday=include_intraday,
+                models=models,
+            )
+        except Exception as exc:
+            logger.error(f"{ticker}: {exc}")
+            return {"ticker": ticker, "error": str(exc)}
+
+    if workers <= 1:
+        return [_one(t) for t in tickers]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_one, tickers))
+
+
+def write_results(
+    results: List[Dict],
+    fmt: str = "json",
+    output: Optional[str] = None,
+) -> None:
+    """
+    Write results as JSON (full) or csv / parquet (one row per ticker).
+    """
+    ok = [r for r in results if "signals" in r]
+
+    if fmt == "json":
+        payload = [_json_record(r) for r in results]
+        text = json.dumps(payload, indent=2, default=str)
+        if output:
+            with open(output, "w") as f:
+                f.write(text)
+        else:
+            sys.stdout.write(text + "\n")
+        return
+
+    frame = pd.DataFrame([summarize_analysis(r) for r in ok])
+    if fmt == "csv":
+        frame.to_csv(output or sys.stdout, index=False)
+    elif fmt == "parquet":
+        if not output:
+            raise ValueError("--output is required for parquet")
+        frame.to_parquet(output, index=False)
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def _json_record(result: Dict) -> Dict:
+    if "signals" not in result:
+        return result
+
+    record = {
+        k: v for k, v in result.items()
+        if k not in ("price_df", "intraday_df", "indicator_df")
+    }
+    record["summary"] = summarize_analysis(result)
+    return record
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Sensei AI headless analysis")
+    parser.add_argument("tickers", nargs="*", help="Yahoo tickers or NIFTY 50 company names")
+    parser.add_argument("--all", action="store_true", help="Analyse all NIFTY 50 stocks")
+    parser.add_argument("--timeframe", default="1y", choices=["1y", "2y", "5y"])
+    parser.add_argument("--format", default="json", choices=["json", "csv", "parquet"])
+    parser.add_argument("--output", default=None, help="Output file (stdout if omitted)")
+    parser.add_argument("--workers", type=int, default=1, help="Tickers analysed concurrently")
+    parser.add_argument("--no-intraday", action="store_true", help="Skip 15-min data and intraday setup")
+    args = parser.parse_args(argv)
+
+    tickers = resolve_tickers(args.tickers, use_all=args.all)
+    if not tickers:
+        parser.error("give at least one ticker or --all")
+
+    start = time.perf_counter()
+    results = analyze_many(
+        tickers,
+        timeframe=args.timeframe,
+        workers=args.workers,
+        include_intraday=not args.no_intraday,
+    )
+    elapsed = time.perf_counter() - start
+
+    write_results(results, fmt=args.format, output=args.output)
+
+    failed = sum(1 for r in results if "signals" not in r)
+    logger.info(
+        f"Analysed {len(results) - failed}/{len(results)} tickers "
+        f"in {elapsed:.1f}s ({elapsed / max(len(results), 1):.2f}s per ticker)"
+    )
+    return 1 if failed == len(results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+# src/pipeline/precompute.py
+"""
+Precomputation Worker — refreshes every NIFTY 50 analysis on a schedule.
+
+Each cycle (during NSE market hours by default):
+    1. fetch prices / fundamentals / news / intraday for every ticker
+    2. skip tickers whose input fingerprint matches the stored result
+    3. recompute the rest with shared, preloaded models
+    4. write results to the local results store read by app.py
+    5. extend the per-bar SHAP history with the new bars
+
+Concurrency is bounded by a thread pool (network-bound fetches dominate).
+
+Run:
+    python -m src.pipeline.precompute                 # loop forever
+    python -m src.pipeline.precompute --once --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from src.data.nifty50 import NIFTY_50
+from src.pipeline.analysis_service import (
+    DEFAULT_MODEL_PATHS,
+    analyze_market_data,
+    fetch_market_data,
+)
+from src.pipeline.results_store import input_fingerprint, load_entry, save_result, touch_result
+from src.pipeline.signal_pipeline import load_pipeline_models
+from src.utils.config import (
+    MARKET_CLOSE,
+    MARKET_OPEN,
+    MARKET_TIMEZONE,
+    PRECOMPUTE_INTERVAL_MIN,
+    PRECOMPUTE_WORKERS,
+)
+from src.utils.logger import get_logger
+
+logger = get_logger("precompute", log_file="precompute.log")
+
+
+def is_market_open(now: Optional[datetime] = None) -> bool:
+    """
+    True on weekdays between MARKET_OPEN and MARKET_CLOSE (IST).
+    Exchange holidays are not modelled.
+    """
+    now = (now or datetime.now(ZoneInfo(MARKET_TIMEZONE))).astimezone(ZoneInfo(MARKET_TIMEZONE))
+    if now.weekday() >= 5:
+        return False
+    hhmm = now.strftime("%H:%M")
+    return MARKET_OPEN <= hhmm <= MARKET_CLOSE
+
+
+def refresh_ticker(
+    ticker: str,
+    timeframe: str = "1y",
+    models: Optional[Dict] = None,
+    force: bool = False,
+) -> str:
+    """
+    Refresh one ticker's stored analysis.
+
+    Returns:
+        "updated" | "unchanged" | "failed"
+    """
+    try:
+        data = fetch_market_data(ticker, timeframe=timeframe)
+        fingerprint = input_fingerprint(data)
+
+        entry = load_entry(ticker, timeframe)
+        if not force and entry is not None and entry["fingerprint"] == fingerprint:
+            # Still current: refresh computed_at so readers' age check passes
+            touch_result(ticker, timeframe)
+            return "unchanged"
+
+        result = analyze_market_data(data, ticker, timeframe=timeframe, models=models)
+        save_result(result, fingerprint)
+        _update_shap(ticker, data["price_df"], models)
+        return "updated"
+
+    except Exception as exc:
+        logger.error(f"{ticker}: {exc}")
+        return "failed"
+
+
+def refresh_universe(
+    tickers: Optional[List[str]] = None,
+    timeframe: str = "1y",
+    workers: int = PRECOMPUTE_WORKERS,
+    models: Optional[Dict] = None,
+    force: bool = False,
+) -> Dict[str, str]:
+    """
+    Refresh many tickers with at most `workers` in flight.
+
+    Returns {ticker: status}.
+    """
+    tickers = tickers or list(NIFTY_50.values())
+    if models is None:
+        models = load_pipeline_models(
+            DEFAULT_MODEL_PATHS["lstm"],
+            DEFAULT_MODEL_PATHS["tcn"],
+            DEFAULT_MODEL_PATHS["ppo"],
+        )
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        statuses = list(pool.map(
+            lambda t: refresh_ticker(t, timeframe=timeframe, models=models, force=force),
+            tickers,
+        ))
+
+    summary = dict(zip(tickers, statuses))
+    counts = {s: statuses.count(s) for s in ("updated", "unchanged", "failed")}
+    logger.info(
+        f"Refreshed {len(tickers)} tickers in {time.perf_counter() - start:.1f}s — "
+        f"{counts['updated']} updated, {counts['unchanged']} unchanged, {counts['failed']} failed"
+    )
+    return summary
+
+
+def run_worker(
+    interval_minutes: float = PRECOMPUTE_INTERVAL_MIN,
+    timeframe: str = "1y",
+    workers: int = PRECOMPUTE_WORKERS,
+    market_hours_only: bool = True,
+    once: bool = False,
+) -> None:
+    """
+    Refresh the universe every `interval_minutes` (market hours only by default).
+    """
+    models = load_pipeline_models(
+        DEFAULT_MODEL_PATHS["lstm"],
+        DEFAULT_MODEL_PATHS["tcn"],
+        DEFAULT_MODEL_PATHS["ppo"],
+    )
+
+    while True:
+        cycle_start = time.monotonic()
+
+        if not market_hours_only or is_market_open():
+            refresh_universe(timeframe=timeframe, workers=workers, models=models)
+        else:
+            logger.info("Market closed — skipping refresh")
+
+        if once:
+            return
+
+        elapsed = time.monotonic() - cycle_start
+        time.sleep(max(interval_minutes * 60 - elapsed, 1.0))
+
+
+def _update_shap(ticker: str, price_df, models: Optional[Dict]) -> None:
+    # Best-effort: the SHAP drift view is optional
+    if not models or models.get("ml") is None:
+        return
+    try:
+        from src.domain.indicators import add_indicators
+        from src.ml.features import build_features
+        from src.ml.shap_history import update_shap_history
+
+        feature_df = build_features(add_indicators(price_df))
+        update_shap_history(ticker, feature_df, models["ml"], version=models.get("ml_version", ""))
+    except Exception as exc:
+        logger.warning(f"{ticker}: SHAP history not updated ({exc})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sensei AI precomputation worker")
+    parser.add_argument("--interval", type=float, default=PRECOMPUTE_INTERVAL_MIN, help="Minutes between refreshes")
+    parser.add_argument("--workers", type=int, default=PRECOMPUTE_WORKERS, help="Tickers refreshed concurrently")
+    parser.add_argument("--timeframe", default="1y", choices=["1y", "2y", "5y"])
+    parser.add_argument("--always", action="store_true", help="Refresh outside market hours too")
+    parser.add_argument("--once", action="store_true", help="Run a single cycle and exit")
+    args = parser.parse_args()
+
+    run_worker(
+        interval_minutes=args.interval,
+        timeframe=args.timeframe,
+        workers=args.workers,
+        market_hours_only=not (args.always or args.once),
+        once=args.once,
+    )
+
+
+if __name__ == "__main__":
+    main()
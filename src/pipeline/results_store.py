@@ -0,0 +1,139 @@
+# src/pipeline/results_store.py
+"""
+Results Store — local cache of finished analyses.
+
+The precomputation worker (src/pipeline/precompute.py) writes one entry per
+(ticker, timeframe); app.py reads it so a user request becomes a lookup.
+
+Layout:
+    data/results/<TICKER>_<timeframe>.joblib
+
+Each entry:
+    result       : run_analysis() output
+    fingerprint  : hash of the inputs the result was computed from
+    computed_at  : UTC timestamp of the last computation or unchanged check
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+import joblib
+import pandas as pd
+
+from src.utils.config import DATA_DIR
+
+
+RESULTS_DIR = DATA_DIR / "results"
+
+
+def result_path(ticker: str, timeframe: str) -> Path:
+    """
+    Resolve the store file for a (ticker, timeframe) pair.
+    """
+    return RESULTS_DIR / f"{ticker.replace('/', '_')}_{timeframe}.joblib"
+
+
+def save_result(result: Dict, fingerprint: str) -> Path:
+    """
+    Persist an analysis atomically (readers never see a half-written file).
+    """
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = result_path(result["ticker"], result["timeframe"])
+    tmp = path.with_suffix(".tmp")
+
+    joblib.dump(
+        {
+            "result":      result,
+            "fingerprint": fingerprint,
+            "computed_at": datetime.now(timezone.utc),
+        },
+        tmp,
+    )
+    os.replace(tmp, path)
+    return path
+
+
+def touch_result(ticker: str, timeframe: str) -> bool:
+    """
+    Mark a stored analysis as current (inputs re-checked, unchanged) by
+    resetting its computed_at. Returns False if there is no entry.
+    """
+    entry = load_entry(ticker, timeframe)
+    if entry is None:
+        return False
+
+    path = result_path(ticker, timeframe)
+    tmp = path.with_suffix(".tmp")
+    joblib.dump({**entry, "computed_at": datetime.now(timezone.utc)}, tmp)
+    os.replace(tmp, path)
+    return True
+
+
+def load_entry(ticker: str, timeframe: str) -> Optional[Dict]:
+    """
+    Load the raw store entry (result + fingerprint + computed_at), if any.
+    """
+    path = result_path(ticker, timeframe)
+    if not path.exists():
+        return None
+    try:
+        return joblib.load(path)
+    except Exception:
+        return None
+
+
+def load_result(
+    ticker: str,
+    timeframe: str,
+    max_age_minutes: Optional[float] = None,
+) -> Optional[Dict]:
+    """
+    Return the stored analysis, or None if missing or older than
+    `max_age_minutes`.
+    """
+    entry = load_entry(ticker, timeframe)
+    if entry is None:
+        return None
+
+    if max_age_minutes is not None:
+        age = datetime.now(timezone.utc) - entry["computed_at"]
+        if age.total_seconds() > max_age_minutes * 60:
+            return None
+
+    result = entry["result"]
+    result["computed_at"] = entry["computed_at"]
+    return result
+
+
+def input_fingerprint(data: Dict) -> str:
+    """
+    Hash the inputs of an analysis (fetch_market_data() output).
+
+    Only what can change the outputs is hashed: the last bars of each price
+    frame, the fundamentals and the headline set. Two fetches with the same
+    fingerprint produce the same analysis.
+    """
+    parts = {
+        "daily":        _frame_tail(data.get("price_df")),
+        "intraday":     _frame_tail(data.get("intraday_df")),
+        "fundamentals": data.get("fundamentals", {}),
+        "headlines":    sorted(
+            (d["headline"], d["label"], d["confidence"])
+            for d in data.get("news", {}).get("details", [])
+        ),
+    }
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _frame_tail(df: Optional[pd.DataFrame], n: int = 3) -> list:
+    if df is None or df.empty:
+        return []
+    cols = [c for c in ("date", "open", "high", "low", "close", "volume") if c in df.columns]
+    return [len(df)] + df[cols].tail(n).astype(str).values.tolist()
@@ -1,8 +1,10 @@
 # src/pipeline/signal_pipeline.py
 
+import time
+
 import torch
 import pandas as pd
-from typing import Dict
+from typing import Dict, Optional
 
 from src.domain.indicators import add_indicators
 from src.domain.signals import generate_signal
@@ -10,15 +12,50 @@ from src.domain.signals import generate_signal
 from src.ml.features import build_features
 from src.ml.predict import predict_next_week
 
-from src.dl.lstm import load_model as load_lstm
-from src.dl.temporal_cnn import load_model as load_tcn
+from src.dl.export import load_serving_model, serving_seq_len
 
 from src.regimes.hmm import MarketRegimeHMM
-from src.rl.agent import PPOTradingAgent
-from src.rl.env import TradingEnv
+from src.rl.policy_export import action_series, load_policy
 import numpy as np
 
 
+DL_FEATURE_COLS = [
+    "rsi_norm",
+    "ema_spread",
+    "macd_diff",
+    "atr_pct",
+]
+
+
+def load_pipeline_models(
+    lstm_model_path: str,
+    tcn_model_path: str,
+    ppo_model_path: str,
+    ml_model_name: str = "ml_return_model",
+) -> Dict[str, object]:
+    """
+    Load every model the pipeline needs once.
+
+    The returned handles can be passed to run_signal_pipeline(models=...)
+    and reused across calls (e.g. held in st.cache_resource). LSTM / TCN
+    are the fastest exported variant that passed parity (src/dl/export.py).
+    """
+    from src.ml.model import load_model as load_ml_model, model_version
+
+    try:
+        ml_model = load_ml_model(ml_model_name)
+    except Exception:
+        ml_model = None
+
+    return {
+        "lstm": load_serving_model("lstm", lstm_model_path, num_features=len(DL_FEATURE_COLS)),
+        "tcn":  load_serving_model("tcn", tcn_model_path, num_features=len(DL_FEATURE_COLS)),
+        "ppo":  load_policy(ppo_model_path),
+        "ml":   ml_model,
+        "ml_version": model_version(ml_model_name),
+    }
+
+
 def run_signal_pipeline(
     price_df: pd.DataFrame,
     fundamentals: Dict[str, float],
@@ -26,12 +63,17 @@ def run_signal_pipeline(
     lstm_model_path: str,
     tcn_model_path: str,
     ppo_model_path: str,
+    models: Optional[Dict[str, object]] = None,
 ) -> Dict[str, object]:
     """
     Full inference pipeline.
 
+    Pass `models` from load_pipeline_models() to skip reloading weights
+    on every call.
+
     Returns all intermediate signals required by decision_engine.
     """
+    models = models or {}
 
     # Clean data
     price_df = price_df.replace([np.inf, -np.inf], np.nan)
@@ -62,9 +104,20 @@ def run_signal_pipeline(
     feature_df = build_features(df)
     latest_features = feature_df.iloc[-1:]
 
+    ml_model = models.get("ml")
+    ml_version = models.get("ml_version")
+    if ml_model is None:
+        from src.ml.model import load_model as load_ml_model, model_version
+        try:
+            ml_model = load_ml_model("ml_return_model")
+            ml_version = model_version("ml_return_model")
+        except Exception:
+            ml_model = None
+
     ml_out = predict_next_week(
         df=feature_df,
         company=company,
+        model=ml_model,
     )
 
     ml_prob_up = ml_out["confidence"] / 100
@@ -72,22 +125,23 @@ def run_signal_pipeline(
     # -----------------------------
     # Deep Learning (LSTM + TCN)
     # -----------------------------
-    feature_cols = [
-        "rsi_norm",
-        "ema_spread",
-        "macd_diff",
-        "atr_pct",
-    ]
+    feature_cols = DL_FEATURE_COLS
+
+    # 30 bars unless a tuned model (src/dl/hpo.py) recorded its own window
+    def _window(model_path: str) -> torch.Tensor:
+        seq = feature_df[feature_cols].tail(serving_seq_len(model_path)).values
+        return torch.tensor(seq, dtype=torch.float32).unsqueeze(0)
 
-    seq_len = 30
-    seq = feature_df[feature_cols].tail(seq_len).values
-    seq_tensor = torch.tensor(seq, dtype=torch.float32).unsqueeze(0)
+    lstm = models.get("lstm")
+    if lstm is None:
+        lstm = load_serving_model("lstm", lstm_model_path, num_features=len(feature_cols))
 
-    lstm = load_lstm(lstm_model_path, num_features=len(feature_cols))
-    tcn = load_tcn(tcn_model_path, num_features=len(feature_cols))
+    tcn = models.get("tcn")
+    if tcn is None:
+        tcn = load_serving_model("tcn", tcn_model_path, num_features=len(feature_cols))
 
-    lstm_return = float(lstm(seq_tensor).item())
-    tcn_return = float(tcn(seq_tensor).item())
+    lstm_return = float(lstm(_window(lstm_model_path)).item())
+    tcn_return = float(tcn(_window(tcn_model_path)).item())
 
     # -----------------------------
     # Regime Detection
@@ -99,48 +153,50 @@ def run_signal_pipeline(
     # -----------------------------
     # Reinforcement Learning (PPO)
     # -----------------------------
-    env = TradingEnv(
-        df=feature_df,
-        feature_cols=feature_cols,
-    )
-
-    agent = PPOTradingAgent(env, model_path=ppo_model_path)
-    obs = env.reset()
-   
-    obs = np.array(obs, dtype=np.float32)
-
-    # Replace NaN / inf
-    obs = np.nan_to_num(obs, nan=0.0, posinf=0.0, neginf=0.0)
+    # Exported NumPy actor (src/rl/policy_export.py) — no SB3 / env needed
+    agent = models.get("ppo")
+    if agent is None:
+        agent = load_policy(ppo_model_path)
 
-    ppo_action = agent.act(obs)
+    # Decision for the latest bar, as a HOLD / BUY / SELL label
+    ppo_action = action_series(agent, feature_df.tail(1), feature_cols).iloc[-1]
 
     # ─────────────────────────────────────────────────────────────────────
     # SHAP values for the ML model
     # ─────────────────────────────────────────────────────────────────────
     shap_values = None
     feature_values = {}
+    shap_seconds = 0.0
+    shap_meta = {}
 
     try:
-        from src.ml.model import load_model as load_ml_model
-        from src.ml.shap_explain import compute_shap_values
+        from src.ml.shap_explain import explain_row
         from src.utils.config import FEATURE_COLUMNS
 
-        ml_model = load_ml_model("ml_return_model")
+        if ml_model is None:
+            raise ValueError("ML model unavailable")
 
-        feat_cols = [c for c in FEATURE_COLUMNS if c in feature_df.columns]
+        # Explain the columns the model was fitted on (indicator frame reused)
+        model_cols = list(getattr(ml_model, "feature_names_in_", FEATURE_COLUMNS))
+        feat_cols = [c for c in model_cols if c in feature_df.columns]
 
-        # Background: last 100 rows (representative sample)
-        X_background = feature_df[feat_cols].dropna().tail(100).values
+        # Background: only summarised the first time this model is explained
+        X_background = feature_df[feat_cols].dropna().values
 
         # Row to explain: very latest bar
         X_explain = feature_df[feat_cols].iloc[-1:].fillna(0).values
 
-        shap_values = compute_shap_values(
+        shap_start = time.perf_counter()
+        explained = explain_row(
             model=ml_model,
             X_background=X_background,
             X_explain=X_explain,
             feature_names=feat_cols,
+            version=ml_version,
         )
+        shap_seconds = round(time.perf_counter() - shap_start, 4)
+        shap_values = explained.pop("values")
+        shap_meta = explained          # method, nsamples, budget_seconds, timed_out, seconds
 
         # Raw feature values for the narrator
         feature_values = {
@@ -163,4 +219,8 @@ def run_signal_pipeline(
         # New fields for explainability
         "shap_values":    shap_values,
         "feature_values": feature_values,
+        "shap_seconds":   shap_seconds,
+        "shap_meta":      shap_meta,
+        # Indicator frame (reused by charts; moved out by analysis_service)
+        "indicator_df":   df,
     }
\ No newline at end of file
@@ -1,8 +1,8 @@
 # src/rl/agent.py
 
 from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import DummyVecEnv
-from typing import Optional
+from stable_baselines3.common.vec_env import DummyVecEnv, VecEnv
+from typing import Optional, Union
 import gymnasium as gym
 
 
@@ -18,14 +18,19 @@ class PPOTradingAgent:
 
     def __init__(
         self,
-        env: gym.Env,
+        env: Optional[Union[gym.Env, VecEnv]],
         model_path: Optional[str] = None,
         learning_rate: float = 3e-4,
         gamma: float = 0.99,
         n_steps: int = 2048,
         batch_size: int = 64,
     ) -> None:
-        self.env = DummyVecEnv([lambda: env])
+        # env may be None for inference-only use of a saved model;
+        # batched envs (src/rl/vec_env.py) are used as they are
+        if env is None or isinstance(env, VecEnv):
+            self.env = env
+        else:
+            self.env = DummyVecEnv([lambda: env])
 
         if model_path:
             self.model = PPO.load(model_path, env=self.env)
@@ -40,11 +45,22 @@ class PPOTradingAgent:
                 verbose=1,
             )
 
-    def train(self, timesteps: int = 100_000) -> None:
+    def train(
+        self,
+        timesteps: int = 100_000,
+        callback=None,
+        reset_num_timesteps: bool = True,
+    ) -> None:
         """
         Train PPO agent.
+
+        Pass reset_num_timesteps=False to continue a resumed run's step count.
         """
-        self.model.learn(total_timesteps=timesteps)
+        self.model.learn(
+            total_timesteps=timesteps,
+            callback=callback,
+            reset_num_timesteps=reset_num_timesteps,
+        )
 
     def save(self, path: str) -> None:
         """
@@ -4,7 +4,7 @@ import gymnasium as gym
 import numpy as np
 import pandas as pd
 from gymnasium import spaces
-from typing import List
+from typing import List, Optional
 
 
 class TradingEnv(gym.Env):
@@ -21,9 +21,14 @@ class TradingEnv(gym.Env):
 
     Reward:
         Change in portfolio value
+
+    Features and close prices are copied into NumPy arrays once in
+    __init__; reset / step only index those arrays (no pandas per step).
+    Follows the gymnasium API: reset → (obs, info),
+    step → (obs, reward, terminated, truncated, info).
     """
 
-    metadata = {"render.modes": ["human"]}
+    metadata = {"render_modes": ["human"]}
 
     def __init__(
         self,
@@ -39,6 +44,10 @@ class TradingEnv(gym.Env):
         self.initial_balance = initial_balance
         self.transaction_cost = transaction_cost
 
+        self.features = feature_matrix(self.df, feature_cols)
+        self.prices = self.df["close"].to_numpy(dtype=np.float64)
+        self.n_steps = len(self.prices)
+
         self.action_space = spaces.Discrete(3)
 
         self.observation_space = spaces.Box(
@@ -58,17 +67,17 @@ class TradingEnv(gym.Env):
         self.net_worth = self.initial_balance
         self.max_net_worth = self.initial_balance
 
-    def reset(self):
+    def reset(self, *, seed: Optional[int] = None, options: Optional[dict] = None):
+        super().reset(seed=seed)
         self._reset_state()
-        return self._get_observation()
+        return self._get_observation(), {}
 
     def _get_observation(self) -> np.ndarray:
-        obs = self.df.loc[self.current_step, self.feature_cols].values
-        return obs.astype(np.float32)
+        # Past the last bar (episode over) the final observation is repeated
+        return self.features[min(self.current_step, self.n_steps - 1)].copy()
 
     def step(self, action: int):
-        done = False
-        price = self.df.loc[self.current_step, "close"]
+        price = self.prices[self.current_step]
 
         prev_net_worth = self.net_worth
 
@@ -104,10 +113,7 @@ class TradingEnv(gym.Env):
         # Next step
         # -----------------------
         self.current_step += 1
-        if self.current_step >= len(self.df) - 1:
-            done = True
-
-        obs = self._get_observation() if not done else None
+        terminated = self.current_step >= self.n_steps - 1
 
         info = {
             "net_worth": self.net_worth,
@@ -115,11 +121,19 @@ class TradingEnv(gym.Env):
             "position": self.position,
         }
 
-        return obs, reward, done, info
+        return self._get_observation(), float(reward), terminated, False, info
 
-    def render(self, mode="human") -> None:
+    def render(self) -> None:
         print(
             f"Step: {self.current_step} | "
             f"Net Worth: {self.net_worth:.2f} | "
             f"Position: {self.position:.4f}"
         )
+
+
+def feature_matrix(df: pd.DataFrame, feature_cols: List[str]) -> np.ndarray:
+    """
+    Observation matrix (rows = bars) as contiguous float32, NaN / inf → 0.
+    """
+    values = df[feature_cols].to_numpy(dtype=np.float32)
+    return np.ascontiguousarray(np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0))
@@ -2,15 +2,21 @@
 
 import numpy as np
 import pandas as pd
-from typing import Dict
+from typing import Dict, List, Optional
 
-from src.rl.env import TradingEnv
-from src.rl.agent import PPOTradingAgent
 from src.data.prices import load_prices
 from src.domain.indicators import add_indicators
 from src.ml.features import build_features
 
 
+FEATURE_COLS = [
+    "rsi_norm",
+    "ema_spread",
+    "macd_diff",
+    "atr_pct",
+]
+
+
 def _sharpe_ratio(returns: np.ndarray, risk_free_rate: float = 0.0) -> float:
     if returns.std() == 0:
         return 0.0
@@ -31,7 +37,12 @@ def evaluate_agent(
 ) -> Dict[str, float]:
     """
     Evaluate trained PPO agent on historical data.
+
+    Steps the full TradingEnv (transaction costs, drawdown-penalised
+    rewards); backtest_policy() is the batched alternative.
     """
+    from src.rl.env import TradingEnv
+    from src.rl.agent import PPOTradingAgent
 
     # -----------------------------
     # Load & prepare data
@@ -40,12 +51,7 @@ def evaluate_agent(
     df = add_indicators(df)
     df = build_features(df)
 
-    feature_cols = [
-        "rsi_norm",
-        "ema_spread",
-        "macd_diff",
-        "atr_pct",
-    ]
+    feature_cols = FEATURE_COLS
 
     df = df.dropna().reset_index(drop=True)
 
@@ -58,7 +64,7 @@ def evaluate_agent(
     # -----------------------------
     # Run evaluation
     # -----------------------------
-    obs = env.reset()
+    obs, _ = env.reset()
     done = False
 
     equity_curve = []
@@ -66,7 +72,8 @@ def evaluate_agent(
 
     while not done:
         action = agent.act(obs)
-        obs, reward, done, info = env.step(action)
+        obs, reward, terminated, truncated, info = env.step(action)
+        done = terminated or truncated
 
         equity_curve.append(info["net_worth"])
         rewards.append(reward)
@@ -96,6 +103,39 @@ def evaluate_agent(
     return results
 
 
+def backtest_policy(
+    price_df: pd.DataFrame,
+    policy,
+    feature_cols: Optional[List[str]] = None,
+    initial_capital: float = 100_000.0,
+) -> Dict[str, object]:
+    """
+    Backtest the PPO policy over a price history in one batched pass.
+
+    Args:
+        price_df : daily OHLCV (indicators / features are added here)
+        policy   : NumpyPolicy (src/rl/policy_export.load_policy)
+
+    Returns dict:
+        actions  : HOLD / BUY / SELL series indexed by date
+        backtest : run_backtest() frame (signal, equity)
+        metrics  : calculate_metrics() of the equity curve
+    """
+    from src.backtest.engine import run_backtest
+    from src.backtest.metrics import calculate_metrics
+    from src.rl.policy_export import action_series
+
+    feature_df = build_features(add_indicators(price_df)).reset_index(drop=True)
+    actions = action_series(policy, feature_df, feature_cols or FEATURE_COLS)
+
+    backtest = run_backtest(feature_df, actions, initial_capital=initial_capital)
+    return {
+        "actions":  actions,
+        "backtest": backtest,
+        "metrics":  calculate_metrics(backtest["equity"]),
+    }
+
+
 if __name__ == "__main__":
     evaluate_agent(
         ticker="HDFC Bank",
@@ -0,0 +1,246 @@
+# src/rl/policy_export.py
+"""
+PPO Policy Export — deterministic PPO actions without Stable-Baselines3.
+
+A trained PPO zip (models/ppo_hdfc.zip) holds the whole actor-critic plus
+optimiser state, and PPO.load() needs SB3, gymnasium and an env. For
+inference only the actor is needed:
+
+    obs → Linear → act → Linear → act → action_net → argmax
+
+export_policy() reads the actor weights straight from the zip's
+policy.pth and writes them to a small .npz next to it; NumpyPolicy scores
+a batch of observations with a few matrix products, and action_series()
+turns a whole feature history into a dated BUY / SELL / HOLD series.
+
+The .npz is written only by training (src/rl/train.py,
+src/rl/train_universe.py) and this CLI. load_policy() is the request-path
+entry point and never writes: it uses the .npz, or reads the actor from
+the zip in memory when the .npz is missing or older than the zip.
+
+Run:
+    python -m src.rl.policy_export models/ppo_hdfc.zip
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import ACTIONS
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────────────────────────────────────
+
+EXPORT_SUFFIX = ".policy.npz"
+
+_ACTIVATIONS = {
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0.0),
+}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Export
+# ─────────────────────────────────────────────────────────────────────────────
+
+def export_policy(model_path: str | Path, out_path: Optional[str | Path] = None) -> Path:
+    """
+    Write the deterministic actor of an SB3 PPO zip to a NumPy .npz.
+
+    Only torch is needed (to read policy.pth); SB3 is not imported.
+    Supports MlpPolicy actors with Tanh (SB3 default) or ReLU activations.
+    """
+    model_path = _zip_path(model_path)
+    out_path = Path(out_path) if out_path else exported_path(model_path)
+    arrays = _actor_arrays(model_path)
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    tmp.replace(out_path)
+    return out_path
+
+
+def exported_path(model_path: str | Path) -> Path:
+    """
+    models/ppo_hdfc.zip → models/ppo_hdfc.policy.npz
+    """
+    model_path = _zip_path(model_path)
+    return model_path.with_name(model_path.stem + EXPORT_SUFFIX)
+
+
+def _actor_arrays(model_path: Path) -> Dict[str, np.ndarray]:
+    # Actor weights of a PPO zip in the .npz layout NumpyPolicy.load reads
+    import torch
+
+    with zipfile.ZipFile(model_path) as archive:
+        data = json.loads(archive.read("data"))
+        state = torch.load(io.BytesIO(archive.read("policy.pth")), map_location="cpu", weights_only=True)
+
+    activation = _activation_name(data.get("policy_kwargs") or {})
+
+    # mlp_extractor.policy_net.{0,2,4,…} are the Linear layers (odd = activation)
+    prefix = "mlp_extractor.policy_net."
+    layer_ids = sorted({int(k[len(prefix):].split(".")[0]) for k in state if k.startswith(prefix)})
+    if "action_net.weight" not in state:
+        raise ValueError(f"{model_path} has no discrete action head")
+
+    arrays: Dict[str, np.ndarray] = {
+        "activation": np.array(activation),
+        "n_layers":   np.array(len(layer_ids)),
+    }
+    for i, layer in enumerate(layer_ids):
+        arrays[f"w{i}"] = state[f"{prefix}{layer}.weight"].numpy().T.astype(np.float32)
+        arrays[f"b{i}"] = state[f"{prefix}{layer}.bias"].numpy().astype(np.float32)
+    arrays["action_w"] = state["action_net.weight"].numpy().T.astype(np.float32)
+    arrays["action_b"] = state["action_net.bias"].numpy().astype(np.float32)
+    return arrays
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Inference
+# ─────────────────────────────────────────────────────────────────────────────
+
+class NumpyPolicy:
+    """
+    Deterministic PPO actor as plain NumPy.
+
+    predict() takes one observation or a (n, features) batch and returns
+    argmax actions — the same as PPO.predict(obs, deterministic=True).
+    """
+
+    def __init__(self, weights: List[np.ndarray], biases: List[np.ndarray],
+                 action_w: np.ndarray, action_b: np.ndarray, activation: str = "tanh"):
+        self.weights = weights
+        self.biases = biases
+        self.action_w = action_w
+        self.action_b = action_b
+        self.activation = activation
+        self._act = _ACTIVATIONS[activation]
+
+    @classmethod
+    def load(cls, path: str | Path) -> "NumpyPolicy":
+        with np.load(path) as f:
+            return cls.from_arrays(f)
+
+    @classmethod
+    def from_arrays(cls, f) -> "NumpyPolicy":
+        n = int(f["n_layers"])
+        return cls(
+            weights=[f[f"w{i}"] for i in range(n)],
+            biases=[f[f"b{i}"] for i in range(n)],
+            action_w=f["action_w"],
+            action_b=f["action_b"],
+            activation=str(f["activation"]),
+        )
+
+    @property
+    def n_features(self) -> int:
+        return self.weights[0].shape[0] if self.weights else self.action_w.shape[0]
+
+    def logits(self, obs: np.ndarray) -> np.ndarray:
+        """
+        Action logits, shape (n, n_actions).
+        """
+        x = np.atleast_2d(np.asarray(obs, dtype=np.float32))
+        for w, b in zip(self.weights, self.biases):
+            x = self._act(x @ w + b)
+        return x @ self.action_w + self.action_b
+
+    def predict(self, obs: np.ndarray) -> np.ndarray:
+        """
+        Deterministic actions for a batch (0 = HOLD, 1 = BUY, 2 = SELL).
+        """
+        return self.logits(obs).argmax(axis=1)
+
+    def act(self, observation: np.ndarray) -> int:
+        """
+        Single-observation action (drop-in for PPOTradingAgent.act).
+        """
+        return int(self.predict(observation)[0])
+
+
+def action_series(
+    policy: NumpyPolicy,
+    feature_df: pd.DataFrame,
+    feature_cols: List[str],
+    labels: Sequence[str] = ACTIONS,
+) -> pd.Series:
+    """
+    Policy decision for every bar in one batched forward pass.
+
+    The observation holds no position / balance state, so this equals the
+    actions of stepping TradingEnv bar by bar. Returns action labels
+    indexed like feature_df (by its "date" column when present); NaN / inf
+    features are zeroed as in TradingEnv.
+    """
+    obs = np.nan_to_num(
+        feature_df[feature_cols].to_numpy(dtype=np.float32),
+        nan=0.0, posinf=0.0, neginf=0.0,
+    )
+    actions = policy.predict(obs) if len(obs) else np.array([], dtype=int)
+    index = pd.Index(feature_df["date"]) if "date" in feature_df.columns else feature_df.index
+    return pd.Series(np.asarray(labels, dtype=object)[actions], index=index, name="ppo_action")
+
+
+def load_policy(model_path: str | Path) -> NumpyPolicy:
+    """
+    NumpyPolicy for a PPO zip. Uses the exported .npz; when it is missing
+    or older than the zip, the actor is read from the zip in memory
+    (nothing is written — run the export CLI to refresh the .npz).
+    """
+    model_path = _zip_path(model_path)
+    npz = exported_path(model_path)
+    if npz.exists() and not (model_path.exists() and model_path.stat().st_mtime > npz.stat().st_mtime):
+        return NumpyPolicy.load(npz)
+    return NumpyPolicy.from_arrays(_actor_arrays(model_path))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _zip_path(model_path: str | Path) -> Path:
+    # PPO.save("models/ppo_hdfc") writes models/ppo_hdfc.zip
+    path = Path(model_path)
+    return path if path.suffix == ".zip" else path.with_name(path.name + ".zip")
+
+
+def _activation_name(policy_kwargs: Dict) -> str:
+    fn = policy_kwargs.get("activation_fn")
+    if fn is None:
+        return "tanh"                     # SB3 ActorCriticPolicy default
+
+    # Stored as the class repr: "<class 'torch.nn.modules.activation.ReLU'>"
+    name = str(fn).rsplit(".", 1)[-1].strip("'>").lower()
+    if name not in _ACTIVATIONS:
+        raise ValueError(f"Unsupported activation for export: {name}")
+    return name
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export a PPO zip's actor to NumPy")
+    parser.add_argument("model_path", help="SB3 PPO zip, e.g. models/ppo_hdfc.zip")
+    parser.add_argument("--out", default=None, help="Output .npz (default: next to the zip)")
+    args = parser.parse_args()
+
+    print(f"Exported policy to {export_policy(args.model_path, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
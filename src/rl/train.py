@@ -7,7 +7,9 @@ from src.data.prices import load_prices
 from src.domain.indicators import add_indicators
 from src.ml.features import build_features
 from src.rl.env import TradingEnv
+from src.rl.vec_env import TradingVecEnv
 from src.rl.agent import PPOTradingAgent
+from src.rl.policy_export import export_policy
 
 
 MODEL_DIR = Path("models")
@@ -19,9 +21,16 @@ def train_rl_agent(
     timeframe: str = "2y",
     timesteps: int = 200_000,
     model_name: str = "ppo_agent",
+    n_envs: int = 8,
+    episode_length: int | None = 256,
 ) -> None:
     """
     Train PPO trading agent on historical data.
+
+    Training runs `n_envs` episodes in lockstep on the batched
+    TradingVecEnv (random `episode_length`-bar slices of the history);
+    n_envs=1 with episode_length=None replays the full history like the
+    single TradingEnv.
     """
 
     # -----------------------------
@@ -41,8 +50,20 @@ def train_rl_agent(
     df = df.dropna().reset_index(drop=True)
 
     # -----------------------------
-    # Environment
+    # Environments
     # -----------------------------
+    if episode_length is not None and episode_length >= len(df) - 1:
+        episode_length = None
+
+    train_env = TradingVecEnv(
+        [df],
+        feature_cols=feature_cols,
+        n_envs=n_envs,
+        initial_balance=100_000.0,
+        transaction_cost=0.001,
+        episode_length=episode_length,
+    )
+
     env = TradingEnv(
         df=df,
         feature_cols=feature_cols,
@@ -53,7 +74,8 @@ def train_rl_agent(
     # -----------------------------
     # PPO Agent
     # -----------------------------
-    agent = PPOTradingAgent(env)
+    # Same rollout size as before (2048 transitions), split across envs
+    agent = PPOTradingAgent(train_env, n_steps=max(2048 // n_envs, 64))
 
     # -----------------------------
     # Training
@@ -65,18 +87,20 @@ def train_rl_agent(
     # -----------------------------
     save_path = MODEL_DIR / model_name
     agent.save(str(save_path))
+    export_policy(f"{save_path}.zip")
 
-    print(f"PPO agent saved to {save_path}")
+    print(f"PPO agent saved to {save_path} (NumPy actor exported)")
 
     # -----------------------------
     # Quick evaluation run
     # -----------------------------
-    obs = env.reset()
+    obs, _ = env.reset()
     done = False
 
     while not done:
         action = agent.act(obs)
-        obs, reward, done, info = env.step(action)
+        obs, reward, terminated, truncated, info = env.step(action)
+        done = terminated or truncated
 
     print(
         f"Final Net Worth: {info['net_worth']:.2f} | "
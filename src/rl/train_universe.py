@@ -0,0 +1,335 @@
+# src/rl/train_universe.py
+"""
+Universe PPO Training — one PPO agent trained across many tickers at once.
+
+Every ticker (or every `slice_bars`-long slice of its history) becomes an
+episode source. Sources are spread over worker processes with SB3's
+SubprocVecEnv, so environment stepping runs on all cores while the main
+process does the policy updates:
+
+    worker 0 : RELIANCE, TCS, …      (episodes rotate through its tickers)
+    worker 1 : HDFCBANK, INFY, …
+    …
+
+vec_env="batched" keeps everything in-process on TradingVecEnv
+(src/rl/vec_env.py) instead — faster on one or two cores, where process
+hand-offs cost more than the array-backed env itself.
+
+Runs are checkpointed every RL_CHECKPOINT_STEPS timesteps and can be
+resumed from the latest checkpoint; throughput (steps / sec) is logged as
+training goes.
+
+Run:
+    python -m src.rl.train_universe --timesteps 300000
+    python -m src.rl.train_universe --resume                # continue
+    python -m src.rl.train_universe RELIANCE.NS TCS.NS --slice-bars 250
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import gymnasium as gym
+import pandas as pd
+from stable_baselines3.common.callbacks import BaseCallback, CheckpointCallback
+from stable_baselines3.common.vec_env import SubprocVecEnv, VecEnv
+
+from src.rl.agent import PPOTradingAgent
+from src.rl.env import TradingEnv
+from src.rl.policy_export import export_policy
+from src.rl.vec_env import TradingVecEnv
+from src.utils.config import RL_CHECKPOINT_STEPS, RL_TOTAL_TIMESTEPS
+from src.utils.logger import get_logger
+
+logger = get_logger("rl_universe")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Constants
+# ─────────────────────────────────────────────────────────────────────────────
+
+MODEL_DIR = Path("models")
+CHECKPOINT_DIR = MODEL_DIR / "checkpoints"
+
+FEATURE_COLS = ["rsi_norm", "ema_spread", "macd_diff", "atr_pct"]
+
+ROLLOUT_STEPS = 2048              # transitions per PPO update (all envs)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Data
+# ─────────────────────────────────────────────────────────────────────────────
+
+def prepare_frame(ticker: str, timeframe: str = "2y") -> pd.DataFrame:
+    """
+    Prices → indicators → features, NaN rows dropped (as in train.py).
+    """
+    from src.data.prices import load_prices
+    from src.domain.indicators import add_indicators
+    from src.ml.features import build_features
+
+    df = build_features(add_indicators(load_prices(ticker, timeframe)))
+    return df.dropna().reset_index(drop=True)
+
+
+def load_universe(
+    tickers: Sequence[str],
+    timeframe: str = "2y",
+    slice_bars: Optional[int] = None,
+) -> List[pd.DataFrame]:
+    """
+    Feature frames for every ticker (failed downloads are skipped).
+
+    With `slice_bars` each history is cut into consecutive slices of that
+    length (a trailing slice shorter than half is dropped).
+    """
+    frames = []
+    for ticker in tickers:
+        try:
+            df = prepare_frame(ticker, timeframe)
+        except Exception as exc:
+            logger.warning(f"{ticker}: skipped ({exc})")
+            continue
+
+        if slice_bars:
+            for start in range(0, len(df), slice_bars):
+                part = df.iloc[start:start + slice_bars].reset_index(drop=True)
+                if len(part) >= max(slice_bars // 2, 2):
+                    frames.append(part)
+        elif len(df) >= 2:
+            frames.append(df)
+
+    return frames
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Environments
+# ─────────────────────────────────────────────────────────────────────────────
+
+class RotatingTradingEnv(gym.Env):
+    """
+    TradingEnv over several frames: each reset moves to the next frame, so
+    one worker process can serve many tickers.
+    """
+
+    metadata = {"render_modes": []}
+
+    def __init__(self, frames: Sequence[pd.DataFrame], feature_cols: List[str]):
+        super().__init__()
+        self.envs = [TradingEnv(df=f, feature_cols=feature_cols) for f in frames]
+        self.observation_space = self.envs[0].observation_space
+        self.action_space = self.envs[0].action_space
+        self._current = -1
+
+    def reset(self, *, seed: Optional[int] = None, options: Optional[dict] = None):
+        super().reset(seed=seed)
+        self._current = (self._current + 1) % len(self.envs)
+        return self.envs[self._current].reset(seed=seed)
+
+    def step(self, action):
+        return self.envs[self._current].step(action)
+
+
+def make_vec_env(
+    frames: Sequence[pd.DataFrame],
+    feature_cols: List[str] = FEATURE_COLS,
+    vec_env: str = "subproc",
+    n_workers: Optional[int] = None,
+) -> VecEnv:
+    """
+    Vectorised env over all frames.
+
+    vec_env="subproc" : min(n_workers or cores, frames) processes, frames
+                        dealt round-robin
+    vec_env="batched" : one TradingVecEnv env per frame, in-process
+    """
+    if vec_env == "batched":
+        return TradingVecEnv(frames, feature_cols=feature_cols)
+    if vec_env != "subproc":
+        raise ValueError(f"Unknown vec_env: {vec_env}")
+
+    n_workers = min(n_workers or os.cpu_count() or 1, len(frames))
+    groups = [list(frames[i::n_workers]) for i in range(n_workers)]
+    return SubprocVecEnv([_env_factory(g, feature_cols) for g in groups])
+
+
+def _env_factory(frames: List[pd.DataFrame], feature_cols: List[str]):
+    def _make() -> gym.Env:
+        return RotatingTradingEnv(frames, feature_cols)
+    return _make
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Callbacks
+# ─────────────────────────────────────────────────────────────────────────────
+
+class ThroughputCallback(BaseCallback):
+    """
+    Logs environment steps per second every `log_every` timesteps.
+    """
+
+    def __init__(self, log_every: int = 10_000):
+        super().__init__()
+        self.log_every = log_every
+        self.steps_per_sec = 0.0
+
+    def _on_training_start(self) -> None:
+        self._start = self._mark = time.perf_counter()
+        self._start_steps = self._mark_steps = self.num_timesteps
+
+    def _on_step(self) -> bool:
+        if self.num_timesteps - self._mark_steps >= self.log_every:
+            now = time.perf_counter()
+            rate = (self.num_timesteps - self._mark_steps) / (now - self._mark)
+            self.logger.record("time/steps_per_sec", rate)
+            logger.info(f"{self.num_timesteps:,} steps | {rate:,.0f} steps/s")
+            self._mark, self._mark_steps = now, self.num_timesteps
+        return True
+
+    def _on_training_end(self) -> None:
+        elapsed = time.perf_counter() - self._start
+        self.steps_per_sec = (self.num_timesteps - self._start_steps) / max(elapsed, 1e-9)
+
+
+def latest_checkpoint(model_name: str, checkpoint_dir: Optional[Path] = None) -> Optional[Tuple[Path, int]]:
+    """
+    Newest "<model_name>_<steps>_steps.zip" checkpoint and its step count.
+    """
+    pattern = re.compile(rf"^{re.escape(model_name)}_(\d+)_steps\.zip$")
+    found = [
+        (path, int(m.group(1)))
+        for path in Path(checkpoint_dir or CHECKPOINT_DIR).glob(f"{model_name}_*_steps.zip")
+        if (m := pattern.match(path.name))
+    ]
+    return max(found, key=lambda item: item[1]) if found else None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Training
+# ─────────────────────────────────────────────────────────────────────────────
+
+def train_universe_agent(
+    tickers: Sequence[str],
+    timeframe: str = "2y",
+    timesteps: int = RL_TOTAL_TIMESTEPS,
+    model_name: str = "ppo_universe",
+    vec_env: str = "subproc",
+    n_workers: Optional[int] = None,
+    slice_bars: Optional[int] = None,
+    checkpoint_steps: int = RL_CHECKPOINT_STEPS,
+    resume: bool = False,
+    frames: Optional[Sequence[pd.DataFrame]] = None,
+) -> Dict:
+    """
+    Train one PPO agent across `tickers` with checkpoints.
+
+    Args:
+        timesteps        : total timesteps of the run (a resumed run only
+                           trains the remainder)
+        checkpoint_steps : save a checkpoint every this many timesteps
+        resume           : continue from the newest checkpoint of model_name
+        frames           : pre-built feature frames (skips downloading)
+
+    Returns dict:
+        model_path, frames, n_envs, timesteps, resumed_from, seconds,
+        steps_per_sec
+    """
+    frames = list(frames) if frames is not None else load_universe(tickers, timeframe, slice_bars)
+    if not frames:
+        raise ValueError("No training data for any ticker")
+
+    env = make_vec_env(frames, vec_env=vec_env, n_workers=n_workers)
+    n_envs = env.num_envs
+    n_steps = max(ROLLOUT_STEPS // n_envs, 64)
+
+    checkpoint = latest_checkpoint(model_name) if resume else None
+    done_steps = checkpoint[1] if checkpoint else 0
+    if checkpoint:
+        logger.info(f"Resuming {model_name} from {checkpoint[0].name}")
+        agent = PPOTradingAgent(env, model_path=str(checkpoint[0]))
+    else:
+        agent = PPOTradingAgent(env, n_steps=n_steps)
+
+    throughput = ThroughputCallback()
+    callbacks = [
+        CheckpointCallback(
+            save_freq=max(checkpoint_steps // n_envs, 1),
+            save_path=str(CHECKPOINT_DIR),
+            name_prefix=model_name,
+        ),
+        throughput,
+    ]
+
+    logger.info(
+        f"Training {model_name}: {len(frames)} episode sources, {n_envs} envs "
+        f"({vec_env}), {timesteps - done_steps:,} timesteps"
+    )
+    start = time.perf_counter()
+    try:
+        if timesteps > done_steps:
+            agent.train(
+                timesteps=timesteps - done_steps,
+                callback=callbacks,
+                reset_num_timesteps=checkpoint is None,
+            )
+    finally:
+        env.close()
+    elapsed = time.perf_counter() - start
+
+    MODEL_DIR.mkdir(exist_ok=True)
+    save_path = MODEL_DIR / model_name
+    agent.save(str(save_path))
+    export_policy(f"{save_path}.zip")
+    logger.info(f"PPO agent saved to {save_path} ({elapsed:.1f}s, {throughput.steps_per_sec:,.0f} steps/s)")
+
+    return {
+        "model_path":    f"{save_path}.zip",
+        "frames":        len(frames),
+        "n_envs":        n_envs,
+        "timesteps":     timesteps,
+        "resumed_from":  done_steps,
+        "seconds":       round(elapsed, 2),
+        "steps_per_sec": round(throughput.steps_per_sec, 1),
+    }
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# CLI
+# ─────────────────────────────────────────────────────────────────────────────
+
+def main() -> None:
+    from src.data.nifty50 import NIFTY_50
+
+    parser = argparse.ArgumentParser(description="Train one PPO agent across many tickers")
+    parser.add_argument("tickers", nargs="*", help="Yahoo tickers (default: NIFTY 50)")
+    parser.add_argument("--timeframe", default="2y", choices=["1y", "2y", "5y"])
+    parser.add_argument("--timesteps", type=int, default=300_000)
+    parser.add_argument("--model-name", default="ppo_universe")
+    parser.add_argument("--vec-env", default="subproc", choices=["subproc", "batched"])
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--slice-bars", type=int, default=None, help="Split histories into slices of N bars")
+    parser.add_argument("--checkpoint-steps", type=int, default=RL_CHECKPOINT_STEPS)
+    parser.add_argument("--resume", action="store_true", help="Continue from the latest checkpoint")
+    args = parser.parse_args()
+
+    summary = train_universe_agent(
+        tickers=args.tickers or list(NIFTY_50.values()),
+        timeframe=args.timeframe,
+        timesteps=args.timesteps,
+        model_name=args.model_name,
+        vec_env=args.vec_env,
+        n_workers=args.workers,
+        slice_bars=args.slice_bars,
+        checkpoint_steps=args.checkpoint_steps,
+        resume=args.resume,
+    )
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
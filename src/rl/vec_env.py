@@ -0,0 +1,208 @@
+# src/rl/vec_env.py
+"""
+Batched trading environment — N episodes stepped in lockstep.
+
+TradingVecEnv implements stable-baselines3's VecEnv directly (no per-env
+Python objects): the features and close prices of every ticker are
+stacked into one array, and balance / position / net worth of all N
+environments are NumPy vectors updated with one set of array operations
+per step. Reward and execution rules are the same as TradingEnv.
+
+Each environment replays one of the given frames (env i → frame
+i % len(frames)). With `episode_length` set, every episode starts at a
+random bar of its frame and is truncated after that many steps, so N
+environments on one ticker still see different slices of history.
+
+Usage:
+    env = TradingVecEnv([df_a, df_b], feature_cols, n_envs=8)
+    model = PPO("MlpPolicy", env)
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from gymnasium import spaces
+from stable_baselines3.common.vec_env import VecEnv
+
+from src.rl.env import feature_matrix
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Vectorised environment
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TradingVecEnv(VecEnv):
+    """
+    N TradingEnv episodes as one batched environment.
+
+    Args:
+        frames           : feature frames (one per ticker); each needs
+                           feature_cols and close
+        feature_cols     : observation columns
+        n_envs           : number of environments (default: one per frame)
+        initial_balance  : starting cash per environment
+        transaction_cost : proportional cost per trade
+        episode_length   : steps per episode from a random start
+                           (None = whole frame from the first bar)
+        seed             : RNG seed for episode starts
+    """
+
+    render_mode = None
+
+    def __init__(
+        self,
+        frames: Sequence[pd.DataFrame],
+        feature_cols: List[str],
+        n_envs: Optional[int] = None,
+        initial_balance: float = 100_000.0,
+        transaction_cost: float = 0.001,
+        episode_length: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        frames = [f.reset_index(drop=True) for f in frames]
+        if not frames or min(len(f) for f in frames) < 2:
+            raise ValueError("Every frame needs at least two bars")
+
+        n_envs = n_envs or len(frames)
+        self.feature_cols = feature_cols
+        self.initial_balance = initial_balance
+        self.transaction_cost = transaction_cost
+        self.episode_length = episode_length
+
+        # ── Stacked market data ──────────────────────────────────────────────
+        self._features = np.concatenate([feature_matrix(f, feature_cols) for f in frames])
+        self._prices = np.concatenate([f["close"].to_numpy(dtype=np.float64) for f in frames])
+
+        lengths = np.array([len(f) for f in frames])
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        frame_of_env = np.arange(n_envs) % len(frames)
+        self._first = offsets[frame_of_env]                  # first row per env
+        self._last = offsets[frame_of_env] + lengths[frame_of_env] - 1
+
+        if episode_length is not None and episode_length >= lengths.min() - 1:
+            raise ValueError("episode_length must be shorter than every frame")
+
+        # ── Per-environment state ────────────────────────────────────────────
+        self._rng = np.random.default_rng(seed)
+        self.current_step = np.zeros(n_envs, dtype=np.int64)
+        self._end = np.zeros(n_envs, dtype=np.int64)
+        self.balance = np.zeros(n_envs)
+        self.position = np.zeros(n_envs)
+        self.net_worth = np.zeros(n_envs)
+        self.max_net_worth = np.zeros(n_envs)
+        self._actions = np.zeros(n_envs, dtype=np.int64)
+
+        super().__init__(
+            num_envs=n_envs,
+            observation_space=spaces.Box(
+                low=-np.inf, high=np.inf, shape=(len(feature_cols),), dtype=np.float32,
+            ),
+            action_space=spaces.Discrete(3),
+        )
+
+    # ── VecEnv API ───────────────────────────────────────────────────────────
+
+    def reset(self) -> np.ndarray:
+        seeds = [s for s in self._seeds if s is not None]
+        if seeds:
+            self._rng = np.random.default_rng(seeds[0])
+        self._reset_seeds()
+        self._reset_options()
+
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        return self._features[self.current_step]
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        a = self._actions
+        price = self._prices[self.current_step]
+        prev_net_worth = self.net_worth.copy()
+
+        # Execute actions (same rules as TradingEnv.step)
+        buy = (a == 1) & (self.position == 0)
+        sell = (a == 2) & (self.position > 0)
+
+        self.position = np.where(buy, self.balance / price, self.position)
+        self.balance = np.where(buy, self.balance * (1 - self.transaction_cost), self.balance)
+
+        proceeds = self.position * price
+        self.balance = np.where(sell, proceeds - proceeds * self.transaction_cost, self.balance)
+        self.position = np.where(sell, 0.0, self.position)
+
+        # Net worth, reward with drawdown penalty
+        self.net_worth = self.balance + self.position * price
+        self.max_net_worth = np.maximum(self.max_net_worth, self.net_worth)
+        drawdown = (self.max_net_worth - self.net_worth) / self.max_net_worth
+        rewards = (self.net_worth - prev_net_worth - drawdown * 0.1).astype(np.float32)
+
+        # Advance; finished environments are reset in place
+        self.current_step += 1
+        dones = self.current_step >= self._end
+        obs = self._features[self.current_step]
+
+        infos: List[Dict[str, Any]] = [
+            {"net_worth": nw, "balance": bal, "position": pos}
+            for nw, bal, pos in zip(self.net_worth.tolist(), self.balance.tolist(), self.position.tolist())
+        ]
+
+        if dones.any():
+            truncated = dones & (self.current_step < self._last)
+            for i in np.flatnonzero(dones):
+                infos[i]["terminal_observation"] = obs[i].copy()
+                infos[i]["TimeLimit.truncated"] = bool(truncated[i])
+            self._reset_envs(dones)
+            obs[dones] = self._features[self.current_step[dones]]
+
+        return obs, rewards, dones, infos
+
+    def close(self) -> None:
+        pass
+
+    def get_attr(self, attr_name: str, indices=None) -> List[Any]:
+        value = getattr(self, attr_name)
+        idx = self._indices(indices)
+        if isinstance(value, np.ndarray) and value.shape[:1] == (self.num_envs,):
+            return [value[i] for i in idx]
+        return [value for _ in idx]
+
+    def set_attr(self, attr_name: str, value: Any, indices=None) -> None:
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices=None, **method_kwargs) -> List[Any]:
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None) -> List[bool]:
+        return [False for _ in self._indices(indices)]
+
+    # ── Internals ────────────────────────────────────────────────────────────
+
+    def _reset_envs(self, mask: np.ndarray) -> None:
+        n = int(mask.sum())
+        if self.episode_length is None:
+            start = self._first[mask]
+            end = self._last[mask]
+        else:
+            # Random start such that the episode fits inside the frame
+            span = self._last[mask] - self._first[mask] - self.episode_length
+            start = self._first[mask] + (self._rng.random(n) * (span + 1)).astype(np.int64)
+            end = start + self.episode_length
+
+        self.current_step[mask] = start
+        self._end[mask] = end
+        self.balance[mask] = self.initial_balance
+        self.position[mask] = 0.0
+        self.net_worth[mask] = self.initial_balance
+        self.max_net_worth[mask] = self.initial_balance
+
+    def _indices(self, indices) -> List[int]:
+        if indices is None:
+            return list(range(self.num_envs))
+        if isinstance(indices, int):
+            return [indices]
+        return list(indices)
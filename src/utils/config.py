@@ -74,6 +74,8 @@ RANDOM_SEED = 42
 DL_EPOCHS = 40
 DL_BATCH_SIZE = 64
 DL_LEARNING_RATE = 1e-3
+DL_PATIENCE = 5                   # early stopping: epochs without val improvement
+DL_NUM_WORKERS = 2                # DataLoader worker processes
 
 LSTM_MODEL_NAME = "lstm_model"
 TCN_MODEL_NAME = "tcn_model"
@@ -87,6 +89,7 @@ RL_GAMMA = 0.99
 RL_LR = 3e-4
 RL_ENTROPY_COEF = 0.01
 RL_TOTAL_TIMESTEPS = 200_000
+RL_CHECKPOINT_STEPS = 50_000      # universe training: checkpoint interval
 
 ACTIONS = ["HOLD", "BUY", "SELL"]
 
@@ -116,6 +119,19 @@ NEWS_SENTIMENT_POS_THRESHOLD = 0.2
 NEWS_SENTIMENT_NEG_THRESHOLD = -0.2
 
 
+# =============================
+# Precomputation Worker
+# =============================
+
+PRECOMPUTE_INTERVAL_MIN = 15
+PRECOMPUTE_WORKERS = 4
+PRECOMPUTE_MAX_AGE_MIN = 30
+
+MARKET_TIMEZONE = "Asia/Kolkata"
+MARKET_OPEN = "09:15"
+MARKET_CLOSE = "15:30"
+
+
 # =============================
 # Utility Helpers
 # =============================